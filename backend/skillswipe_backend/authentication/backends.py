@@ -0,0 +1,146 @@
+"""
+JWT authentication backed by a short-TTL user cache.
+
+The stock JWTAuthentication loads the user row on every request, and most
+views then query company_memberships or developer_profile as well.
+CachedJWTAuthentication resolves the user, their memberships and profile ID
+in one query on a miss. The result is cached under the user's auth version,
+which is bumped when the user or a membership changes (see signals.py).
+
+Only AUTH_USER_FIELDS are cached, never the password hash. A hit rebuilds
+the user with the other fields deferred, so reading one loads it and save()
+writes only the loaded fields.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+from profiles.models import CompanyUsers, DeveloperProfile
+
+
+# What authentication, permissions and request handling read from request.user
+AUTH_USER_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'role', 'status',
+    'is_active', 'is_staff', 'is_superuser',
+]
+
+
+def _version_key(user_id):
+    return f'auth:v:{user_id}'
+
+
+def _user_key(user_id, version):
+    return f'auth:user:{user_id}:{version}'
+
+
+def bump_auth_version(user_id):
+    """Invalidate the cached auth entry for a user once the transaction commits"""
+    def bump():
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            # Clock-based so an evicted version never repeats an older one
+            cache.set(_version_key(user_id), int(time.time() * 1000), timeout=None)
+    transaction.on_commit(bump)
+
+
+def load_auth_user(user_id):
+    """Fetch a user with membership and profile IDs attached, in one query"""
+    memberships = CompanyUsers.objects.filter(user=OuterRef('pk')).order_by('pk')
+    user = User.objects.annotate(
+        auth_company_ids=ArraySubquery(memberships.values('company_id')),
+        auth_company_roles=ArraySubquery(memberships.values('role')),
+        auth_developer_profile_id=Subquery(
+            DeveloperProfile.objects.filter(user=OuterRef('pk')).values('id')[:1]
+        ),
+    ).get(pk=user_id)
+    _attach_context(user)
+    return user
+
+
+def _attach_context(user):
+    company_ids = user.auth_company_ids or []
+    roles = user.auth_company_roles or []
+    user.auth_context = {
+        'memberships': dict(zip(company_ids, roles)),
+        # Same membership company_memberships.first() would return
+        'company_id': company_ids[0] if company_ids else None,
+        'company_role': roles[0] if roles else None,
+        'developer_profile_id': user.auth_developer_profile_id,
+    }
+
+
+def _cache_entry(user):
+    """What gets cached for a user: the auth fields, the auth context and a password fingerprint"""
+    return {
+        'fields': {field: getattr(user, field) for field in AUTH_USER_FIELDS},
+        'auth_context': user.auth_context,
+        # Same digest the token's revoke claim holds
+        'password_digest': get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None,
+    }
+
+
+def _user_from_entry(entry):
+    """A User holding the cached fields, with the rest deferred"""
+    # from_db() takes the values in model field order
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in entry['fields']]
+    user = User.from_db(DEFAULT_DB_ALIAS, names, [entry['fields'][name] for name in names])
+    user.auth_context = entry['auth_context']
+    return user
+
+
+def get_auth_context(user):
+    """
+    Membership and profile IDs for a user.
+    Free for users authenticated by CachedJWTAuthentication; one query otherwise.
+    """
+    if not hasattr(user, 'auth_context'):
+        user.auth_context = load_auth_user(user.pk).auth_context
+    return user.auth_context
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves the user from cache instead of Postgres"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = cache.get(_version_key(user_id))
+        if version is None:
+            version = int(time.time() * 1000)
+            if not cache.add(_version_key(user_id), version, timeout=None):
+                version = cache.get(_version_key(user_id), version)
+
+        key = _user_key(user_id, version)
+        entry = cache.get(key)
+        if entry is None:
+            try:
+                user = load_auth_user(user_id)
+            except User.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = _cache_entry(user)
+            cache.set(key, entry, timeout=getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+        else:
+            user = _user_from_entry(entry)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry['password_digest']:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,138 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from skillswipe_backend.benchmarking import percentiles
+
+User = get_user_model()
+
+
+def _pool_available():
+    try:
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return is_psycopg3
+
+
+class Command(BaseCommand):
+    """Compare requests/s of a small endpoint with and without connection reuse"""
+
+    help = (
+        "Drive an endpoint through the WSGI handler (so the per-request connection "
+        "lifecycle applies) with no reuse, persistent connections and, when psycopg 3 "
+        "is installed, a connection pool. Pings are written through so every request "
+        "touches the database. With the pool, checkouts count as connects."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Requests per mode")
+        parser.add_argument('--concurrency', type=int, default=4, help="Worker threads")
+        parser.add_argument('--path', default=None, help="Endpoint to call (default: the ping endpoint)")
+        parser.add_argument('--method', default='post', choices=['get', 'post'])
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).first()
+        if not user:
+            raise CommandError("Need at least one active user")
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(f"Running against {connection.vendor}; numbers won't transfer"))
+
+        path = options['path'] or reverse('update-activity')
+        auth = f'Bearer {AccessToken.for_user(user)}'
+
+        modes = [
+            ('no reuse', {'CONN_MAX_AGE': 0}, None),
+            ('persistent', {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True}, None),
+        ]
+        if _pool_available():
+            size = options['concurrency']
+            modes.append(('pool', {'CONN_MAX_AGE': 0}, {'min_size': size, 'max_size': size}))
+        else:
+            self.stdout.write("Skipping pool mode: needs psycopg 3 and psycopg_pool")
+
+        # Every thread's connection is built from this dict, so edits apply to new connections
+        db_settings = connections.settings['default']
+        original = {key: db_settings.get(key) for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        original_options = dict(db_settings.get('OPTIONS', {}))
+        connections.close_all()
+
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                                   PING_FLUSH_INTERVAL=0):
+                for label, overrides, pool in modes:
+                    db_settings.update(overrides)
+                    db_settings['OPTIONS'] = {**original_options, 'pool': pool} if pool else original_options
+                    try:
+                        self._report(label, self._run(path, options['method'], auth,
+                                                      options['requests'], options['concurrency']))
+                    finally:
+                        if pool:
+                            connection.close_pool()
+        finally:
+            db_settings.update(original)
+            db_settings['OPTIONS'] = original_options
+
+    def _run(self, path, method, auth, total, concurrency):
+        """Send `total` requests from `concurrency` threads; returns (elapsed, latencies, errors, connects)"""
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        lock = threading.Lock()
+        remaining = [total]
+        latencies, errors, connects = [], [0], [0]
+
+        def count_connect(sender, **kwargs):
+            with lock:
+                connects[0] += 1
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    environ = getattr(factory, method)(path, HTTP_AUTHORIZATION=auth).environ
+                    started = time.perf_counter()
+                    response = handler(environ, lambda status, headers: None)
+                    # Closing the response fires request_finished, like a real server
+                    response.close()
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                        if response.status_code >= 400:
+                            errors[0] += 1
+            finally:
+                connections.close_all()
+
+        connection_created.connect(count_connect)
+        try:
+            threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connect)
+        return elapsed, latencies, errors[0], connects[0]
+
+    def _report(self, label, result):
+        elapsed, latencies, errors, connects = result
+        p50, p95 = percentiles(latencies)
+        self.stdout.write(
+            f"{label}: {len(latencies) / elapsed:,.1f} req/s p50={p50:.1f}ms p95={p95:.1f}ms "
+            f"connects={connects} errors={errors}"
+        )
@@ -0,0 +1,188 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from skillswipe_backend import endpoint_suite
+from skillswipe_backend.benchmarking import percentiles
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'endpoints.json'
+
+
+class _ServerResponse:
+    """The parts of a test client response the runner reads, for a live server"""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+def _server_call(base_url, endpoint, fixtures, n):
+    path, user, body = endpoint_suite.prepare(endpoint, fixtures, n)
+    request = urllib.request.Request(
+        base_url.rstrip('/') + path,
+        method=endpoint.method.upper(),
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={'Authorization': endpoint_suite.authorization(user), 'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return _ServerResponse(response.status, response.headers, response.read())
+    except urllib.error.HTTPError as e:
+        return _ServerResponse(e.code, e.headers, e.read())
+
+
+class Command(BaseCommand):
+    """Benchmark API endpoints and compare them with a stored baseline"""
+
+    help = (
+        "Call every endpoint in endpoint_suite.ENDPOINTS repeatedly and report p50/p95/p99 latency, "
+        "queries per request and response bytes. By default it runs through the test client against "
+        "a throwaway test database seeded with synthetic data. With --server it sends HTTP requests "
+        "to a running server, using this database (seed it with seed_synthetic) for fixtures. "
+        "Results are compared with the baseline JSON, and the command fails on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=10, help="Synthetic dataset scale (test client mode)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=50, help="Measured calls per endpoint")
+        parser.add_argument('--warmup', type=int, default=5, help="Unmeasured calls per endpoint first")
+        parser.add_argument('--only', help="Only endpoints whose label contains this text")
+        parser.add_argument('--cold', action='store_true', help="Clear the cache before every call")
+        parser.add_argument('--server', help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse and keep the test database")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Baseline JSON path")
+        parser.add_argument('--write-baseline', action='store_true', help="Store these results as the baseline")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed relative growth of p50 latency and response bytes")
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help="Ignore p50 growth smaller than this, however large relatively")
+
+    def handle(self, *args, **options):
+        endpoints = [
+            endpoint for endpoint in endpoint_suite.ENDPOINTS
+            if not options['only'] or options['only'] in endpoint.label
+        ]
+        if not endpoints:
+            raise CommandError(f"No endpoint label contains {options['only']!r}")
+        baseline_path = Path(options['baseline'])
+        if not options['write_baseline'] and not baseline_path.exists():
+            raise CommandError(f"No baseline at {baseline_path}; run with --write-baseline to create one")
+
+        meta = {
+            'mode': 'server' if options['server'] else 'client',
+            'scale': None if options['server'] else options['scale'],
+            'seed': options['seed'],
+            'requests': options['requests'],
+            'cold': options['cold'],
+            'database': connection.vendor,
+            'recorded_at': timezone.now().isoformat(),
+        }
+        if options['server']:
+            results = self._run(endpoints, options, lambda endpoint, values, n: _server_call(
+                options['server'], endpoint, values, n))
+        else:
+            with endpoint_suite.test_database(keepdb=options['keepdb']), \
+                    override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                                      QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=False):
+                endpoint_suite.seed(options['scale'], seed=options['seed'])
+                client = Client(raise_request_exception=False)
+                results = self._run(endpoints, options, lambda endpoint, values, n: endpoint_suite.call(
+                    client, endpoint, values, n))
+
+        if options['write_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({'meta': meta, 'endpoints': results}, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+            return
+
+        self._compare(meta, results, json.loads(baseline_path.read_text()), options)
+
+    def _run(self, endpoints, options, send):
+        """{endpoint label: stats}, printing one line per endpoint"""
+        calls = options['warmup'] + options['requests']
+        try:
+            fixtures = endpoint_suite.fixtures(writes=calls)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        results = {}
+        for endpoint in endpoints:
+            latencies, queries, sizes, errors = [], [], [], 0
+            for n in range(calls):
+                if options['cold']:
+                    cache.clear()
+                started = time.perf_counter()
+                response = send(endpoint, fixtures, n)
+                elapsed = time.perf_counter() - started
+                if n < options['warmup']:
+                    continue
+                latencies.append(elapsed)
+                sizes.append(len(response.content))
+                errors += response.status_code >= 400
+                # Only present when the query budget middleware is on
+                count = response.headers.get('X-Query-Count')
+                if count is not None:
+                    queries.append(int(count))
+
+            p50, p95, p99 = percentiles(latencies, (50, 95, 99))
+            results[endpoint.label] = {
+                'p50_ms': round(p50, 2),
+                'p95_ms': round(p95, 2),
+                'p99_ms': round(p99, 2),
+                'queries': round(statistics.median(queries)) if queries else None,
+                'bytes': round(statistics.median(sizes)),
+                'errors': errors,
+            }
+            stats = results[endpoint.label]
+            line = (f"{endpoint.label}: p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms "
+                    f"queries={stats['queries'] if queries else '?'} bytes={stats['bytes']:,}")
+            if errors:
+                self.stdout.write(self.style.WARNING(f"{line} errors={errors}"))
+            else:
+                self.stdout.write(line)
+        return results
+
+    def _compare(self, meta, results, baseline, options):
+        base_meta = baseline.get('meta', {})
+        different = [key for key in ('mode', 'scale', 'seed', 'cold', 'database') if base_meta.get(key) != meta[key]]
+        if different:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded with different {', '.join(different)}; numbers may not be comparable"
+            ))
+
+        threshold = options['threshold']
+        regressions = []
+        for label, stats in results.items():
+            base = baseline.get('endpoints', {}).get(label)
+            if base is None:
+                self.stdout.write(f"{label}: not in baseline")
+                continue
+            # p95/p99 of a few dozen calls are a handful of samples and too noisy to gate on
+            if stats['p50_ms'] > base['p50_ms'] * (1 + threshold) and \
+                    stats['p50_ms'] - base['p50_ms'] > options['min_delta_ms']:
+                regressions.append(f"{label}: p50 {base['p50_ms']:.1f}ms -> {stats['p50_ms']:.1f}ms")
+            if stats['queries'] is not None and base.get('queries') is not None and stats['queries'] > base['queries']:
+                regressions.append(f"{label}: queries {base['queries']} -> {stats['queries']}")
+            if stats['bytes'] > base['bytes'] * (1 + threshold):
+                regressions.append(f"{label}: bytes {base['bytes']:,} -> {stats['bytes']:,}")
+            if stats['errors'] > base.get('errors', 0):
+                regressions.append(f"{label}: errors {base.get('errors', 0)} -> {stats['errors']}")
+
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
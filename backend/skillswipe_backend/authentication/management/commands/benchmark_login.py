@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from skillswipe_backend.benchmarking import percentiles
+
+User = get_user_model()
+
+PREFIX = 'bench-login-'
+PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    """Measure login throughput of one worker at several concurrency levels"""
+
+    help = (
+        "Benchmark the async login endpoint in-process through the ASGI handler. "
+        "Creates temporary users (removed afterwards) and reports logins/s and "
+        "latency for each concurrency level."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help="Temporary users to log in as")
+        parser.add_argument('--requests', type=int, default=200, help="Logins per concurrency level")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                            help="Concurrent in-flight logins to test")
+
+    def handle(self, *args, **options):
+        # Hash once; every temporary user shares it
+        encoded = make_password(PASSWORD)
+        users = User.objects.bulk_create([
+            User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.invalid',
+                 role='developer', password=encoded)
+            for i in range(options['users'])
+        ])
+        emails = [user.email for user in users]
+
+        try:
+            # The test client sends Host: testserver
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for concurrency in options['concurrency']:
+                    elapsed, latencies, failures = asyncio.run(
+                        self._run(emails, options['requests'], concurrency)
+                    )
+                    p50, p95 = percentiles(latencies)
+                    self.stdout.write(
+                        f"concurrency={concurrency}: {options['requests'] / elapsed:,.1f} logins/s "
+                        f"p50={p50:.1f}ms p95={p95:.1f}ms failures={failures}"
+                    )
+        finally:
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+    async def _run(self, emails, total, concurrency):
+        """Issue `total` logins with at most `concurrency` in flight"""
+        client = AsyncClient()
+        url = reverse('custom-login')
+        latencies, failures = [], 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login(i):
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    url, {'email': emails[i % len(emails)], 'password': PASSWORD},
+                    content_type='application/json'
+                )
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(total)))
+        return time.perf_counter() - started, latencies, failures
@@ -0,0 +1,107 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication import tokens
+from authentication.tokens import BloomTokenRefreshSerializer
+from skillswipe_backend.benchmarking import percentiles
+
+User = get_user_model()
+
+JTI_PREFIX = 'bench-'
+
+
+class Command(BaseCommand):
+    """Measure refresh latency with a large token blacklist, with and without the Bloom filter"""
+    
+    help = (
+        "Seed millions of outstanding/blacklisted tokens with generate_series, time "
+        "token refreshes (rotation + blacklist) with the filter off and on, then remove "
+        "the seeded rows."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000, help="Blacklisted tokens to seed")
+        parser.add_argument('--requests', type=int, default=500, help="Refreshes per mode")
+        parser.add_argument('--keep', action='store_true', help="Keep seeded rows for another run")
+    
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).first()
+        if not user:
+            raise CommandError("Need at least one active user")
+        
+        self._seed(options['rows'])
+        try:
+            for label, enabled in [('db lookup', False), ('bloom filter', True)]:
+                with override_settings(TOKEN_BLACKLIST_BLOOM=enabled):
+                    if enabled:
+                        started = time.perf_counter()
+                        tokens._state['filter'] = tokens.build_blacklist_filter()
+                        tokens._state['built_at'] = time.monotonic()
+                        self.stdout.write(f"Filter built in {time.perf_counter() - started:.1f}s")
+                    samples = self._refresh_loop(user, options['requests'])
+                p50, p95 = percentiles(samples)
+                self.stdout.write(f"{label}: p50={p50:.2f}ms p95={p95:.2f}ms over {len(samples)} refreshes")
+        finally:
+            if not options['keep']:
+                self._cleanup()
+    
+    def _seed(self, rows):
+        """Bulk-insert expiring-in-a-week tokens and blacklist them, all in SQL"""
+        outstanding = OutstandingToken._meta.db_table
+        blacklisted = BlacklistedToken._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {outstanding} WHERE jti LIKE %s", [f'{JTI_PREFIX}%'])
+            existing = cursor.fetchone()[0]
+            if existing >= rows:
+                self.stdout.write(f"Reusing {existing:,} seeded tokens")
+                return
+            started = time.perf_counter()
+            cursor.execute(
+                f"""
+                INSERT INTO {outstanding} (jti, token, created_at, expires_at)
+                SELECT %s || g, '', now(), now() + interval '7 days'
+                FROM generate_series(%s, %s) g
+                """,
+                [JTI_PREFIX, existing + 1, rows]
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {blacklisted} (token_id, blacklisted_at)
+                SELECT o.id, now() FROM {outstanding} o
+                WHERE o.jti LIKE %s
+                  AND NOT EXISTS (SELECT 1 FROM {blacklisted} b WHERE b.token_id = o.id)
+                """,
+                [f'{JTI_PREFIX}%']
+            )
+            cursor.execute(f"ANALYZE {outstanding}")
+            cursor.execute(f"ANALYZE {blacklisted}")
+        self.stdout.write(f"Seeded {rows:,} blacklisted tokens in {time.perf_counter() - started:.1f}s")
+    
+    def _refresh_loop(self, user, count):
+        """Refresh a chain of tokens the way /api/auth/jwt/refresh/ does"""
+        refresh = str(RefreshToken.for_user(user))
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            serializer = BloomTokenRefreshSerializer(data={'refresh': refresh})
+            serializer.is_valid(raise_exception=True)
+            refresh = serializer.validated_data['refresh']
+            samples.append(time.perf_counter() - started)
+        return samples
+    
+    def _cleanup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {BlacklistedToken._meta.db_table} WHERE token_id IN "
+                f"(SELECT id FROM {OutstandingToken._meta.db_table} WHERE jti LIKE %s)",
+                [f'{JTI_PREFIX}%']
+            )
+            cursor.execute(f"DELETE FROM {OutstandingToken._meta.db_table} WHERE jti LIKE %s",
+                           [f'{JTI_PREFIX}%'])
+        self.stdout.write("Removed seeded tokens")
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from skillswipe_backend import endpoint_suite
+
+
+class Command(BaseCommand):
+    """Check that API endpoints stay within their query budgets and don't grow with data"""
+
+    help = (
+        "Create a test database, seed synthetic data at two sizes, call every GET endpoint "
+        "in endpoint_suite.ENDPOINTS as a developer and as a company user with cold caches, and fail "
+        "if an endpoint is over its query budget or repeats a statement more often on the larger dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,30', help="Two comma-separated dataset scales")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keepdb', action='store_true', help="Reuse and keep the test database")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        if len(sizes) != 2 or sizes[0] >= sizes[1]:
+            raise CommandError("--sizes takes two scales, smallest first (e.g. 10,30)")
+
+        with endpoint_suite.test_database(keepdb=options['keepdb']):
+            counts = [self._measure(size, options['seed']) for size in sizes]
+
+        failures = self._report(counts)
+        unchecked = endpoint_suite.unchecked_get_endpoints()
+        if unchecked:
+            self.stdout.write(f"Not checked: {', '.join(unchecked)}")
+        if failures:
+            raise CommandError(f"{failures} endpoint(s) failed the query budget check")
+        self.stdout.write(self.style.SUCCESS("All endpoints within budget and O(1) in result size"))
+
+    def _measure(self, size, seed):
+        """{endpoint label: QueryCount} at one dataset size"""
+        created = endpoint_suite.seed(size, seed=seed)
+        self.stdout.write(f"Scale {size}: " + ', '.join(f'{count} {name}' for name, count in created.items()))
+        return endpoint_suite.count_queries()
+
+    def _report(self, counts):
+        small, large = counts
+        failures = 0
+        for label, (status_code, queries, budget, statements) in large.items():
+            small_queries = small[label].queries
+            repeated = endpoint_suite.per_row_statements(small[label].statements, statements)
+            problems = []
+            if status_code >= 400:
+                problems.append(f"status {status_code}")
+            if queries > budget:
+                problems.append(f"over budget ({budget})")
+            if repeated:
+                problems.append(f"grows with data ({small_queries} -> {queries})")
+            failures += bool(problems)
+
+            line = f"{label}: {small_queries} -> {queries} queries (budget {budget})"
+            if problems:
+                self.stdout.write(self.style.ERROR(f"{line}  FAIL: {'; '.join(problems)}"))
+                for sql, (small_runs, runs) in repeated.items():
+                    self.stdout.write(f"    {small_runs} -> {runs}x  {sql[:200]}")
+            else:
+                self.stdout.write(line)
+        return failures
@@ -0,0 +1,57 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+
+class Command(BaseCommand):
+    """Delete expired outstanding and blacklisted refresh tokens in chunks"""
+    
+    help = (
+        "Chunked replacement for simplejwt's flushexpiredtokens. Selects expired outstanding "
+        "tokens in primary-key order, a chunk at a time, and deletes them plus their blacklist "
+        "entries. Tokens with a longer lifetime don't stop the walk at the first unexpired chunk."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Expired outstanding tokens deleted per transaction")
+        parser.add_argument('--grace-hours', type=int, default=1,
+                            help="Keep tokens until this long after they expire")
+        parser.add_argument('--sleep', type=float, default=0.05,
+                            help="Seconds to pause between chunks")
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        outstanding = OutstandingToken._meta.db_table
+        blacklisted = BlacklistedToken._meta.db_table
+        
+        last_id = 0
+        deleted_outstanding = deleted_blacklisted = 0
+        while True:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT id FROM {outstanding} WHERE expires_at < %s AND id > %s ORDER BY id LIMIT %s",
+                        [cutoff, last_id, options['chunk_size']]
+                    )
+                    expired = [row[0] for row in cursor.fetchall()]
+                    if not expired:
+                        break
+                    last_id = expired[-1]
+                    
+                    # Raw DELETE doesn't cascade; remove blacklist rows first
+                    cursor.execute(f"DELETE FROM {blacklisted} WHERE token_id = ANY(%s)", [expired])
+                    deleted_blacklisted += cursor.rowcount
+                    cursor.execute(f"DELETE FROM {outstanding} WHERE id = ANY(%s)", [expired])
+                    deleted_outstanding += cursor.rowcount
+            
+            time.sleep(options['sleep'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted_outstanding} expired outstanding tokens "
+            f"and {deleted_blacklisted} blacklist entries"
+        ))
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from skillswipe_backend import db_router
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Show replica lag and where replica-policy reads would go"""
+
+    help = (
+        "Measure replica lag (seconds and WAL bytes behind the primary) and report "
+        "whether views with a replica read policy would use it, optionally for one user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Email of a user to check read-your-writes pinning for")
+
+    def handle(self, *args, **options):
+        if not db_router.replica_configured():
+            raise CommandError("No replica configured; set DATABASE_REPLICA_HOST")
+
+        lag = db_router.replica_lag(refresh=True)
+        self.stdout.write(f"Replica lag: {'unknown' if lag is None else f'{lag:.2f}s'} "
+                          f"(tolerance {db_router.max_lag()}s)")
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("SELECT pg_current_wal_lsn()")
+            primary_lsn = cursor.fetchone()[0]
+        with connections[db_router.REPLICA_ALIAS].cursor() as cursor:
+            cursor.execute("SELECT pg_is_in_recovery(), pg_wal_lsn_diff(%s::pg_lsn, pg_last_wal_replay_lsn())", [primary_lsn])
+            in_recovery, behind = cursor.fetchone()
+        if in_recovery:
+            self.stdout.write(f"WAL behind primary: {int(behind or 0):,} bytes")
+        else:
+            self.stdout.write("Replica is not a standby; WAL position can't be compared")
+
+        usable = db_router.replica_usable()
+        self.stdout.write(f"Replica reads: {'on' if usable else 'off (primary only)'}")
+
+        if options['user']:
+            user = User.by_email(options['user']).first()
+            if not user:
+                raise CommandError(f"No user with email {options['user']}")
+            if db_router.is_sticky(user.pk):
+                self.stdout.write(f"{user.email}: pinned to the primary after a recent write")
+            else:
+                alias = db_router.REPLICA_ALIAS if usable else DEFAULT_DB_ALIAS
+                self.stdout.write(f"{user.email}: replica-policy reads go to '{alias}'")
@@ -0,0 +1,87 @@
+import io
+import json
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from skillswipe_backend.profiling import profile_dir
+
+
+class Command(BaseCommand):
+    """List and inspect request profiles captured by ProfilingMiddleware"""
+
+    help = (
+        "Without an id, list captured profiles newest first. With an id (or a unique prefix), "
+        "show the request, its slowest SQL statements and the top functions of its call tree."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_id', nargs='?', help="Profile to inspect")
+        parser.add_argument('--limit', type=int, default=20, help="Profiles listed, or rows per section")
+        parser.add_argument('--view', help="Only list profiles of this URL name")
+        parser.add_argument('--sort', default='cumulative', choices=['cumulative', 'tottime', 'ncalls'],
+                            help="Call tree ordering")
+        parser.add_argument('--all-sql', action='store_true', help="Show every statement in execution order")
+
+    def handle(self, *args, **options):
+        directory = profile_dir()
+        if not directory.exists():
+            raise CommandError(f"No profiles in {directory}")
+        if options['profile_id']:
+            self._inspect(directory, options)
+        else:
+            self._list(directory, options)
+
+    def _load(self, path):
+        return json.loads(path.read_text())
+
+    def _list(self, directory, options):
+        paths = sorted(directory.glob('*.json'), reverse=True)
+        shown = 0
+        for path in paths:
+            profile = self._load(path)
+            if options['view'] and profile['view'] != options['view']:
+                continue
+            self.stdout.write(
+                f"{profile['id']}  {profile['method']} {profile['path']}  {profile['status']}  "
+                f"{profile['duration_ms']:.1f}ms (sql {profile['sql_ms']:.1f}ms, {len(profile['queries'])} queries)  "
+                f"{profile['trigger']}"
+            )
+            shown += 1
+            if shown >= options['limit']:
+                break
+        if not shown:
+            self.stdout.write("No matching profiles")
+
+    def _inspect(self, directory, options):
+        matches = sorted(directory.glob(f"{options['profile_id']}*.json"))
+        if not matches:
+            raise CommandError(f"No profile {options['profile_id']}")
+        if len(matches) > 1:
+            raise CommandError(f"{len(matches)} profiles start with {options['profile_id']}; give more of the id")
+        profile = self._load(matches[0])
+        limit = options['limit']
+
+        self.stdout.write(f"{profile['method']} {profile['path']} -> {profile['status']} ({profile['view']})")
+        self.stdout.write(f"Started {profile['started_at']}, user {profile['user'] or 'anonymous'}, "
+                          f"trigger {profile['trigger']}")
+        self.stdout.write(f"Total {profile['duration_ms']:.1f}ms, SQL {profile['sql_ms']:.1f}ms "
+                          f"in {len(profile['queries'])} queries")
+
+        queries = profile['queries']
+        if not options['all_sql']:
+            queries = sorted(queries, key=lambda query: query['ms'], reverse=True)[:limit]
+            self.stdout.write(f"\nSlowest {len(queries)} statements:")
+        else:
+            self.stdout.write("\nStatements:")
+        for query in queries:
+            self.stdout.write(f"  {query['ms']:8.2f}ms  [{query['alias']}, {query['thread']}]  {query['sql']}")
+
+        prof_path = matches[0].with_suffix('.prof')
+        if not profile['call_tree'] or not prof_path.exists():
+            self.stdout.write("\nNo call tree (async view, or the .prof file was removed)")
+            return
+        buffer = io.StringIO()
+        pstats.Stats(str(prof_path), stream=buffer).strip_dirs().sort_stats(options['sort']).print_stats(limit)
+        self.stdout.write(f"\nCall tree, top {limit} by {options['sort']} ({prof_path}):")
+        self.stdout.write(buffer.getvalue())
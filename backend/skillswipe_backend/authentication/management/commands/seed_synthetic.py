@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from skillswipe_backend import synthetic
+
+
+class Command(BaseCommand):
+    """Load a production-shaped synthetic dataset"""
+
+    help = (
+        "Generate users, profiles, companies, jobs, swipes, matches and wishlists with skewed "
+        "skill popularity, power-law swipe activity and a reciprocal-match rate. Loads with COPY "
+        "on PostgreSQL. The same options and --seed always produce the same data. Synthetic "
+        f"users have {synthetic.USERNAME_PREFIX} usernames and @{synthetic.EMAIL_DOMAIN} emails."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--developers', type=int, default=1000)
+        parser.add_argument('--companies', type=int, default=100)
+        parser.add_argument('--jobs-per-company', type=int, default=3, help="Mean jobs per company")
+        parser.add_argument('--swipes-per-developer', type=int, default=20, help="Mean job swipes per developer")
+        parser.add_argument('--swipes-per-company', type=int, default=20, help="Mean profile swipes per company")
+        parser.add_argument('--reciprocal-rate', type=float, default=0.15,
+                            help="Share of job swipes the company swipes back on (each becomes a match)")
+        parser.add_argument('--wishlist-per-user', type=int, default=3, help="Mean wishlist entries per user")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Rows per COPY/bulk_create")
+        parser.add_argument('--no-copy', action='store_true', help="Use bulk_create even on PostgreSQL")
+        parser.add_argument('--replace', action='store_true', help="Delete existing synthetic users first")
+
+    def handle(self, *args, **options):
+        if options['developers'] < 1 or options['companies'] < 1:
+            raise CommandError("Need at least one developer and one company")
+        if not 0 <= options['reciprocal_rate'] <= 1:
+            raise CommandError("--reciprocal-rate must be between 0 and 1")
+
+        if synthetic.synthetic_users().exists():
+            if not options['replace']:
+                raise CommandError("Synthetic data already loaded; pass --replace to regenerate it")
+            deleted = synthetic.delete_synthetic()
+            self.stdout.write(f"Deleted {deleted:,} rows of earlier synthetic data")
+
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        self.stdout.write(f"Loading with {'COPY' if use_copy else 'bulk_create'} (seed {options['seed']})")
+
+        started = time.perf_counter()
+        counts = synthetic.generate(
+            developers=options['developers'],
+            companies=options['companies'],
+            jobs_per_company=options['jobs_per_company'],
+            swipes_per_developer=options['swipes_per_developer'],
+            swipes_per_company=options['swipes_per_company'],
+            reciprocal_rate=options['reciprocal_rate'],
+            wishlist_per_user=options['wishlist_per_user'],
+            seed=options['seed'],
+            chunk_size=options['chunk_size'],
+            use_copy=use_copy,
+            log=self.stdout.write
+        )
+        elapsed = time.perf_counter() - started
+        if connection.vendor == 'postgresql':
+            # Planner statistics don't know about the new rows yet
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)"
+        ))
+        self.stdout.write("Run `manage.py rollup` to build the reporting rollups for this data")
@@ -0,0 +1,86 @@
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from skillswipe_backend.slow_queries import log_path
+
+
+class Command(BaseCommand):
+    """Summarize the slow-query log written by SlowQueryMiddleware"""
+
+    help = (
+        "Group captured slow statements by fingerprint (literals and IN lists collapsed) and list "
+        "them by total time, with the views that ran them. --recent lists single captures instead, "
+        "and --plans prints the slowest EXPLAIN (ANALYZE, BUFFERS) plan of each group."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10, help="Groups or captures shown")
+        parser.add_argument('--view', help="Only statements run by this URL name")
+        parser.add_argument('--recent', action='store_true', help="List the newest captures instead of groups")
+        parser.add_argument('--plans', action='store_true', help="Print plans and stacks")
+        parser.add_argument('--clear', action='store_true', help="Delete the log")
+
+    def handle(self, *args, **options):
+        path = log_path()
+        if options['clear']:
+            path.unlink(missing_ok=True)
+            self.stdout.write(f"Deleted {path}")
+            return
+        if not path.exists():
+            raise CommandError(f"No slow queries logged at {path}")
+
+        captures = []
+        with path.open() as log:
+            for line in log:
+                try:
+                    capture = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash mid-write
+                    continue
+                if not options['view'] or capture['view'] == options['view']:
+                    captures.append(capture)
+        if not captures:
+            self.stdout.write("No matching slow queries")
+            return
+
+        if options['recent']:
+            for capture in captures[-options['limit']:][::-1]:
+                self.stdout.write(f"{capture['at']}  {capture['ms']:.1f}ms  {capture['view'] or '-'}  "
+                                  f"[{capture['alias']}]  {capture['sql']}")
+                if capture['params']:
+                    self.stdout.write(f"  params: {capture['params']}")
+                if options['plans']:
+                    self._details(capture)
+            return
+
+        groups = defaultdict(list)
+        for capture in captures:
+            groups[capture['fingerprint']].append(capture)
+        ranked = sorted(groups.values(), key=lambda group: sum(capture['ms'] for capture in group), reverse=True)
+
+        self.stdout.write(f"{len(captures)} slow statements in {len(groups)} groups ({path})")
+        for group in ranked[:options['limit']]:
+            total = sum(capture['ms'] for capture in group)
+            slowest = max(group, key=lambda capture: capture['ms'])
+            views = sorted({capture['view'] or '-' for capture in group})
+            self.stdout.write(
+                f"\n{len(group)}x  total {total:.0f}ms  max {slowest['ms']:.1f}ms  views: {', '.join(views)}"
+            )
+            self.stdout.write(f"  {slowest['fingerprint']}")
+            if options['plans']:
+                planned = [capture for capture in group if capture['plan']]
+                self._details(max(planned, key=lambda capture: capture['ms']) if planned else slowest)
+
+    def _details(self, capture):
+        for frame in capture['stack']:
+            self.stdout.write(f"    at {frame}")
+        if capture['error']:
+            self.stdout.write(f"    error: {capture['error']}")
+        if capture['plan']:
+            self.stdout.write(f"    plan ({capture['ms']:.1f}ms capture):")
+            for line in capture['plan'].splitlines():
+                self.stdout.write(f"      {line}")
+        elif capture.get('plan_error'):
+            self.stdout.write(f"    EXPLAIN failed: {capture['plan_error']}")
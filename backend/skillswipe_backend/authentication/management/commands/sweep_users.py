@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+
+from authentication.sweeper import mark_inactive_chunk, collect_reminders_chunk
+
+
+class Command(BaseCommand):
+    """Mark inactive users and collect profile-review reminder candidates"""
+    
+    help = (
+        "Apply the inactivity rule (INACTIVE_AFTER_DAYS without a ping) and record "
+        "profile-review reminders (PROFILE_REVIEW_AFTER_DAYS without a profile update) "
+        "in chunks. Resumes an interrupted reminder pass; run it from cron."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Users per UPDATE / reminder chunk")
+        parser.add_argument('--duty-cycle', type=float, default=0.5,
+                            help="Fraction of wall time spent working; the rest is spent sleeping between chunks")
+        parser.add_argument('--max-chunks', type=int, default=None,
+                            help="Stop each pass after this many chunks (the reminder pass resumes next run)")
+        parser.add_argument('--max-failures', type=int, default=5,
+                            help="Give up (exit non-zero) after this many chunks fail in a row")
+        parser.add_argument('--skip-inactive', action='store_true', help="Don't mark inactive users")
+        parser.add_argument('--skip-reminders', action='store_true', help="Don't collect reminders")
+    
+    def handle(self, *args, **options):
+        if not 0 < options['duty_cycle'] <= 1:
+            raise CommandError("--duty-cycle must be in (0, 1]")
+        if options['max_failures'] < 1:
+            raise CommandError("--max-failures must be at least 1")
+        
+        if not options['skip_inactive']:
+            marked, _ = self._run(options, self._inactive_chunk)
+            self.stdout.write(f"Marked {marked} users inactive")
+        
+        if not options['skip_reminders']:
+            scanned, recorded = self._run(options, collect_reminders_chunk)
+            self.stdout.write(f"Scanned {scanned} active users, recorded {recorded} review reminders")
+        
+        self.stdout.write(self.style.SUCCESS("Sweep complete"))
+    
+    @staticmethod
+    def _inactive_chunk(chunk_size):
+        marked = mark_inactive_chunk(chunk_size)
+        return marked, marked
+    
+    def _run(self, options, chunk):
+        """Call chunk(chunk_size) until it finds no work, sleeping to honour the duty cycle"""
+        processed = counted = chunks = failures = 0
+        while options['max_chunks'] is None or chunks < options['max_chunks']:
+            chunks += 1
+            started = time.perf_counter()
+            try:
+                work, count = chunk(options['chunk_size'])
+            except OperationalError as e:
+                # lock_timeout hit: back off and let request traffic through. A failure
+                # that keeps repeating (database down) ends the run instead of looping
+                failures += 1
+                if failures >= options['max_failures']:
+                    raise CommandError(f"{failures} chunks failed in a row, giving up: {e}")
+                self.stderr.write(f"Chunk skipped ({e}); backing off")
+                time.sleep(failures)
+                continue
+            failures = 0
+            if not work:
+                break
+            processed += work
+            counted += count
+            elapsed = time.perf_counter() - started
+            time.sleep(elapsed * (1 - options['duty_cycle']) / options['duty_cycle'])
+        return processed, counted
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:59
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Stop with a report if emails repeat when compared case-insensitively, instead
+    of failing on the index build. Which account keeps the address is for a person
+    to decide: merge or rename the others, then run migrate again.
+    """
+    User = apps.get_model('authentication', 'User')
+    users = User.objects.exclude(email='').annotate(email_lower=Lower('email'))
+    duplicates = list(
+        users.values('email_lower').annotate(n=Count('id')).filter(n__gt=1)
+        .order_by('email_lower').values_list('email_lower', flat=True)
+    )
+    if not duplicates:
+        return
+
+    lines = []
+    for email in duplicates:
+        accounts = users.filter(email_lower=email).order_by('date_joined').values_list('id', 'username', 'email')
+        lines.append(f"  {email}: " + ', '.join(f"{username} <{address}> ({user_id})"
+                                                for user_id, username, address in accounts))
+    raise RuntimeError(
+        f"{len(duplicates)} email address(es) belong to more than one user when case is ignored, "
+        f"so unique_user_email_ci can't be created:\n" + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='unique_user_email_ci'),
+        ),
+    ]
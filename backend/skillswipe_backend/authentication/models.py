@@ -1,6 +1,7 @@
 import uuid
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 
@@ -65,6 +66,14 @@ class User(AbstractUser):
             models.Index(fields=['status', 'last_ping'], name='idx_user_status_ping'),
             models.Index(fields=['role', 'status'], name='idx_user_role_status'),
         ]
+        constraints = [
+            # Case-insensitive email uniqueness; also the login lookup index
+            models.UniqueConstraint(
+                Lower('email'),
+                condition=~models.Q(email=''),
+                name='unique_user_email_ci'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.role})"
@@ -79,10 +88,18 @@ class User(AbstractUser):
         """Check if user is a company user"""
         return self.role == 'company'
     
+    @classmethod
+    def by_email(cls, email):
+        """Case-insensitive email lookup that uses unique_user_email_ci"""
+        return cls.objects.alias(email_lower=Lower('email')).exclude(email='').filter(
+            email_lower=email.strip().lower()
+        )
+    
     def update_last_ping(self):
-        """Update last ping timestamp"""
+        """Update last ping timestamp (buffered; see authentication/pings.py)"""
+        from .pings import record_ping
         self.last_ping = timezone.now()
-        self.save(update_fields=['last_ping'])
+        record_ping(self.pk, self.last_ping)
     
     def mark_inactive(self):
         """Mark user as inactive"""
@@ -95,4 +112,50 @@ class User(AbstractUser):
     
     def days_since_profile_update(self):
         """Calculate days since last profile update"""
-        return (timezone.now() - self.last_profile_update).days
\ No newline at end of file
+        return (timezone.now() - self.last_profile_update).days
+
+class ProfileReviewReminder(models.Model):
+    """
+    Users whose profile is due for a review (see PROFILE_REVIEW_AFTER_DAYS).
+    Filled by `manage.py sweep_users`; whatever sends the reminder sets sent_at.
+    """
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile_review_reminder'
+    )
+    
+    # The profile update the reminder is about; a newer one resets the reminder
+    profile_updated_at = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'profile_review_reminder'
+        indexes = [
+            models.Index(fields=['sent_at', 'created_at'], name='idx_reminder_unsent'),
+        ]
+    
+    def __str__(self):
+        return f"Review reminder for {self.user_id}"
+
+
+class SweepWatermark(models.Model):
+    """
+    Resumable position of a `manage.py sweep_users` pass over
+    idx_user_status_ping, as a (last_ping, id) keyset.
+    """
+    
+    name = models.CharField(max_length=50, primary_key=True)
+    last_ping = models.DateTimeField(blank=True, null=True)
+    last_id = models.UUIDField(blank=True, null=True)
+    cycle_started_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'sweep_watermark'
+    
+    def __str__(self):
+        return f"{self.name} @ {self.last_ping}"
@@ -0,0 +1,157 @@
+"""
+Coalesced last_ping writes.
+
+Heartbeats are recorded in a per-process buffer (user id -> latest ping) and
+a background thread writes them with one UPDATE ... FROM (VALUES ...) per
+batch. A ping reaches the database within PING_FLUSH_INTERVAL seconds, or
+sooner once PING_FLUSH_BATCH_SIZE users are waiting. Pings still buffered
+when the process is killed are lost; the next heartbeat replaces them.
+PING_FLUSH_INTERVAL = 0 writes through immediately.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from .backends import bump_auth_version
+from .models import User
+from swipes import dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = {}
+_wake = threading.Event()
+_flusher_pid = None
+
+
+def flush_interval():
+    return getattr(settings, 'PING_FLUSH_INTERVAL', 60)
+
+
+def batch_size():
+    return getattr(settings, 'PING_FLUSH_BATCH_SIZE', 1000)
+
+
+def record_ping(user_id, when):
+    """Buffer a ping; the database is written by the flusher thread"""
+    if flush_interval() <= 0:
+        write_pings({user_id: when})
+        return
+
+    _ensure_flusher()
+    with _lock:
+        current = _pending.get(user_id)
+        if current is None or when > current:
+            _pending[user_id] = when
+        full = len(_pending) >= batch_size()
+    if full:
+        _wake.set()
+
+
+async def arecord_ping(user_id, when):
+    """record_ping for async views"""
+    if flush_interval() <= 0:
+        await sync_to_async(write_pings)({user_id: when})
+    else:
+        record_ping(user_id, when)
+
+
+def write_pings(pings):
+    """Write {user_id: timestamp} in batches; never moves last_ping backwards"""
+    items = sorted(pings.items(), key=lambda item: str(item[0]))
+    size = batch_size()
+    updated = 0
+    for start in range(0, len(items), size):
+        chunk = items[start:start + size]
+        params = []
+        for user_id, when in chunk:
+            params += [str(user_id), when]
+        with connection.cursor() as cursor:
+            # updated_at is left alone on purpose: a heartbeat isn't an edit.
+            # A ping also reactivates users the sweeper marked inactive; the
+            # CTE reads the pre-update snapshot to report which ones.
+            cursor.execute(
+                f"""
+                WITH v (id, ts) AS (
+                    VALUES {', '.join(['(%s::uuid, %s::timestamptz)'] * len(chunk))}
+                ),
+                reactivated AS (
+                    SELECT u.id FROM {User._meta.db_table} u JOIN v ON v.id = u.id
+                    WHERE u.status = 'inactive'
+                )
+                UPDATE {User._meta.db_table} AS u
+                SET last_ping = v.ts,
+                    status = CASE WHEN u.status = 'inactive' THEN 'active' ELSE u.status END
+                FROM v
+                WHERE u.id = v.id AND u.last_ping < v.ts
+                RETURNING u.id, u.id IN (SELECT id FROM reactivated)
+                """,
+                params
+            )
+            rows = cursor.fetchall()
+        updated += len(rows)
+        
+        # Cached auth users carry the status, and so do cached dashboard cards
+        reactivated = [user_id for user_id, was_inactive in rows if was_inactive]
+        for user_id in reactivated:
+            bump_auth_version(user_id)
+        if reactivated:
+            dashboard_cache.bump_content()
+    return updated
+
+
+def flush_pings():
+    """Write everything buffered in this process; returns rows updated"""
+    with _lock:
+        if not _pending:
+            return 0
+        pings = dict(_pending)
+        _pending.clear()
+
+    try:
+        return write_pings(pings)
+    except Exception:
+        # Put them back unless a newer ping arrived meanwhile
+        with _lock:
+            for user_id, when in pings.items():
+                if user_id not in _pending or _pending[user_id] < when:
+                    _pending[user_id] = when
+        raise
+
+
+def _run_flusher():
+    while True:
+        _wake.wait(timeout=flush_interval())
+        _wake.clear()
+        try:
+            flush_pings()
+        except Exception:
+            logger.exception("Ping flush failed")
+        finally:
+            # Don't hold an idle connection between flushes
+            connection.close()
+
+
+def _ensure_flusher():
+    """Start the flusher thread once per process (again after a fork)"""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_run_flusher, name='ping-flusher', daemon=True).start()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush_pings()
+    except Exception:
+        pass
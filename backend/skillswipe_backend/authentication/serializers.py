@@ -15,7 +15,7 @@ class CustomUserCreateSerializer(UserCreateSerializer):
         fields = ('id', 'username', 'email', 'password', 'role')
 
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if User.by_email(value).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value
 
@@ -0,0 +1,47 @@
+"""
+Auth cache invalidation on user, membership and profile changes, and
+bookkeeping for the refresh-token blacklist filter.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .backends import bump_auth_version
+from .models import User
+from .tokens import bloom_enabled, record_blacklisted
+from profiles.models import CompanyUsers, DeveloperProfile
+
+
+# Saves limited to these fields don't change anything authentication relies on
+ACTIVITY_FIELDS = {'last_ping', 'last_login', 'last_profile_update', 'updated_at'}
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= ACTIVITY_FIELDS:
+        return
+    bump_auth_version(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CompanyUsers)
+def membership_changed(sender, instance, **kwargs):
+    bump_auth_version(instance.user_id)
+
+
+@receiver(post_save, sender=DeveloperProfile)
+def developer_profile_created(sender, instance, created, **kwargs):
+    # Only the profile ID is cached, so plain edits don't matter
+    if created:
+        bump_auth_version(instance.user_id)
+
+
+@receiver(post_delete, sender=DeveloperProfile)
+def developer_profile_deleted(sender, instance, **kwargs):
+    bump_auth_version(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, created, **kwargs):
+    if created and bloom_enabled():
+        record_blacklisted(instance.token.jti, instance.token.expires_at)
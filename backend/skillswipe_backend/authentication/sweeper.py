@@ -0,0 +1,124 @@
+"""
+Set-based enforcement of the inactivity and profile-review rules.
+
+mark_inactive_chunk() flips one chunk of active users whose last_ping is
+older than INACTIVE_AFTER_DAYS to 'inactive' with a single UPDATE. Updated
+rows leave the status='active' range of idx_user_status_ping, so repeating
+it until it returns 0 is naturally resumable.
+
+collect_reminders_chunk() walks active users in (last_ping, id) order over
+the same index and upserts those whose profile is older than
+PROFILE_REVIEW_AFTER_DAYS into profile_review_reminder. Its position is kept
+in sweep_watermark, so an interrupted pass resumes where it stopped.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .backends import bump_auth_version
+from .models import User, ProfileReviewReminder, SweepWatermark
+from swipes import dashboard_cache
+
+REMINDER_WATERMARK = 'profile_review'
+
+# Give way to row locks held by request traffic instead of queueing behind them
+LOCK_TIMEOUT = '1s'
+
+
+def _set_lock_timeout(cursor):
+    cursor.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+
+
+def mark_inactive_chunk(chunk_size, now=None):
+    """Mark one chunk of long-silent users inactive; returns rows updated"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=getattr(settings, 'INACTIVE_AFTER_DAYS', 30))
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            _set_lock_timeout(cursor)
+            # SKIP LOCKED: users being written by a request right now are left for the next run
+            cursor.execute(
+                f"""
+                UPDATE {User._meta.db_table} SET status = 'inactive'
+                WHERE id IN (
+                    SELECT id FROM {User._meta.db_table}
+                    WHERE status = 'active' AND last_ping < %s
+                    ORDER BY last_ping
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id
+                """,
+                [cutoff, chunk_size]
+            )
+            user_ids = [row[0] for row in cursor.fetchall()]
+
+        # Cached auth users carry the status, and so do cached dashboard cards
+        for user_id in user_ids:
+            bump_auth_version(user_id)
+        if user_ids:
+            dashboard_cache.bump_content()
+
+    return len(user_ids)
+
+
+def collect_reminders_chunk(chunk_size, now=None):
+    """
+    Scan the next chunk of active users and record review reminders.
+    Returns (users scanned, reminders recorded); (0, 0) ends a full pass.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=getattr(settings, 'PROFILE_REVIEW_AFTER_DAYS', 90))
+
+    with transaction.atomic():
+        # Row lock keeps two sweepers from scanning the same chunk
+        watermark, _ = SweepWatermark.objects.select_for_update().get_or_create(name=REMINDER_WATERMARK)
+
+        if watermark.cycle_started_at is None:
+            watermark.cycle_started_at = now
+        # Users who ping during the pass move past its end; the next pass picks them up
+        users = User.objects.filter(status='active', last_ping__lte=watermark.cycle_started_at)
+        if watermark.last_ping is not None:
+            users = users.filter(
+                Q(last_ping__gt=watermark.last_ping) |
+                Q(last_ping=watermark.last_ping, id__gt=watermark.last_id)
+            )
+        rows = list(
+            users.order_by('last_ping', 'id')
+            .values_list('id', 'last_ping', 'last_profile_update')[:chunk_size]
+        )
+
+        if not rows:
+            # Pass complete; the next call starts a new one from the beginning
+            watermark.last_ping = watermark.last_id = None
+            watermark.cycle_started_at = None
+            watermark.save()
+            return 0, 0
+
+        due = [(user_id, updated) for user_id, _, updated in rows if updated < cutoff]
+        if due:
+            with connection.cursor() as cursor:
+                _set_lock_timeout(cursor)
+                # A reminder already recorded for the same profile version is kept as is
+                cursor.execute(
+                    f"""
+                    INSERT INTO {ProfileReviewReminder._meta.db_table} AS r
+                        (user_id, profile_updated_at, created_at, sent_at)
+                    VALUES {', '.join(['(%s, %s, %s, NULL)'] * len(due))}
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        profile_updated_at = EXCLUDED.profile_updated_at,
+                        created_at = EXCLUDED.created_at,
+                        sent_at = NULL
+                    WHERE r.profile_updated_at <> EXCLUDED.profile_updated_at
+                    """,
+                    [value for user_id, updated in due for value in (user_id, updated, now)]
+                )
+
+        watermark.last_id, watermark.last_ping = rows[-1][0], rows[-1][1]
+        watermark.save()
+
+    return len(rows), len(due)
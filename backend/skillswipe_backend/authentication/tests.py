@@ -1,3 +1,347 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from jobs.models import JobPosting, Wishlist
+from profiles.models import CompanyProfile, CompanyUsers, DeveloperProfile
+from skillswipe_backend import synthetic
+from swipes.models import Match, MatchParticipant, SwipeActions, UserActivityCounters
+
+from . import pings, tokens, views
+from .backends import AUTH_USER_FIELDS, CachedJWTAuthentication, _user_key, _version_key
+
+User = get_user_model()
+
+
+class PruneTokensTests(TestCase):
+    """prune_tokens deletes every expired token, wherever it sits in primary-key order"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('developer', 'developer@example.com', 'password', role='developer')
+
+    def _token(self, n, expires_in):
+        return OutstandingToken.objects.create(
+            user=self.user, jti=f'jti-{n}', token=f'token-{n}', expires_at=timezone.now() + expires_in
+        )
+
+    def test_expired_tokens_after_an_unexpired_chunk_are_deleted(self):
+        # A long-lived token issued first, then a run of tokens that have since expired
+        kept = [self._token(n, timedelta(days=30)) for n in range(3)]
+        expired = [self._token(n, -timedelta(days=2)) for n in range(3, 8)]
+        BlacklistedToken.objects.create(token=expired[-1])
+        BlacklistedToken.objects.create(token=kept[0])
+
+        call_command('prune_tokens', chunk_size=2, sleep=0, stdout=StringIO())
+
+        self.assertEqual(set(OutstandingToken.objects.values_list('id', flat=True)), {token.id for token in kept})
+        self.assertEqual(list(BlacklistedToken.objects.values_list('token_id', flat=True)), [kept[0].id])
+
+
+class SweepUsersTests(SimpleTestCase):
+    def setUp(self):
+        patch = mock.patch('authentication.management.commands.sweep_users.time.sleep')
+        self.sleep = patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_persistent_failure_exits_non_zero(self):
+        with mock.patch('authentication.management.commands.sweep_users.mark_inactive_chunk',
+                        side_effect=OperationalError('could not connect')) as chunk:
+            with self.assertRaisesMessage(CommandError, '3 chunks failed in a row'):
+                call_command('sweep_users', max_failures=3, skip_reminders=True, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(chunk.call_count, 3)
+
+    def test_failure_count_resets_after_a_chunk_succeeds(self):
+        timeout = OperationalError('lock timeout')
+        with mock.patch('authentication.management.commands.sweep_users.mark_inactive_chunk',
+                        side_effect=[timeout, timeout, 10, timeout, timeout, 0]):
+            call_command('sweep_users', max_failures=3, skip_reminders=True, stdout=StringIO(), stderr=StringIO())
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives_and_error_rate_near_target(self):
+        bloom = tokens.BloomFilter(10000, error_rate=0.01)
+        for n in range(10000):
+            bloom.add(f'member-{n}')
+
+        self.assertTrue(all(f'member-{n}' in bloom for n in range(10000)))
+        false_positives = sum(f'other-{n}' in bloom for n in range(10000))
+        self.assertLess(false_positives, 200)
+
+
+@override_settings(TOKEN_BLACKLIST_BLOOM=True)
+class BloomRefreshTokenTests(TestCase):
+    """The refresh blacklist check, with the filter in front of the database"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('developer', 'developer@example.com', 'password', role='developer')
+        self.blacklisted = tokens.BloomRefreshToken.for_user(self.user)
+        self.blacklisted.blacklist()
+        self._use_fresh_filter()
+        self.addCleanup(tokens._state.update, {'filter': None, 'built_at': 0.0})
+
+    def _use_fresh_filter(self):
+        # Built here rather than on the background thread
+        tokens._state.update({'filter': tokens.build_blacklist_filter(), 'built_at': time.monotonic()})
+
+    def test_filter_miss_skips_the_database(self):
+        token = tokens.BloomRefreshToken.for_user(self.user)
+        with self.assertNumQueries(0):
+            token.check_blacklist()
+
+    def test_blacklisted_token_is_rejected(self):
+        with self.assertRaises(TokenError):
+            self.blacklisted.check_blacklist()
+
+    def test_token_blacklisted_after_the_filter_was_built_is_rejected(self):
+        token = tokens.BloomRefreshToken.for_user(self.user)
+        token.blacklist()
+        # The snapshot another process still holds, from before the blacklisting
+        tokens._state['filter'] = tokens.BloomFilter(1000)
+        with self.assertRaises(TokenError):
+            token.check_blacklist()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """The auth cache holds only auth fields and drops them when the user changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('company', 'company@example.com', 'password', role='company')
+        self.token = AccessToken.for_user(self.user)
+        self.backend = CachedJWTAuthentication()
+
+    def _get_user(self):
+        return self.backend.get_user(self.token)
+
+    def _save(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            for field, value in fields.items():
+                setattr(self.user, field, value)
+            self.user.save()
+
+    def test_hit_rebuilds_the_user_without_the_password(self):
+        self._get_user()
+
+        with self.assertNumQueries(0):
+            user = self._get_user()
+        self.assertEqual((user.pk, user.role, user.is_active), (self.user.pk, 'company', True))
+        self.assertEqual(user.get_deferred_fields(), {
+            field.attname for field in User._meta.concrete_fields if field.attname not in AUTH_USER_FIELDS
+        })
+        entry = cache.get(_user_key(self.user.pk, cache.get(_version_key(self.user.pk))))
+        self.assertNotIn(self.user.password, str(entry))
+        # Deferred fields load on access
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+
+    def test_user_update_invalidates_the_entry(self):
+        self._get_user()
+        self._save(email='new@example.com')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get_user().email, 'new@example.com')
+
+    def test_deactivation_invalidates_the_entry(self):
+        self._get_user()
+        self._save(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            self._get_user()
+
+    def test_membership_change_invalidates_the_entry(self):
+        self.assertEqual(self._get_user().auth_context['memberships'], {})
+        company = CompanyProfile.objects.create(created_by_user=self.user, name='Company', location='Pune')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyUsers.objects.create(user=self.user, company=company, role='admin')
+
+        self.assertEqual(self._get_user().auth_context['memberships'], {company.id: 'admin'})
+
+
+class LoginViewTests(TestCase):
+    """The async login view, with hashing on the login pool"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('developer', 'Developer@example.com', 'password', role='developer')
+
+    async def _login(self, email, password):
+        return await self.async_client.post(
+            reverse('custom-login'), {'email': email, 'password': password}, content_type='application/json'
+        )
+
+    async def test_success_with_any_email_case(self):
+        response = await self._login('developer@EXAMPLE.com', 'password')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['user']['id'], str(self.user.id))
+        self.assertIn('access', body)
+
+    async def test_wrong_password(self):
+        response = await self._login('developer@example.com', 'wrong')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_inactive_user(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        response = await self._login('developer@example.com', 'password')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_full_queue_gives_503(self):
+        with mock.patch.object(views, '_hash_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = await self._login('developer@example.com', 'password')
+            slots.release()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    async def test_slot_is_released_after_hashing(self):
+        with mock.patch.object(views, '_hash_slots', threading.BoundedSemaphore(1)) as slots:
+            await self._login('developer@example.com', 'wrong')
+            response = await self._login('developer@example.com', 'password')
+            self.assertTrue(slots.acquire(blocking=False))
+
+        self.assertEqual(response.status_code, 200)
+
+
+class EmailConstraintMigrationTests(TestCase):
+    """Migration 0002 reports case-insensitive duplicate emails before adding the constraint"""
+
+    def test_duplicates_are_reported(self):
+        constraint = next(c for c in User._meta.constraints if c.name == 'unique_user_email_ci')
+        # Rolled back with the test transaction
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(User, constraint)
+        User.objects.create_user('first', 'Same@example.com', 'password', role='developer')
+        User.objects.create_user('second', 'same@example.com', 'password', role='developer')
+        User.objects.create_user('other', 'other@example.com', 'password', role='developer')
+
+        migration = import_module('authentication.migrations.0002_user_email_ci')
+        with self.assertRaisesMessage(RuntimeError, 'same@example.com: first <Same@example.com>'):
+            migration.check_duplicate_emails(apps, None)
+
+    def test_no_duplicates_passes(self):
+        User.objects.create_user('first', 'first@example.com', 'password', role='developer')
+
+        migration = import_module('authentication.migrations.0002_user_email_ci')
+        migration.check_duplicate_emails(apps, None)
+
+
+class SeedSyntheticTests(TestCase):
+    """seed_synthetic --replace drops only the synthetic users and what hangs off them"""
+
+    def test_replace_keeps_real_users(self):
+        # A real account with the name the synthetic users used to get
+        real = User.objects.create_user('developer0', 'developer0@example.com', 'password', role='developer')
+        options = {'developers': 4, 'companies': 2, 'seed': 1, 'stdout': StringIO()}
+        call_command('seed_synthetic', **options)
+        counts = (User.objects.count(), SwipeActions.objects.count(), Match.objects.count(),
+                  JobPosting.objects.count())
+
+        with self.assertRaises(CommandError):
+            call_command('seed_synthetic', **options)
+        call_command('seed_synthetic', replace=True, **options)
+
+        self.assertEqual((User.objects.count(), SwipeActions.objects.count(), Match.objects.count(),
+                          JobPosting.objects.count()), counts)
+        self.assertTrue(User.objects.filter(pk=real.pk).exists())
+
+    def test_delete_leaves_no_rows_behind(self):
+        synthetic.generate(developers=4, companies=2, seed=1)
+
+        self.assertGreater(synthetic.delete_synthetic(), 0)
+
+        for model in (User, CompanyProfile, CompanyUsers, DeveloperProfile, JobPosting, Wishlist, SwipeActions,
+                      Match, MatchParticipant, UserActivityCounters):
+            self.assertFalse(model.objects.exists(), model.__name__)
+
+
+@override_settings(PING_FLUSH_INTERVAL=60, PING_FLUSH_BATCH_SIZE=1000)
+class PingBufferTests(TestCase):
+    """Heartbeats are coalesced in memory and written in one UPDATE per batch"""
+
+    def setUp(self):
+        pings._pending.clear()
+        self.addCleanup(pings._pending.clear)
+        # Flushed by the test, not the background thread
+        patcher = mock.patch.object(pings, '_ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.users = [
+            User.objects.create_user(f'developer{n}', f'developer{n}@example.com', 'password', role='developer')
+            for n in range(2)
+        ]
+        self.now = timezone.now()
+
+    def _last_ping(self, user):
+        return User.objects.values_list('last_ping', 'status').get(pk=user.pk)
+
+    def test_pings_collapse_into_one_update(self):
+        for minutes in (1, 3, 2):
+            pings.record_ping(self.users[0].pk, self.now + timedelta(minutes=minutes))
+        pings.record_ping(self.users[1].pk, self.now + timedelta(minutes=1))
+        self.assertEqual(len(pings._pending), 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(pings.flush_pings(), 2)
+
+        self.assertEqual(self._last_ping(self.users[0])[0], self.now + timedelta(minutes=3))
+        self.assertEqual(self._last_ping(self.users[1])[0], self.now + timedelta(minutes=1))
+        self.assertEqual(pings._pending, {})
+
+    def test_older_ping_never_moves_last_ping_back(self):
+        User.objects.filter(pk=self.users[0].pk).update(last_ping=self.now)
+        pings.record_ping(self.users[0].pk, self.now - timedelta(minutes=5))
+
+        self.assertEqual(pings.flush_pings(), 0)
+        self.assertEqual(self._last_ping(self.users[0])[0], self.now)
+
+    def test_flush_reactivates_an_inactive_user(self):
+        User.objects.filter(pk=self.users[0].pk).update(status='inactive', last_ping=self.now - timedelta(days=60))
+        pings.record_ping(self.users[0].pk, self.now)
+
+        with mock.patch.object(pings, 'bump_auth_version') as bump:
+            pings.flush_pings()
+
+        self.assertEqual(self._last_ping(self.users[0]), (self.now, 'active'))
+        bump.assert_called_once_with(self.users[0].pk)
+
+    def test_failed_flush_keeps_the_pings(self):
+        pings.record_ping(self.users[0].pk, self.now)
+
+        with mock.patch.object(pings, 'write_pings', side_effect=OperationalError), \
+                self.assertRaises(OperationalError):
+            pings.flush_pings()
+
+        self.assertEqual(pings._pending, {self.users[0].pk: self.now})
+
+    def test_pending_pings_are_flushed_at_exit(self):
+        pings.record_ping(self.users[0].pk, self.now + timedelta(minutes=1))
+
+        pings._flush_on_exit()
+
+        self.assertEqual(self._last_ping(self.users[0])[0], self.now + timedelta(minutes=1))
+        self.assertEqual(pings._pending, {})
+
+    def test_exit_flush_swallows_errors(self):
+        pings.record_ping(self.users[0].pk, self.now)
+
+        with mock.patch.object(pings, 'write_pings', side_effect=OperationalError):
+            pings._flush_on_exit()
@@ -0,0 +1,136 @@
+"""
+Bloom filter in front of the refresh-token blacklist check.
+
+With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION almost every refresh
+presents a token that is *not* blacklisted, yet simplejwt queries the
+blacklist for each one. The filter answers "definitely not blacklisted"
+from memory for most of them.
+
+A filter snapshot can't see tokens blacklisted after it was built, in this
+or any other process. Every new blacklisting is therefore also recorded in
+the shared cache until the token's own expiry. A token counts as not
+blacklisted only when the filter misses AND there is no cache record; a
+filter hit falls through to the database as before. This needs a shared
+cache backend that doesn't evict those keys early, so it is opt-in via
+TOKEN_BLACKLIST_BLOOM.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def bloom_enabled():
+    return getattr(settings, 'TOKEN_BLACKLIST_BLOOM', False)
+
+
+def _recent_key(jti):
+    return f'token_blacklist:{jti}'
+
+
+def record_blacklisted(jti, expires_at):
+    """Remember a new blacklisting in the shared cache until the token expires"""
+    remaining = int((expires_at - timezone.now()).total_seconds()) + 1
+    if remaining > 0:
+        cache.set(_recent_key(jti), True, timeout=remaining)
+    with _state_lock:
+        if _state['filter'] is not None:
+            _state['filter'].add(jti)
+
+
+_state_lock = threading.Lock()
+_state = {'filter': None, 'built_at': 0.0, 'building': False}
+
+
+def build_blacklist_filter():
+    """Build a filter over every unexpired blacklisted jti"""
+    blacklisted = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+    # Headroom so tokens blacklisted before the next rebuild don't push up the error rate
+    bloom = BloomFilter(
+        int(blacklisted.count() * 1.2) + 1000,
+        getattr(settings, 'TOKEN_BLACKLIST_BLOOM_ERROR_RATE', 0.001)
+    )
+    for jti in blacklisted.values_list('token__jti', flat=True).iterator(chunk_size=10000):
+        bloom.add(jti)
+    return bloom
+
+
+def _rebuild():
+    from django.db import connection
+    try:
+        started = time.monotonic()
+        bloom = build_blacklist_filter()
+        with _state_lock:
+            _state['filter'], _state['built_at'] = bloom, started
+    except Exception:
+        logger.exception("Blacklist filter rebuild failed")
+    finally:
+        with _state_lock:
+            _state['building'] = False
+        connection.close()
+
+
+def current_filter():
+    """The current filter (None until the first build); starts a background rebuild when stale"""
+    interval = getattr(settings, 'TOKEN_BLACKLIST_BLOOM_REBUILD_SECONDS', 600)
+    with _state_lock:
+        stale = time.monotonic() - _state['built_at'] > interval
+        if stale and not _state['building']:
+            _state['building'] = True
+            threading.Thread(target=_rebuild, name='blacklist-bloom', daemon=True).start()
+        return _state['filter']
+
+
+class BloomRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check skips the database for filter misses"""
+
+    def check_blacklist(self):
+        if bloom_enabled():
+            jti = self.payload[api_settings.JTI_CLAIM]
+            bloom = current_filter()
+            if bloom is not None and jti not in bloom:
+                if cache.get(_recent_key(jti)):
+                    raise TokenError(_("Token is blacklisted"))
+                return
+        super().check_blacklist()
+
+
+class BloomTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = BloomRefreshToken
@@ -1,52 +1,111 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password, verify_password
+from django.http import JsonResponse
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import threading
 from profiles.utils import get_user_profile_status  # Import shared logic
+from .pings import arecord_ping
+from .tokens import BloomRefreshToken
 
 User = get_user_model()
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def login_view(request):
-    """Custom login view that accepts email"""
-    email = request.data.get('email')
-    password = request.data.get('password')
+# PBKDF2 runs here instead of on the event loop. hashlib releases the GIL, so
+# workers hash in parallel; the pool size caps CPU spent on logins.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.LOGIN_HASH_WORKERS,
+    thread_name_prefix='login-hash'
+)
+# One slot per queued or running hash. A thread-safe semaphore rather than a
+# counter: under WSGI every async view runs its own event loop on a worker thread.
+_hash_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_QUEUE_LIMIT)
+
+
+async def _run_hashing(func, *args):
+    """Run a hashing call on the login pool; None when the queue is full"""
+    if not _hash_slots.acquire(blocking=False):
+        return None
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_slots.release()
+
+
+def _parse_credentials(request):
+    """Read email/password from a JSON or form body"""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = {}
+    else:
+        data = request.POST
+    if not isinstance(data, dict):
+        data = {}
+    return data.get('email'), data.get('password')
+
+
+@csrf_exempt
+@require_POST
+async def login_view(request):
+    """Custom login view that accepts email (async; hashing off the event loop)"""
+    email, password = _parse_credentials(request)
     
     if not email or not password:
-        return Response({
+        return JsonResponse({
             'error': 'Email and password are required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    try:
-        user = User.objects.get(email=email)
-        if user.check_password(password):
-            # Update last ping on login
-            user.update_last_ping()
-            
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'access': str(refresh.access_token),
-                'refresh': str(refresh),
-                'user': {
-                    'id': str(user.id),
-                    'username': user.username,
-                    'email': user.email,
-                    'role': user.role,
-                    'status': user.status
-                }
-            })
-        else:
-            return Response({
-                'error': 'Invalid credentials'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-    except User.DoesNotExist:
-        return Response({
+    user = await User.by_email(email).afirst()
+    
+    # Hash even for unknown emails so response time doesn't reveal which exist
+    encoded = user.password if user else ''
+    result = await _run_hashing(verify_password, password, encoded)
+    if result is None:
+        response = JsonResponse({
+            'error': 'Too many login attempts in progress, retry shortly'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = '1'
+        return response
+    
+    is_correct, must_update = result
+    if not user or not is_correct or not user.is_active:
+        return JsonResponse({
             'error': 'Invalid credentials'
         }, status=status.HTTP_401_UNAUTHORIZED)
+    
+    if must_update:
+        # Hasher settings changed since this password was stored
+        user.password = await _run_hashing(make_password, password) or user.password
+        await user.asave(update_fields=['password'])
+    
+    # Update last ping on login (buffered, no DB write here)
+    user.last_ping = timezone.now()
+    await arecord_ping(user.pk, user.last_ping)
+    
+    refresh = await sync_to_async(RefreshToken.for_user)(user)
+    return JsonResponse({
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+        'user': {
+            'id': str(user.id),
+            'username': user.username,
+            'email': user.email,
+            'role': user.role,
+            'status': user.status
+        }
+    })
 
 
 @api_view(['GET'])
@@ -86,7 +145,7 @@ def logout_view(request):
                 'error': 'Refresh token is required'
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        token = RefreshToken(refresh_token)
+        token = BloomRefreshToken(refresh_token)
         token.blacklist()
         
         return Response({
@@ -0,0 +1,103 @@
+"""
+Per-job and per-company funnel analytics.
+
+Funnel events are added to job_daily_stats rows as they happen, and reports
+read those rows back without touching swipe_actions or match.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import JobPosting, JobDailyStats
+
+
+FUNNEL_FIELDS = ['impressions', 'right_swipes', 'matches']
+
+
+def record_job_activity(impressions=(), right_swipes=(), matches=(), day=None):
+    """Add funnel events (iterables of job ids) to today's rows in one upsert"""
+    counts = defaultdict(lambda: dict.fromkeys(FUNNEL_FIELDS, 0))
+    for field, job_ids in zip(FUNNEL_FIELDS, (impressions, right_swipes, matches)):
+        for job_id in job_ids:
+            if job_id:
+                counts[str(job_id)][field] += 1
+
+    if not counts:
+        return
+
+    day = day or timezone.now().date()
+    rows, params = [], []
+    # Sorted so concurrent writers lock rows in the same order
+    for job_id in sorted(counts):
+        rows.append("(%s, %s, %s, %s, %s)")
+        params += [job_id, day] + [counts[job_id][field] for field in FUNNEL_FIELDS]
+
+    updates = ', '.join(f"{field} = s.{field} + EXCLUDED.{field}" for field in FUNNEL_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {JobDailyStats._meta.db_table} AS s
+                (job_id, day, {', '.join(FUNNEL_FIELDS)})
+            VALUES {', '.join(rows)}
+            ON CONFLICT (job_id, day) DO UPDATE SET {updates}
+            """,
+            params
+        )
+
+
+def _with_rates(counts):
+    """Add conversion rates to a dict of funnel counts"""
+    impressions = counts['impressions']
+    right_swipes = counts['right_swipes']
+    counts['swipe_rate'] = round(right_swipes / impressions, 4) if impressions else 0.0
+    counts['match_rate'] = round(counts['matches'] / right_swipes, 4) if right_swipes else 0.0
+    return counts
+
+
+def get_funnel(company, days=30, job=None):
+    """
+    Funnel totals, daily buckets and per-job breakdown for a company
+    (or a single job) over the last `days` days.
+    """
+    since = timezone.now().date() - timedelta(days=days - 1)
+
+    jobs = JobPosting.objects.filter(company=company)
+    if job is not None:
+        jobs = jobs.filter(id=job.id)
+    jobs = list(jobs.order_by('-created_at').values('id', 'title', 'status'))
+
+    stats = JobDailyStats.objects.filter(day__gte=since)
+    stats = stats.filter(job=job) if job is not None else stats.filter(job__company=company)
+    rows = stats.values_list('job_id', 'day', *FUNNEL_FIELDS)
+
+    totals = dict.fromkeys(FUNNEL_FIELDS, 0)
+    daily = defaultdict(lambda: dict.fromkeys(FUNNEL_FIELDS, 0))
+    per_job = defaultdict(lambda: dict.fromkeys(FUNNEL_FIELDS, 0))
+
+    # Rows are already one per (job, day); fold them into the three views
+    for job_id, day, *values in rows:
+        for field, value in zip(FUNNEL_FIELDS, values):
+            totals[field] += value
+            daily[day][field] += value
+            per_job[job_id][field] += value
+
+    return {
+        'days': days,
+        'since': since,
+        'totals': _with_rates(totals),
+        'daily': [
+            _with_rates({'day': day, **daily[day]})
+            for day in sorted(daily)
+        ],
+        'jobs': [
+            _with_rates({
+                'job_id': str(job_row['id']),
+                'title': job_row['title'],
+                'status': job_row['status'],
+                **per_job[job_row['id']]
+            })
+            for job_row in jobs
+        ]
+    }
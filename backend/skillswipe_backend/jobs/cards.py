@@ -0,0 +1,47 @@
+"""
+Cached job cards.
+
+The viewer-independent part of JobPostingPublicSerializer is cached per job
+under the tag 'job:<id>'. match_score and is_wishlisted depend on the viewer,
+so they are filled in on every call, with one wishlist query per batch.
+"""
+from types import SimpleNamespace
+
+from skillswipe_backend import tag_cache
+from .models import JobPosting, Wishlist
+from .serializers import JobPostingPublicSerializer
+from .utils import calculate_job_match_score
+
+
+def job_tag(job_id):
+    return f'job:{job_id}'
+
+
+def _load_job_cards(job_ids):
+    jobs = JobPosting.objects.filter(id__in=job_ids).select_related('company')
+    # No request in the context: the viewer fields come out empty and are set per viewer
+    return {card['id']: dict(card) for card in JobPostingPublicSerializer(jobs, many=True).data}
+
+
+def get_job_cards(job_ids, user=None):
+    """Serialized job cards in job_ids order (unknown IDs skipped), personalised for user"""
+    job_ids = [str(job_id) for job_id in job_ids]
+    cached = tag_cache.get_many('card:job', job_ids, lambda job_id: [job_tag(job_id)], _load_job_cards)
+    cards = [dict(cached[job_id]) for job_id in job_ids if job_id in cached]
+
+    if cards and user is not None and user.is_authenticated:
+        wishlisted = {
+            str(job_id) for job_id in Wishlist.objects.filter(
+                user=user, job_post_id__in=[card['id'] for card in cards]
+            ).values_list('job_post_id', flat=True)
+        }
+        profile = None
+        if user.role == 'developer' and hasattr(user, 'developer_profile'):
+            profile = user.developer_profile
+
+        for card in cards:
+            card['is_wishlisted'] = card['id'] in wishlisted
+            # The score only reads plain job fields, all of which are on the card
+            card['match_score'] = calculate_job_match_score(SimpleNamespace(**card), profile) if profile else 0
+
+    return cards
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_alter_profilebookmark_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('impressions', models.PositiveIntegerField(default=0, help_text='Times the job card was served')),
+                ('right_swipes', models.PositiveIntegerField(default=0)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='jobs.jobposting')),
+            ],
+            options={
+                'db_table': 'job_daily_stats',
+                'constraints': [models.UniqueConstraint(fields=('job', 'day'), name='unique_job_day')],
+            },
+        ),
+    ]
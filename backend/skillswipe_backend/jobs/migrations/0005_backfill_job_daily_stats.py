@@ -0,0 +1,45 @@
+# job_daily_stats only counts events from 0004 on. Rebuilds right_swipes and
+# matches per job and day from swipe_actions and match, which hold every
+# event, so it also corrects days that were partly counted live. Impressions
+# were never stored anywhere else and are left as they are.
+
+from django.db import migrations
+
+
+def backfill_job_stats(apps, schema_editor):
+    stats = apps.get_model('jobs', 'JobDailyStats')._meta.db_table
+    swipes = apps.get_model('swipes', 'SwipeActions')._meta.db_table
+    matches = apps.get_model('swipes', 'Match')._meta.db_table
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO {stats} AS s (job_id, day, impressions, right_swipes, matches)
+            SELECT job_id, day, 0, sum(right_swipes), sum(matches)
+            FROM (
+                SELECT job_post_id AS job_id, "timestamp"::date AS day, count(*) AS right_swipes, 0 AS matches
+                FROM {swipes}
+                WHERE job_post_id IS NOT NULL
+                GROUP BY 1, 2
+                UNION ALL
+                SELECT job_post_id, matched_on::date, 0, count(*)
+                FROM {matches}
+                WHERE job_post_id IS NOT NULL
+                GROUP BY 1, 2
+            ) events
+            GROUP BY job_id, day
+            ON CONFLICT (job_id, day) DO UPDATE SET
+                right_swipes = EXCLUDED.right_swipes,
+                matches = EXCLUDED.matches
+        """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_jobdailystats'),
+        ('swipes', '0009_match_job_match_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_job_stats, migrations.RunPython.noop),
+    ]
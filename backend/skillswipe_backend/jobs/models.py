@@ -230,3 +230,31 @@ class Wishlist(models.Model):
             return f"{self.user.username} -> Profile: {self.wishlisted_user.username}"
         return f"{self.user.username} -> Unknown item"
 
+
+
+class JobDailyStats(models.Model):
+    """
+    Per-job, per-day funnel counts: cards served, right swipes and matches.
+    Incremented as events happen so analytics never scan swipe_actions.
+    """
+    
+    job = models.ForeignKey(
+        JobPosting,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    
+    day = models.DateField()
+    
+    impressions = models.PositiveIntegerField(default=0, help_text="Times the job card was served")
+    right_swipes = models.PositiveIntegerField(default=0)
+    matches = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'job_daily_stats'
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'day'], name='unique_job_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id} on {self.day}"
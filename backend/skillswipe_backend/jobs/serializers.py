@@ -35,6 +35,9 @@ class JobPostingSerializer(serializers.ModelSerializer):
 
     def get_total_applicants(self, obj):
         """Get total number of people who swiped on this job"""
+        # Annotated by list views so a page doesn't count per row
+        if hasattr(obj, 'swipe_total'):
+            return obj.swipe_total
         return obj.swipes.count() if hasattr(obj, 'swipes') else 0
 
     def get_is_owner(self, obj):
@@ -155,6 +158,10 @@ class JobPostingPublicSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return False
         
+        # Set by callers that already know which jobs the viewer saved
+        wishlisted = self.context.get('wishlisted_job_ids')
+        if wishlisted is not None:
+            return obj.id in wishlisted
         return Wishlist.objects.filter(user=request.user, job_post=obj).exists()
 
 
@@ -183,7 +190,12 @@ class WishlistSerializer(serializers.ModelSerializer):
     def get_job_post(self, obj):
         """Return complete job data if this is a job wishlist item"""
         if obj.job_post:
-            return JobPostingPublicSerializer(obj.job_post, context=self.context).data
+            context = self.context
+            request = context.get('request')
+            if request is not None and request.user.pk == obj.user_id:
+                # The viewer's own wishlist: no need to look the job up again
+                context = {**context, 'wishlisted_job_ids': {obj.job_post_id}}
+            return JobPostingPublicSerializer(obj.job_post, context=context).data
         return None
     
     def get_wishlisted_user(self, obj):
@@ -191,12 +203,14 @@ class WishlistSerializer(serializers.ModelSerializer):
         if obj.wishlisted_user:
             user = obj.wishlisted_user
             # Return different profile data based on user role
+            # .all() so memberships prefetched by the list view are used
+            memberships = list(user.company_memberships.all()) if user.role == 'company' else []
             if user.role == 'developer' and hasattr(user, 'developer_profile'):
                 from profiles.serializers import DeveloperProfilePublicSerializer
                 return DeveloperProfilePublicSerializer(user.developer_profile, context=self.context).data
-            elif user.role == 'company' and user.company_memberships.exists():
+            elif memberships:
                 from profiles.serializers import CompanyProfilePublicSerializer
-                company_profile = user.company_memberships.first().company
+                company_profile = min(memberships, key=lambda membership: membership.pk).company
                 return CompanyProfilePublicSerializer(company_profile, context=self.context).data
             else:
                 # Fallback to basic user data
@@ -0,0 +1,22 @@
+"""
+Job card cache invalidation.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from skillswipe_backend.tag_cache import invalidate_tags
+from .cards import job_tag
+from .models import JobPosting
+from profiles.models import CompanyProfile
+
+
+@receiver([post_save, post_delete], sender=JobPosting)
+def job_changed(sender, instance, **kwargs):
+    invalidate_tags(job_tag(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def company_changed(sender, instance, **kwargs):
+    # Job cards embed the company's name, about, location and website
+    job_ids = JobPosting.objects.filter(company_id=instance.pk).values_list('id', flat=True)
+    invalidate_tags(*[job_tag(job_id) for job_id in job_ids])
@@ -1,3 +1,143 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from profiles.models import CompanyProfile, DeveloperProfile
+from swipes.models import Match, SwipeActions
+from .analytics import get_funnel, record_job_activity
+from .models import JobDailyStats, JobPosting
+from .utils import calculate_job_match_score, get_average_match_score, store_match_scores
+
+User = get_user_model()
+
+
+class AverageMatchScoreTests(TestCase):
+    """Match scores are stored when a match is made and averaged in SQL"""
+
+    def setUp(self):
+        self.company_user = User.objects.create_user('company', 'company@example.com', 'password', role='company')
+        self.company = CompanyProfile.objects.create(created_by_user=self.company_user, name='Company',
+                                                     location='Pune')
+        self.job = JobPosting.objects.create(
+            company=self.company, created_by=self.company_user, title='Python Engineer', description='Job',
+            job_type='full-time', work_mode='remote', tech_stack=['Python', 'Django'], location='Pune',
+            experience_required='mid', status='active'
+        )
+        self.developers = []
+        for n, (languages, years) in enumerate([(['Python'], 3), (['Go'], 12)]):
+            developer = User.objects.create_user(f'developer{n}', f'developer{n}@example.com', 'password',
+                                                 role='developer')
+            DeveloperProfile.objects.create(user=developer, name=f'Developer {n}', current_location='Pune',
+                                            experience_years=years, top_languages=languages, tools=['Django'])
+            self.developers.append(developer)
+
+    def _match(self, developer):
+        SwipeActions.objects.create(swiper=self.company_user, swiped_on=developer, swipe_type='profile')
+        SwipeActions.objects.create(swiper=developer, swiped_on=self.company_user, job_post=self.job,
+                                    swipe_type='job')
+        match, created = Match.create_if_mutual_swipe(developer, self.company_user, job_post=self.job)
+        self.assertTrue(created)
+        return match
+
+    def expected_score(self, developer):
+        return calculate_job_match_score(self.job, DeveloperProfile.objects.get(user=developer))
+
+    def test_score_is_stored_and_averaged_in_one_query(self):
+        matches = [self._match(developer) for developer in self.developers]
+        scores = [self.expected_score(developer) for developer in self.developers]
+        self.assertEqual([match.job_match_score for match in matches], scores)
+
+        with self.assertNumQueries(1):
+            average = get_average_match_score(self.company)
+        self.assertEqual(average, round(sum(scores) / len(scores), 1))
+
+    def test_backfill_scores_unscored_matches(self):
+        match = self._match(self.developers[0])
+        Match.objects.filter(pk=match.pk).update(job_match_score=None)
+
+        store_match_scores(Match.objects.all(), chunk_size=1)
+
+        match.refresh_from_db()
+        self.assertEqual(match.job_match_score, self.expected_score(self.developers[0]))
+
+    def test_no_matches_averages_to_zero(self):
+        self.assertEqual(get_average_match_score(self.company), 0)
+
+    def test_backfill_migration_scores_like_the_live_code(self):
+        matches = [self._match(developer) for developer in self.developers]
+        Match.objects.update(job_match_score=None)
+
+        migration = import_module('swipes.migrations.0009_match_job_match_score')
+        migration.backfill_scores(apps, None)
+
+        for match, developer in zip(matches, self.developers):
+            match.refresh_from_db()
+            self.assertEqual(match.job_match_score, self.expected_score(developer))
+
+
+class FunnelTests(TestCase):
+    """get_funnel totals agree with swipe_actions and match"""
+
+    def setUp(self):
+        self.company_user = User.objects.create_user('company', 'company@example.com', 'password', role='company')
+        self.company = CompanyProfile.objects.create(created_by_user=self.company_user, name='Company',
+                                                     location='Pune')
+        self.jobs = [
+            JobPosting.objects.create(
+                company=self.company, created_by=self.company_user, title=f'Job {n}', description='Job',
+                job_type='full-time', work_mode='remote', tech_stack=['Python'], location='Pune',
+                experience_required='mid', status='active'
+            )
+            for n in range(2)
+        ]
+        self.developers = []
+        for n in range(3):
+            developer = User.objects.create_user(f'developer{n}', f'developer{n}@example.com', 'password',
+                                                 role='developer')
+            DeveloperProfile.objects.create(user=developer, name=f'Developer {n}', current_location='Pune',
+                                            experience_years=3, top_languages=['Python'], tools=['Django'])
+            self.developers.append(developer)
+
+    def _swipe(self, user, **data):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(reverse('swipe-action'), data, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def _swipe_through_the_api(self):
+        for n, developer in enumerate(self.developers):
+            self._swipe(developer, swipe_type='job', job_id=str(self.jobs[n % 2].id))
+        # Matches the first two developers
+        for developer in self.developers[:2]:
+            self._swipe(self.company_user, swipe_type='profile', target_user_id=str(developer.id))
+
+    def assertTotalsMatchRawTables(self):
+        totals = get_funnel(self.company)['totals']
+        right_swipes = SwipeActions.objects.filter(job_post__company=self.company).count()
+        matches = Match.objects.filter(job_post__company=self.company).count()
+        self.assertEqual((totals['right_swipes'], totals['matches']), (right_swipes, matches))
+        return totals
+
+    def test_live_counts_agree_with_raw_tables(self):
+        self._swipe_through_the_api()
+
+        totals = self.assertTotalsMatchRawTables()
+        self.assertEqual((totals['right_swipes'], totals['matches']), (3, 2))
+
+    def test_backfill_migration_rebuilds_counts_and_keeps_impressions(self):
+        self._swipe_through_the_api()
+        JobDailyStats.objects.all().delete()
+        record_job_activity(impressions=[self.jobs[0].id] * 5)
+
+        migration = import_module('jobs.migrations.0005_backfill_job_daily_stats')
+        migration.backfill_job_stats(apps, SimpleNamespace(connection=connection))
 
-# Create your tests here.
+        totals = self.assertTotalsMatchRawTables()
+        self.assertEqual(totals['impressions'], 5)
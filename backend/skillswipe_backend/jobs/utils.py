@@ -11,11 +11,12 @@ def get_user_company_profile(user):
     if user.role != 'company':
         return None
     
-    try:
-        company_membership = user.company_memberships.first()
-        return company_membership.company if company_membership else None
-    except:
-        return None
+    from authentication.backends import get_auth_context
+    from profiles.models import CompanyProfile
+    
+    # Membership comes from the cached auth context, leaving one profile query
+    company_id = get_auth_context(user)['company_id']
+    return CompanyProfile.objects.filter(pk=company_id).first() if company_id else None
 
 
 def can_user_manage_jobs(user, company=None):
@@ -32,14 +33,59 @@ def can_user_manage_jobs(user, company=None):
         return False, "User must have a company profile to create jobs"
     
     # Check if user has permission to manage jobs for this company
-    try:
-        membership = user.company_memberships.get(company=company)
-        if membership.role in ['admin', 'hr']:
-            return True, ""
-        else:
-            return False, "Only admin or HR can manage jobs"
-    except:
+    from authentication.backends import get_auth_context
+    
+    role = get_auth_context(user)['memberships'].get(company.id)
+    if role is None:
         return False, "User is not associated with this company"
+    if role in ['admin', 'hr']:
+        return True, ""
+    return False, "Only admin or HR can manage jobs"
+
+
+def get_average_match_score(company):
+    """
+    Average job match score across the company's matched developers.
+    Scores are stored on each match when it's made.
+    """
+    from django.db.models import Avg
+    from swipes.models import Match
+    
+    average = Match.objects.filter(job_post__company=company).aggregate(
+        average=Avg('job_match_score')
+    )['average']
+    return round(average, 1) if average is not None else 0
+
+
+def match_job_score(job, user_1, user_2):
+    """
+    Job match score of the developer in a match, or None without a job
+    context or a developer profile.
+    """
+    if job is None:
+        return None
+    developer = user_1 if user_1.role == 'developer' else user_2
+    profile = getattr(developer, 'developer_profile', None)
+    return calculate_job_match_score(job, profile) if profile else None
+
+
+def store_match_scores(matches, chunk_size=1000):
+    """
+    Compute and save job_match_score for a queryset of matches, in chunks.
+    Used by the backfill migration and the synthetic data loader.
+    """
+    matches = matches.filter(job_post__isnull=False).select_related(
+        'job_post', 'user_1__developer_profile', 'user_2__developer_profile'
+    ).order_by('id')
+    last_id = None
+    while True:
+        chunk = list((matches.filter(id__gt=last_id) if last_id else matches)[:chunk_size])
+        if not chunk:
+            break
+        for match in chunk:
+            match.job_match_score = match_job_score(match.job_post, match.user_1, match.user_2)
+        matches.model.objects.bulk_update(chunk, ['job_match_score'])
+        last_id = chunk[-1].id
 
 
 def calculate_job_match_score(job, developer_profile):
@@ -9,13 +9,17 @@ from .serializers import (
     JobPostingSerializer, JobPostingCreateSerializer, JobPostingPublicSerializer,
     WishlistSerializer, WishlistCreateSerializer, JobStatisticsSerializer
 )
-from .utils import get_user_company_profile, can_user_manage_jobs
+from .utils import get_user_company_profile, can_user_manage_jobs, get_average_match_score
+from .cards import get_job_cards
+from .analytics import get_funnel
+from skillswipe_backend.db_router import ReplicaReadsMixin
 
 
-class JobPostingViewSet(viewsets.ModelViewSet):
+class JobPostingViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """ViewSet for job posting management"""
     
     permission_classes = [IsAuthenticated]
+    replica_actions = {'list', 'retrieve', 'statistics', 'analytics', 'job_analytics'}
     
     def get_queryset(self):
         """Optimize queries with select_related"""
@@ -60,7 +64,7 @@ class JobPostingViewSet(viewsets.ModelViewSet):
         if self.is_company_job_management():
             company = get_user_company_profile(request.user)
             if company:
-                queryset = queryset.filter(company=company)
+                queryset = queryset.filter(company=company).annotate(swipe_total=Count('swipes'))
             else:
                 return Response({
                     'message': 'Company profile required',
@@ -79,6 +83,17 @@ class JobPostingViewSet(viewsets.ModelViewSet):
         # Apply filters
         queryset = self._apply_filters(queryset, request)
         
+        # Public cards come from the card cache; only the IDs are queried
+        if self.get_serializer_class() is JobPostingPublicSerializer:
+            page = self.paginate_queryset(queryset.values_list('id', flat=True))
+            if page is not None:
+                return self.get_paginated_response(get_job_cards(page, request.user))
+            cards = get_job_cards(queryset.values_list('id', flat=True), request.user)
+            return Response({
+                'count': len(cards),
+                'results': cards
+            })
+        
         # Pagination and serialization
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -228,20 +243,54 @@ class JobPostingViewSet(viewsets.ModelViewSet):
                 'message': 'Company profile required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        jobs = JobPosting.objects.filter(company=company)
-        
-        stats = {
-            'total_jobs': jobs.count(),
-            'active_jobs': jobs.filter(status='active').count(),
-            'draft_jobs': jobs.filter(status='draft').count(),
-            'closed_jobs': jobs.filter(status='closed').count(),
-            'total_applications': sum(job.swipes.count() for job in jobs if hasattr(job, 'swipes')),
-            'avg_match_score': 0  # This would need actual match data
-        }
+        # One aggregate for all status counts and applications
+        stats = JobPosting.objects.filter(company=company).aggregate(
+            total_jobs=Count('id', distinct=True),
+            active_jobs=Count('id', distinct=True, filter=Q(status='active')),
+            draft_jobs=Count('id', distinct=True, filter=Q(status='draft')),
+            closed_jobs=Count('id', distinct=True, filter=Q(status='closed')),
+            total_applications=Count('swipes', filter=Q(swipes__swipe_type='job'))
+        )
+        stats['avg_match_score'] = get_average_match_score(company)
         
         serializer = JobStatisticsSerializer(stats)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """Get funnel analytics (impressions, right swipes, matches) for company jobs"""
+        company = get_user_company_profile(request.user)
+        if not company:
+            return Response({
+                'message': 'Company profile required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        funnel = get_funnel(company, days=self._analytics_days(request))
+        return Response({'company': company.name, **funnel})
+
+    @action(detail=True, methods=['get'], url_path='analytics', url_name='job-analytics')
+    def job_analytics(self, request, pk=None):
+        """Get funnel analytics for a single job"""
+        job = get_object_or_404(self.get_queryset(), pk=pk)
+        
+        # Check permissions
+        can_manage, error_msg = can_user_manage_jobs(request.user, job.company)
+        if not can_manage:
+            return Response({
+                'message': error_msg
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        funnel = get_funnel(job.company, days=self._analytics_days(request), job=job)
+        return Response({'company': job.company.name, **funnel})
+
+    def _analytics_days(self, request):
+        """Read the ?days= window, clamped to 1-365"""
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = 30
+        return max(1, min(days, 365))
+
 
 class WishlistViewSet(viewsets.ModelViewSet):
     """ViewSet for wishlist management"""
@@ -250,7 +299,9 @@ class WishlistViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Get user's wishlist items"""
-        return Wishlist.objects.filter(user=self.request.user).select_related('job_post', 'job_post__company')
+        return Wishlist.objects.filter(user=self.request.user).select_related(
+            'job_post', 'job_post__company', 'wishlisted_user', 'wishlisted_user__developer_profile'
+        ).prefetch_related('wishlisted_user__company_memberships__company')
     
     def get_serializer_class(self):
         """Return appropriate serializer"""
@@ -0,0 +1,64 @@
+"""
+Cached developer and company cards.
+
+Developer cards are keyed by user ID (what swipes and matches refer to) and
+tagged 'developer:<user_id>'; company cards are tagged 'company:<id>'.
+Neither serializer depends on the viewer, so cached cards are served as is.
+"""
+from skillswipe_backend import tag_cache
+from .models import DeveloperProfile, CompanyProfile, CompanyUsers
+from .serializers import DeveloperProfilePublicSerializer, CompanyProfilePublicSerializer
+
+
+def developer_tag(user_id):
+    return f'developer:{user_id}'
+
+
+def company_tag(company_id):
+    return f'company:{company_id}'
+
+
+def _load_developer_cards(user_ids):
+    profiles = DeveloperProfile.objects.filter(user_id__in=user_ids).select_related('user')
+    return {card['user_id']: dict(card) for card in DeveloperProfilePublicSerializer(profiles, many=True).data}
+
+
+def _load_company_cards(company_ids):
+    # Prefetched members make total_users a length check instead of a COUNT per company
+    companies = CompanyProfile.objects.filter(id__in=company_ids).select_related(
+        'created_by_user'
+    ).prefetch_related('users')
+    return {card['id']: dict(card) for card in CompanyProfilePublicSerializer(companies, many=True).data}
+
+
+def get_developer_cards(user_ids):
+    """Developer cards in user_ids order; users without a developer profile are skipped"""
+    user_ids = [str(user_id) for user_id in user_ids]
+    cached = tag_cache.get_many(
+        'card:developer', user_ids, lambda user_id: [developer_tag(user_id)], _load_developer_cards
+    )
+    return [dict(cached[user_id]) for user_id in user_ids if user_id in cached]
+
+
+def get_company_cards(company_ids):
+    """Company cards in company_ids order; unknown IDs are skipped"""
+    company_ids = [str(company_id) for company_id in company_ids]
+    cached = tag_cache.get_many(
+        'card:company', company_ids, lambda company_id: [company_tag(company_id)], _load_company_cards
+    )
+    return [dict(cached[company_id]) for company_id in company_ids if company_id in cached]
+
+
+def get_company_cards_for_users(user_ids):
+    """{user_id: card of the user's company} for company users; one membership query"""
+    company_by_user = {}
+    # Oldest membership first, matching company_memberships.first()
+    memberships = CompanyUsers.objects.filter(user_id__in=user_ids).order_by('pk').values_list('user_id', 'company_id')
+    for user_id, company_id in memberships:
+        company_by_user.setdefault(str(user_id), str(company_id))
+
+    cards = {card['id']: card for card in get_company_cards(set(company_by_user.values()))}
+    return {
+        user_id: dict(cards[company_id])
+        for user_id, company_id in company_by_user.items() if company_id in cards
+    }
@@ -0,0 +1,43 @@
+"""
+Profile status and card cache invalidation.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from skillswipe_backend.tag_cache import invalidate_tags
+from .cards import developer_tag, company_tag
+from .models import DeveloperProfile, CompanyProfile, CompanyUsers
+from .utils import invalidate_profile_status
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=DeveloperProfile)
+def developer_profile_changed(sender, instance, **kwargs):
+    invalidate_profile_status(instance.user_id)
+    invalidate_tags(developer_tag(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def company_profile_changed(sender, instance, **kwargs):
+    # Every member's status depends on the shared company profile
+    member_ids = list(CompanyUsers.objects.filter(company=instance).values_list('user_id', flat=True))
+    invalidate_profile_status(*member_ids)
+    invalidate_tags(company_tag(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=CompanyUsers)
+def membership_changed(sender, instance, **kwargs):
+    invalidate_profile_status(instance.user_id)
+    # Company cards show the member count
+    invalidate_tags(company_tag(instance.company_id))
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, update_fields=None, **kwargs):
+    # Cards show the username; saves of other specific fields can't change it
+    if update_fields and 'username' not in update_fields:
+        return
+    company_ids = CompanyProfile.objects.filter(created_by_user=instance).values_list('id', flat=True)
+    invalidate_tags(developer_tag(instance.pk), *[company_tag(company_id) for company_id in company_ids])
@@ -1,3 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import CompanyProfile, CompanyUsers, DeveloperProfile
+from .utils import get_user_profile_status
+
+User = get_user_model()
+
+
+class ProfileStatusTests(TestCase):
+    """Profile status is one query on a miss and follows profile and membership changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.developer = User.objects.create_user('developer', 'developer@example.com', 'password',
+                                                  role='developer')
+        self.company_user = User.objects.create_user('company', 'company@example.com', 'password', role='company')
+
+    def _status(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse('profile-status'))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_one_query_on_a_miss_and_none_on_a_hit(self):
+        DeveloperProfile.objects.create(user=self.developer, name='Developer')
+
+        with self.assertNumQueries(1):
+            status = get_user_profile_status(self.developer)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_profile_status(self.developer), status)
+        self.assertEqual((status['has_profile'], status['next_required_step']), (True, 'add_bio'))
+
+    def test_developer_profile_edits_show_up(self):
+        self.assertEqual(self._status(self.developer)['next_required_step'], 'create_developer_profile')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = DeveloperProfile.objects.create(user=self.developer, name='Developer')
+        self.assertEqual(self._status(self.developer)['profile_completion'], 20)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.bio = 'Bio'
+            profile.current_location = 'Pune'
+            profile.experience_years = 3
+            profile.top_languages = ['Python']
+            profile.save()
+        status = self._status(self.developer)
+        self.assertEqual((status['profile_completion'], status['next_required_step']), (100, None))
+
+    def test_company_profile_and_membership_changes_show_up(self):
+        self.assertEqual(self._status(self.company_user)['next_required_step'], 'create_company_profile')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            company = CompanyProfile.objects.create(created_by_user=self.company_user, name='Company')
+            CompanyUsers.objects.create(user=self.company_user, company=company)
+        status = self._status(self.company_user)
+        self.assertEqual((status['has_profile'], status['next_required_step']), (True, 'add_company_about'))
+
+        # An edit to the shared company reaches every member
+        with self.captureOnCommitCallbacks(execute=True):
+            company.about = 'About'
+            company.location = 'Pune'
+            company.save()
+        status = self._status(self.company_user)
+        self.assertEqual((status['profile_completion'], status['next_required_step']), (100, None))
@@ -41,84 +41,113 @@ def calculate_company_profile_completion(company):
     return int((completed_fields / len(required_fields)) * 100)
 
 
+def profile_status_cache_key(user_id):
+    return f'profile_status:{user_id}'
+
+
+def invalidate_profile_status(*user_ids):
+    """Drop cached profile status once the current transaction commits"""
+    from django.core.cache import cache
+    from django.db import transaction
+    
+    keys = [profile_status_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _load_profile_status_user(user_id):
+    """
+    The user with their developer profile and first company in one query.
+    Company fields come from the same membership company_memberships.first() returns.
+    """
+    from django.contrib.auth import get_user_model
+    from django.db.models import Exists, OuterRef, Subquery
+    from .models import CompanyUsers
+    
+    memberships = CompanyUsers.objects.filter(user=OuterRef('pk')).order_by('pk')
+    return get_user_model().objects.select_related('developer_profile').annotate(
+        has_company=Exists(memberships),
+        company_name=Subquery(memberships.values('company__name')[:1]),
+        company_about=Subquery(memberships.values('company__about')[:1]),
+        company_location=Subquery(memberships.values('company__location')[:1]),
+    ).get(pk=user_id)
+
+
+def _developer_next_step(profile):
+    if not profile.name:
+        return "add_name"
+    if not profile.bio:
+        return "add_bio"
+    if not profile.current_location:
+        return "add_location"
+    if not profile.experience_years:
+        return "add_experience"
+    if not profile.top_languages:
+        return "add_skills"
+    return None
+
+
+def _company_next_step(company):
+    if not company.name:
+        return "add_company_name"
+    if not company.about:
+        return "add_company_about"
+    if not company.location:
+        return "add_company_location"
+    return None
+
+
 def get_user_profile_status(user):
     """
     Get comprehensive profile status for any user.
-    Used by authentication APIs.
+    Used by authentication APIs. One query on a miss, cached per user until
+    their profile, company or membership changes.
     """
+    from django.conf import settings
+    from django.core.cache import cache
+    
+    key = profile_status_cache_key(user.pk)
+    status = cache.get(key)
+    if status is not None:
+        return status
+    
+    # Fresh row rather than request.user, which may come from the auth cache
+    user = _load_profile_status_user(user.pk)
+    has_profile = False
+    completion_percentage = 0
+    next_step = 'unknown'
+    
     if user.role == 'developer':
-        # Refresh user from database to get latest related objects
-        user.refresh_from_db()
-        
-        # Try multiple ways to check for profile existence
-        has_profile = False
-        profile = None
-        
-        try:
-            # First try hasattr (fastest)
-            if hasattr(user, 'developer_profile'):
-                profile = user.developer_profile
-                has_profile = True
-            else:
-                # If hasattr fails, try direct database query
-                from .models import DeveloperProfile
-                profile = DeveloperProfile.objects.filter(user=user).first()
-                has_profile = profile is not None
-        except Exception as e:
-            print(f"DEBUG: Error checking developer profile: {e}")
-            has_profile = False
-            
-        if has_profile and profile:
+        profile = getattr(user, 'developer_profile', None)
+        has_profile = profile is not None
+        if has_profile:
             completion_percentage = calculate_developer_profile_completion(profile)
-            
-            # Determine next step
-            next_step = None
-            if completion_percentage < 100:
-                if not profile.name:
-                    next_step = "add_name"
-                elif not profile.bio:
-                    next_step = "add_bio"
-                elif not profile.current_location:
-                    next_step = "add_location"
-                elif not profile.experience_years:
-                    next_step = "add_experience"
-                elif not profile.top_languages:
-                    next_step = "add_skills"
+            next_step = _developer_next_step(profile) if completion_percentage < 100 else None
         else:
-            completion_percentage = 0
             next_step = "create_developer_profile"
     
     elif user.role == 'company':
-        # Refresh user from database to get latest related objects
-        user.refresh_from_db()
+        from .models import CompanyProfile
         
-        has_profile = user.company_memberships.exists()
+        has_profile = user.has_company
         if has_profile:
-            company = user.company_memberships.first().company
+            company = CompanyProfile(
+                name=user.company_name, about=user.company_about, location=user.company_location
+            )
             completion_percentage = calculate_company_profile_completion(company)
-            
-            # Determine next step
-            next_step = None
-            if completion_percentage < 100:
-                if not company.name:
-                    next_step = "add_company_name"
-                elif not company.about:
-                    next_step = "add_company_about"
-                elif not company.location:
-                    next_step = "add_company_location"
+            next_step = _company_next_step(company) if completion_percentage < 100 else None
         else:
-            completion_percentage = 0
             next_step = "create_company_profile"
     
-    print(f"DEBUG: Profile status for {user.username} ({user.role}): has_profile={has_profile}, completion={completion_percentage if 'completion_percentage' in locals() else 0}")
-    
-    return {
+    status = {
         'has_profile': has_profile,
-        'profile_completion': completion_percentage if 'completion_percentage' in locals() else 0,
-        'next_required_step': next_step if 'next_step' in locals() else 'unknown',
+        'profile_completion': completion_percentage,
+        'next_required_step': next_step,
         'user_role': user.role,
         'profile_mandatory': True
     }
+    cache.set(key, status, timeout=getattr(settings, 'PROFILE_STATUS_CACHE_TIMEOUT', 300))
+    return status
 
 
 def check_profile_exists(user):
@@ -5,6 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from .models import DeveloperProfile, CompanyProfile, CompanyUsers
+from authentication.backends import get_auth_context
+from .cards import get_developer_cards, get_company_cards
+from skillswipe_backend.db_router import ReplicaReadsMixin
 from .serializers import (
     DeveloperProfileSerializer, DeveloperProfileCreateSerializer, DeveloperProfilePublicSerializer,
     CompanyProfileSerializer, CompanyProfileCreateSerializer, CompanyProfilePublicSerializer,
@@ -12,10 +15,12 @@ from .serializers import (
 )
 
 
-class DeveloperProfileViewSet(viewsets.ModelViewSet):
+class DeveloperProfileViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """ViewSet for developer profile management"""
     
     permission_classes = [IsAuthenticated]
+    # Browsing other profiles; `me` stays on the primary
+    replica_actions = {'list', 'retrieve'}
     
     def get_queryset(self):
         """Optimize queries with select_related"""
@@ -121,10 +126,11 @@ class DeveloperProfileViewSet(viewsets.ModelViewSet):
         if language:
             queryset = queryset.filter(top_languages__contains=[language])
         
-        serializer = self.get_serializer(queryset, many=True)
+        # Public cards come from the card cache; only the IDs are queried
+        cards = get_developer_cards(queryset.values_list('user_id', flat=True))
         return Response({
-            'count': queryset.count(),
-            'results': serializer.data
+            'count': len(cards),
+            'results': cards
         })
 
     def retrieve(self, request, pk=None):
@@ -137,10 +143,11 @@ class DeveloperProfileViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CompanyProfileViewSet(viewsets.ModelViewSet):
+class CompanyProfileViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     """ViewSet for company profile management"""
     
     permission_classes = [IsAuthenticated]
+    replica_actions = {'list', 'retrieve'}
     
     def get_queryset(self):
         """Optimize queries"""
@@ -161,10 +168,8 @@ class CompanyProfileViewSet(viewsets.ModelViewSet):
         company_id = self.kwargs.get('pk')
         if company_id == 'me' or not company_id:
             return True
-        try:
-            return self.request.user.company_memberships.filter(company_id=company_id).exists()
-        except:
-            return False
+        memberships = get_auth_context(self.request.user)['memberships']
+        return any(str(member_company_id) == str(company_id) for member_company_id in memberships)
 
     def create(self, request):
         """Create company profile"""
@@ -232,7 +237,7 @@ class CompanyProfileViewSet(viewsets.ModelViewSet):
         queryset = self.get_queryset()
         
         # Exclude own company
-        user_companies = request.user.company_memberships.values_list('company_id', flat=True)
+        user_companies = list(get_auth_context(request.user)['memberships'])
         queryset = queryset.exclude(id__in=user_companies)
         
         # Filter by location
@@ -240,10 +245,11 @@ class CompanyProfileViewSet(viewsets.ModelViewSet):
         if location:
             queryset = queryset.filter(location__icontains=location)
         
-        serializer = self.get_serializer(queryset, many=True)
+        # Public cards come from the card cache; only the IDs are queried
+        cards = get_company_cards(queryset.values_list('id', flat=True))
         return Response({
-            'count': queryset.count(),
-            'results': serializer.data
+            'count': len(cards),
+            'results': cards
         })
 
     def retrieve(self, request, pk=None):
@@ -261,7 +267,7 @@ class CompanyProfileViewSet(viewsets.ModelViewSet):
         company = get_object_or_404(self.get_queryset(), pk=pk)
         
         # Check if user is part of this company
-        if not request.user.company_memberships.filter(company=company).exists():
+        if company.id not in get_auth_context(request.user)['memberships']:
             return Response({
                 'message': 'Permission denied'
             }, status=status.HTTP_403_FORBIDDEN)
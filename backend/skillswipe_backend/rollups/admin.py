@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import CompanyDailyRollup, CityDailyRollup, RollupWatermark
+
+
+@admin.register(CompanyDailyRollup)
+class CompanyDailyRollupAdmin(admin.ModelAdmin):
+    """Company daily rollup admin interface"""
+    
+    list_display = ('company', 'day', 'swipes_made', 'swipes_received', 'matches', 'new_jobs')
+    list_filter = ('day',)
+    search_fields = ('company__name',)
+    ordering = ('-day',)
+
+
+@admin.register(CityDailyRollup)
+class CityDailyRollupAdmin(admin.ModelAdmin):
+    """City daily rollup admin interface"""
+    
+    list_display = ('city', 'day', 'swipes', 'matches', 'new_jobs', 'new_developers')
+    list_filter = ('day',)
+    search_fields = ('city',)
+    ordering = ('-day',)
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    """Rollup watermark admin interface"""
+    
+    list_display = ('source', 'last_timestamp', 'updated_at')
+    readonly_fields = ('source', 'last_timestamp', 'last_id', 'updated_at')
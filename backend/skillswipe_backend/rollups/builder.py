@@ -0,0 +1,206 @@
+"""
+Incremental builder for the daily rollup tables.
+
+Each source table is read in (timestamp, id) order starting after its stored
+watermark. A chunk's increments and the watermark advance commit together,
+so a re-run after a crash never counts a row twice. Rows newer than
+now - ROLLUP_LAG_SECONDS are left for the next run to give in-flight
+transactions time to commit. Swipes also stop short of the oldest swipe
+still in the write-behind buffer: the flusher inserts them with their
+original timestamps, which could otherwise land behind the watermark.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CompanyDailyRollup, CityDailyRollup, RollupWatermark
+from jobs.models import JobPosting
+from profiles.models import DeveloperProfile, CompanyUsers
+from swipes.models import SwipeActions, SwipeBuffer, Match
+
+
+def normalize_city(value):
+    """Lowercase and trim a free-text location so it can be grouped"""
+    value = (value or '').strip().lower()
+    return value[:255] or None
+
+
+def _fold_swipes(rows, company_counts, city_counts):
+    """Swipes: received by the job's company, made by the swiper's company"""
+    profile_swipers = {row[2] for row in rows if row[3] == 'profile'}
+    swiper_companies = {}
+    if profile_swipers:
+        memberships = CompanyUsers.objects.filter(
+            user_id__in=profile_swipers
+        ).order_by('pk').values_list('user_id', 'company_id')
+        for user_id, company_id in memberships:
+            swiper_companies.setdefault(user_id, company_id)
+
+    for _, timestamp, swiper_id, swipe_type, company_id, job_location, developer_location in rows:
+        day = timezone.localdate(timestamp)
+        if swipe_type == 'job':
+            if company_id:
+                company_counts[(company_id, day)]['swipes_received'] += 1
+            city = normalize_city(job_location)
+        else:
+            if swiper_id in swiper_companies:
+                company_counts[(swiper_companies[swiper_id], day)]['swipes_made'] += 1
+            city = normalize_city(developer_location)
+        if city:
+            city_counts[(city, day)]['swipes'] += 1
+
+
+def _fold_matches(rows, company_counts, city_counts):
+    """Matches are attributed through their job context"""
+    for _, matched_on, company_id, job_location in rows:
+        day = timezone.localdate(matched_on)
+        if company_id:
+            company_counts[(company_id, day)]['matches'] += 1
+        city = normalize_city(job_location)
+        if city:
+            city_counts[(city, day)]['matches'] += 1
+
+
+def _fold_jobs(rows, company_counts, city_counts):
+    """New job postings per company and per job location"""
+    for _, created_at, company_id, location in rows:
+        day = timezone.localdate(created_at)
+        company_counts[(company_id, day)]['new_jobs'] += 1
+        city = normalize_city(location)
+        if city:
+            city_counts[(city, day)]['new_jobs'] += 1
+
+
+def _fold_developers(rows, company_counts, city_counts):
+    """New developer profiles per current location (or home city)"""
+    for _, created_at, current_location, home_city in rows:
+        city = normalize_city(current_location or home_city)
+        if city:
+            city_counts[(city, timezone.localdate(created_at))]['new_developers'] += 1
+
+
+# source name -> (model, timestamp field, extra columns, fold function)
+SOURCES = {
+    'swipes': (
+        SwipeActions, 'timestamp',
+        ['swiper_id', 'swipe_type', 'job_post__company_id', 'job_post__location',
+         'swiped_on__developer_profile__current_location'],
+        _fold_swipes,
+    ),
+    'matches': (
+        Match, 'matched_on',
+        ['job_post__company_id', 'job_post__location'],
+        _fold_matches,
+    ),
+    'jobs': (
+        JobPosting, 'created_at',
+        ['company_id', 'location'],
+        _fold_jobs,
+    ),
+    'developers': (
+        DeveloperProfile, 'created_at',
+        ['current_location', 'city'],
+        _fold_developers,
+    ),
+}
+
+
+def _increment(model, key_columns, counts):
+    """Add counts ({key tuple: Counter}) onto rollup rows in one upsert"""
+    if not counts:
+        return
+
+    # Every counter column: field defaults aren't database defaults, so a new row needs them all
+    value_columns = [
+        field.column for field in model._meta.concrete_fields
+        if not field.primary_key and field.column not in key_columns
+    ]
+    rows, params = [], []
+    for key in sorted(counts, key=str):
+        rows.append('(' + ', '.join(['%s'] * (len(key_columns) + len(value_columns))) + ')')
+        params += list(key) + [counts[key][column] for column in value_columns]
+
+    updates = ', '.join(f"{column} = r.{column} + EXCLUDED.{column}" for column in value_columns)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {model._meta.db_table} AS r ({', '.join(key_columns + value_columns)})
+            VALUES {', '.join(rows)}
+            ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}
+            """,
+            params
+        )
+
+
+def rollup_chunk(source, chunk_size, upper_bound):
+    """Fold the next chunk of one source into the rollups; returns rows read"""
+    model, timestamp_field, columns, fold = SOURCES[source]
+
+    with transaction.atomic():
+        # Row lock keeps two concurrent runs from folding the same chunk
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(source=source)
+
+        queryset = model.objects.filter(**{f'{timestamp_field}__lte': upper_bound})
+        if watermark.last_timestamp is not None:
+            queryset = queryset.filter(
+                Q(**{f'{timestamp_field}__gt': watermark.last_timestamp}) |
+                Q(**{timestamp_field: watermark.last_timestamp, 'id__gt': watermark.last_id})
+            )
+        rows = list(
+            queryset.order_by(timestamp_field, 'id')
+            .values_list('id', timestamp_field, *columns)[:chunk_size]
+        )
+        if not rows:
+            return 0
+
+        company_counts = defaultdict(Counter)
+        city_counts = defaultdict(Counter)
+        fold(rows, company_counts, city_counts)
+
+        _increment(CompanyDailyRollup, ['company_id', 'day'], company_counts)
+        _increment(CityDailyRollup, ['city', 'day'], city_counts)
+
+        watermark.last_id, watermark.last_timestamp = rows[-1][0], rows[-1][1]
+        watermark.save()
+
+    return len(rows)
+
+
+def _source_upper_bound(source, upper_bound):
+    """Hold swipes back while older ones still wait in the write-behind buffer"""
+    if source != 'swipes':
+        return upper_bound
+    oldest_buffered = SwipeBuffer.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+    if oldest_buffered is None:
+        return upper_bound
+    return min(upper_bound, oldest_buffered - timedelta(microseconds=1))
+
+
+def run_rollup(sources=None, chunk_size=5000, lag_seconds=None):
+    """Bring every source up to now - lag; returns {source: rows read}"""
+    if lag_seconds is None:
+        lag_seconds = getattr(settings, 'ROLLUP_LAG_SECONDS', 300)
+    upper_bound = timezone.now() - timedelta(seconds=lag_seconds)
+
+    processed = {}
+    for source in sources or SOURCES:
+        processed[source] = 0
+        source_bound = _source_upper_bound(source, upper_bound)
+        while True:
+            count = rollup_chunk(source, chunk_size, source_bound)
+            if not count:
+                break
+            processed[source] += count
+    return processed
+
+
+def reset_rollups():
+    """Drop all rollup rows and watermarks so the next run rebuilds from scratch"""
+    with transaction.atomic():
+        CompanyDailyRollup.objects.all().delete()
+        CityDailyRollup.objects.all().delete()
+        RollupWatermark.objects.all().delete()
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from rollups.builder import SOURCES, run_rollup, reset_rollups
+
+
+class Command(BaseCommand):
+    """Incrementally aggregate swipes, matches, jobs and developers into daily rollups"""
+    
+    help = (
+        "Fold rows newer than each source's watermark into company_daily_rollup "
+        "and city_daily_rollup. Safe to re-run; run it from cron every few minutes."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--source', dest='sources', action='append', choices=list(SOURCES),
+                            help="Only roll up this source (can be repeated)")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Source rows folded per transaction")
+        parser.add_argument('--lag-seconds', type=int, default=None,
+                            help="Skip rows newer than this (default: ROLLUP_LAG_SECONDS)")
+        parser.add_argument('--reset', action='store_true',
+                            help="Delete all rollups and watermarks, then rebuild from scratch")
+    
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_rollups()
+            self.stdout.write("Cleared rollups and watermarks")
+        
+        processed = run_rollup(
+            sources=options['sources'],
+            chunk_size=options['chunk_size'],
+            lag_seconds=options['lag_seconds']
+        )
+        
+        for source, count in processed.items():
+            self.stdout.write(f"{source}: {count} new rows")
+        self.stdout.write(self.style.SUCCESS("Rollup complete"))
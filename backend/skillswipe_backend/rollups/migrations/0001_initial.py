@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('source', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('last_id', models.UUIDField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rollup_watermark',
+            },
+        ),
+        migrations.CreateModel(
+            name='CityDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=255)),
+                ('day', models.DateField()),
+                ('swipes', models.PositiveIntegerField(default=0)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('new_jobs', models.PositiveIntegerField(default=0)),
+                ('new_developers', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'city_daily_rollup',
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('city', 'day'), name='unique_city_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CompanyDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('swipes_made', models.PositiveIntegerField(default=0, help_text='Profile swipes by company users')),
+                ('swipes_received', models.PositiveIntegerField(default=0, help_text='Developer swipes on company jobs')),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('new_jobs', models.PositiveIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='profiles.companyprofile')),
+            ],
+            options={
+                'db_table': 'company_daily_rollup',
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('company', 'day'), name='unique_company_day')],
+            },
+        ),
+    ]
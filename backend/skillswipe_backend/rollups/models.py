@@ -0,0 +1,75 @@
+from django.db import models
+from profiles.models import CompanyProfile
+
+
+class CompanyDailyRollup(models.Model):
+    """
+    Daily activity totals per company.
+    Built incrementally by `manage.py rollup`.
+    """
+
+    company = models.ForeignKey(
+        CompanyProfile,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+
+    day = models.DateField()
+
+    swipes_made = models.PositiveIntegerField(default=0, help_text="Profile swipes by company users")
+    swipes_received = models.PositiveIntegerField(default=0, help_text="Developer swipes on company jobs")
+    matches = models.PositiveIntegerField(default=0)
+    new_jobs = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'company_daily_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'day'], name='unique_company_day'),
+        ]
+        ordering = ['day']
+
+    def __str__(self):
+        return f"{self.company_id} on {self.day}"
+
+
+class CityDailyRollup(models.Model):
+    """
+    Daily activity totals per city (normalized job or developer location).
+    Built incrementally by `manage.py rollup`.
+    """
+
+    city = models.CharField(max_length=255)
+    day = models.DateField()
+
+    swipes = models.PositiveIntegerField(default=0)
+    matches = models.PositiveIntegerField(default=0)
+    new_jobs = models.PositiveIntegerField(default=0)
+    new_developers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'city_daily_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'day'], name='unique_city_day'),
+        ]
+        ordering = ['day']
+
+    def __str__(self):
+        return f"{self.city} on {self.day}"
+
+
+class RollupWatermark(models.Model):
+    """
+    Last source row folded into the rollups, per source table.
+    (last_timestamp, last_id) is a keyset position so ties on timestamp are safe.
+    """
+
+    source = models.CharField(max_length=50, primary_key=True)
+    last_timestamp = models.DateTimeField(blank=True, null=True)
+    last_id = models.UUIDField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'rollup_watermark'
+
+    def __str__(self):
+        return f"{self.source} @ {self.last_timestamp}"
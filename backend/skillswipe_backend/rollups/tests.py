@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from profiles.models import CompanyProfile, CompanyUsers, DeveloperProfile
+from swipes import buffer
+from swipes.models import SwipeActions, SwipeBuffer
+from .builder import run_rollup
+from .models import CompanyDailyRollup, RollupWatermark
+
+User = get_user_model()
+
+
+class RollupBuilderTests(TestCase):
+    """Watermarked incremental builds of the daily rollups"""
+
+    def setUp(self):
+        self.company_user = User.objects.create_user('company', 'company@example.com', 'password', role='company')
+        self.company = CompanyProfile.objects.create(created_by_user=self.company_user, name='Company',
+                                                     location='Pune')
+        CompanyUsers.objects.create(user=self.company_user, company=self.company)
+        self.developers = []
+        for n in range(3):
+            developer = User.objects.create_user(f'developer{n}', f'developer{n}@example.com', 'password',
+                                                 role='developer')
+            DeveloperProfile.objects.create(user=developer, name=f'Developer {n}', current_location='Pune')
+            self.developers.append(developer)
+        self.day = timezone.now() - timedelta(days=1)
+
+    def _swipe(self, developer, minutes):
+        swipe = SwipeActions.objects.create(swiper=self.company_user, swiped_on=developer, swipe_type='profile')
+        # auto_now_add: move it back afterwards
+        SwipeActions.objects.filter(pk=swipe.pk).update(timestamp=self.day + timedelta(minutes=minutes))
+        return SwipeActions.objects.get(pk=swipe.pk)
+
+    def _swipes_made(self):
+        rollup = CompanyDailyRollup.objects.filter(company=self.company).first()
+        return rollup.swipes_made if rollup else 0
+
+    def test_watermark_advances_and_rows_are_counted_once(self):
+        self._swipe(self.developers[0], 1)
+        last = self._swipe(self.developers[1], 2)
+
+        self.assertEqual(run_rollup(sources=['swipes'], chunk_size=1, lag_seconds=0), {'swipes': 2})
+        watermark = RollupWatermark.objects.get(source='swipes')
+        self.assertEqual((watermark.last_id, watermark.last_timestamp), (last.id, last.timestamp))
+        self.assertEqual(self._swipes_made(), 2)
+
+        self.assertEqual(run_rollup(sources=['swipes'], lag_seconds=0), {'swipes': 0})
+        self._swipe(self.developers[2], 3)
+        self.assertEqual(run_rollup(sources=['swipes'], lag_seconds=0), {'swipes': 1})
+        self.assertEqual(self._swipes_made(), 3)
+
+    def test_swipes_wait_behind_the_oldest_buffered_swipe(self):
+        self._swipe(self.developers[0], 1)
+        buffered = buffer.buffer_swipe(self.company_user, self.developers[1], None, 'profile')
+        SwipeBuffer.objects.filter(pk=buffered.pk).update(timestamp=self.day + timedelta(minutes=2))
+        self._swipe(self.developers[2], 3)
+
+        self.assertEqual(run_rollup(sources=['swipes'], lag_seconds=0), {'swipes': 1})
+        self.assertEqual(self._swipes_made(), 1)
+
+        # The flusher keeps the buffered timestamp, which is behind the newer swipe
+        buffer.flush_swipe_buffer()
+        self.assertEqual(run_rollup(sources=['swipes'], lag_seconds=0), {'swipes': 2})
+        self.assertEqual(self._swipes_made(), 3)
+
+    def test_swipes_count_for_the_first_membership(self):
+        other = CompanyProfile.objects.create(created_by_user=self.company_user, name='Other', location='Pune')
+        CompanyUsers.objects.create(user=self.company_user, company=other)
+        first = CompanyUsers.objects.filter(user=self.company_user).order_by('pk').first().company_id
+        self._swipe(self.developers[0], 1)
+
+        run_rollup(sources=['swipes'], lag_seconds=0)
+
+        self.assertEqual(list(CompanyDailyRollup.objects.values_list('company_id', 'swipes_made')), [(first, 1)])
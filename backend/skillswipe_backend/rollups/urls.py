@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CompanyRollupAPIView, CityRollupAPIView
+
+urlpatterns = [
+    # Daily trends for company dashboards
+    path('company/', CompanyRollupAPIView.as_view(), name='rollup-company'),
+    path('cities/', CityRollupAPIView.as_view(), name='rollup-cities'),
+]
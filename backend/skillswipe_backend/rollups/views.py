@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from .models import CompanyDailyRollup, CityDailyRollup, RollupWatermark
+from .builder import normalize_city
+from jobs.utils import get_user_company_profile
+from skillswipe_backend.db_router import ReplicaReadsMixin
+
+
+COMPANY_FIELDS = ['swipes_made', 'swipes_received', 'matches', 'new_jobs']
+CITY_FIELDS = ['swipes', 'matches', 'new_jobs', 'new_developers']
+
+
+def _window(request, default=30):
+    """Read the ?days= window (1-365) and return (days, first_day)"""
+    try:
+        days = int(request.query_params.get('days', default))
+    except ValueError:
+        days = default
+    days = max(1, min(days, 365))
+    return days, timezone.now().date() - timedelta(days=days - 1)
+
+
+def _as_of():
+    """Oldest watermark across sources: data is complete up to this point"""
+    return RollupWatermark.objects.aggregate(as_of=Min('last_timestamp'))['as_of']
+
+
+class CompanyRollupAPIView(ReplicaReadsMixin, APIView):
+    """Daily trends for the current user's company"""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        company = get_user_company_profile(request.user)
+        if not company:
+            return Response({
+                'message': 'Company profile required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        days, since = _window(request)
+        daily = list(
+            CompanyDailyRollup.objects.filter(company=company, day__gte=since)
+            .order_by('day').values('day', *COMPANY_FIELDS)
+        )
+        totals = {field: sum(row[field] for row in daily) for field in COMPANY_FIELDS}
+        
+        return Response({
+            'company': company.name,
+            'days': days,
+            'since': since,
+            'as_of': _as_of(),
+            'totals': totals,
+            'daily': daily
+        })
+
+
+class CityRollupAPIView(ReplicaReadsMixin, APIView):
+    """Daily trends for one city, or the busiest cities when no city is given"""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        days, since = _window(request)
+        rollups = CityDailyRollup.objects.filter(day__gte=since)
+        city = normalize_city(request.query_params.get('city'))
+        
+        if city:
+            daily = list(rollups.filter(city=city).order_by('day').values('day', *CITY_FIELDS))
+            return Response({
+                'city': city,
+                'days': days,
+                'since': since,
+                'as_of': _as_of(),
+                'totals': {field: sum(row[field] for row in daily) for field in CITY_FIELDS},
+                'daily': daily
+            })
+        
+        # Top cities over the window
+        cities = list(
+            rollups.values('city')
+            .annotate(**{field: Sum(field) for field in CITY_FIELDS})
+            .order_by('-swipes')[:20]
+        )
+        return Response({
+            'days': days,
+            'since': since,
+            'as_of': _as_of(),
+            'results': cities
+        })
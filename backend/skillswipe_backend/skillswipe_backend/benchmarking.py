@@ -0,0 +1,13 @@
+"""
+Helpers shared by the benchmark_* management commands.
+"""
+import statistics
+
+
+def percentiles(samples, points=(50, 95)):
+    """The given percentiles of samples (seconds), in milliseconds"""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0
+        return tuple(value for _ in points)
+    cuts = statistics.quantiles(samples, n=100)
+    return tuple(cuts[point - 1] * 1000 for point in points)
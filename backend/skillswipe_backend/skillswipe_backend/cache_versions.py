@@ -0,0 +1,47 @@
+"""
+Version counters for versioned cache keys.
+
+A cached value is stored under, or together with, the current versions of
+the counters it depends on. Bumping a counter after the write commits turns
+every value stored under the old version into a miss; nothing has to be found
+and deleted. Used by tag_cache and the dashboard tab cache.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _fresh_version():
+    # Clock-based start so a counter evicted from the cache never falls back
+    # to a number older entries are still stored under
+    return int(time.time() * 1000)
+
+
+def get_versions(keys):
+    """{key: current version} for these counter keys, initialising missing ones"""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = _fresh_version()
+            # add() so two workers racing to initialise agree on one value
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return versions
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), timeout=None)
+
+
+def bump_on_commit(keys):
+    """Bump these counters once the current transaction commits (right away outside one)"""
+    keys = set(keys)
+    if keys:
+        # After commit, so a concurrent reader can't cache pre-commit data under the new version
+        transaction.on_commit(lambda: _bump(keys))
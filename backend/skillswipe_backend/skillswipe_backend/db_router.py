@@ -0,0 +1,241 @@
+"""
+Read-replica routing.
+
+Reads stay on the primary unless the view opted in with ReplicaReadsMixin
+and the replica can be trusted for this user right now:
+- writes always go to the primary, and once a request has written, the rest
+  of it reads from the primary too;
+- a user who wrote in the last REPLICA_MAX_LAG_SECONDS is pinned to the
+  primary (read-your-writes across requests, tracked in the shared cache);
+- a replica lagging more than REPLICA_MAX_LAG_SECONDS is skipped until it
+  catches up, so pinned users never see data older than their own writes;
+- reads inside primary_reads() go to the primary. Cache fills use it, since
+  a value stored under a freshly bumped version must not come from a replica
+  that hasn't seen the bumping write yet.
+
+Without a 'replica' database alias everything stays on the primary.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = 'replica'
+
+# How often each process measures replica lag
+LAG_CHECK_SECONDS = 5
+
+
+class _RequestState:
+    def __init__(self):
+        self.replica = False
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+_primary_only = contextvars.ContextVar('db_primary_only', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def max_lag():
+    return getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 5)
+
+
+def _sticky_key(user_id):
+    return f'db:sticky:{user_id}'
+
+
+def mark_recent_write(user_id):
+    """Pin a user's reads to the primary until replicas have caught up with their write"""
+    if replica_configured() and user_id:
+        cache.set(_sticky_key(user_id), True, timeout=max(int(max_lag()) + 1, 1))
+
+
+def is_sticky(user_id):
+    return bool(user_id) and bool(cache.get(_sticky_key(user_id)))
+
+
+_lag_lock = threading.Lock()
+_lag = {'value': None, 'checked_at': 0.0}
+
+
+def replica_lag(refresh=False):
+    """Replica lag in seconds (None if it can't be measured), re-measured every few seconds"""
+    with _lag_lock:
+        if not refresh and time.monotonic() - _lag['checked_at'] < LAG_CHECK_SECONDS:
+            return _lag['value']
+        _lag['checked_at'] = time.monotonic()
+
+    try:
+        with connections[REPLICA_ALIAS].cursor() as cursor:
+            # A caught-up standby of an idle primary has an old replay
+            # timestamp, so compare positions before trusting the clock. A
+            # server that isn't a standby (e.g. a logical replication
+            # subscriber) has no replay position and is trusted as is.
+            cursor.execute(
+                """
+                SELECT CASE
+                    WHEN NOT pg_is_in_recovery() THEN 0
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                END
+                """
+            )
+            lag = cursor.fetchone()[0]
+        lag = float(lag) if lag is not None else None
+    except Exception:
+        logger.warning("Replica lag check failed; reading from the primary", exc_info=True)
+        lag = None
+
+    with _lag_lock:
+        _lag['value'] = lag
+    return lag
+
+
+def replica_usable():
+    if not replica_configured():
+        return False
+    lag = replica_lag()
+    return lag is not None and lag <= max_lag()
+
+
+def begin_request():
+    """Start tracking a request; returns the token for end_request"""
+    return _state.set(_RequestState())
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def request_wrote():
+    state = _state.get()
+    return state is not None and state.wrote
+
+
+def use_replica(user):
+    """Let the current request's reads go to the replica if it's safe for this user"""
+    state = _state.get()
+    if state is None or state.wrote:
+        return False
+    user_id = getattr(user, 'pk', None)
+    state.replica = not is_sticky(user_id) and replica_usable()
+    return state.replica
+
+
+@contextmanager
+def primary_reads():
+    """Send the block's reads to the primary, whatever the request's policy"""
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+
+def stop_replica():
+    state = _state.get()
+    if state is not None:
+        state.replica = False
+
+
+class ReplicaRouter:
+    """Database router for the default/replica pair"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or state.wrote or _primary_only.get():
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction on the primary must see its writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """Per-request routing state; pins users who wrote to the primary"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Async under ASGI so async views don't get pushed onto a thread
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = begin_request()
+        try:
+            response = self.get_response(request)
+            _pin_writer(request)
+            return response
+        finally:
+            end_request(token)
+
+    async def __acall__(self, request):
+        token = begin_request()
+        try:
+            response = await self.get_response(request)
+            if request_wrote():
+                # request.user may be a lazy session lookup
+                await sync_to_async(_pin_writer)(request)
+            return response
+        finally:
+            end_request(token)
+
+
+def _pin_writer(request):
+    if request_wrote():
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            mark_recent_write(user.pk)
+
+
+class ReplicaReadsMixin:
+    """
+    Read policy for DRF views: safe-method requests may read from the replica.
+    ViewSets can limit it to some actions with replica_actions.
+    """
+
+    replica_actions = None
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication and permission checks run on the primary
+        super().initial(request, *args, **kwargs)
+        action = getattr(self, 'action', None)
+        if request.method in SAFE_METHODS and (self.replica_actions is None or action in self.replica_actions):
+            use_replica(request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        stop_replica()
+        return super().finalize_response(request, response, *args, **kwargs)
+
@@ -0,0 +1,296 @@
+"""
+The API endpoints exercised by check_query_budgets and benchmark_endpoints,
+and the seeded test database they run against.
+
+Each Endpoint is called as the first developer or company of a synthetic dataset
+(the most active users; see synthetic.py). Path arguments come from
+fixtures(). Write endpoints build a fresh body per call, so repeated calls
+don't just hit duplicate-swipe shortcuts.
+
+count_queries() and per_row_statements() are the query budget check shared
+by check_query_budgets and the swipes tests.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import get_resolver, resolve, reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from jobs.models import JobPosting, Wishlist
+from profiles.models import CompanyProfile, DeveloperProfile
+from swipes.models import SwipeActions
+from . import db_router, synthetic
+from .query_budget import declared_budget
+from .slow_queries import fingerprint
+
+User = get_user_model()
+
+
+class Endpoint(NamedTuple):
+    role: str  # 'developer' or 'company'
+    name: str  # URL name
+    argument: Optional[str] = None  # fixtures() key for the pk path argument
+    query: str = ''
+    method: str = 'get'
+    body: Optional[Callable] = None  # (fixtures, call number) -> (user, data) for writes
+
+    @property
+    def label(self):
+        return f"{self.role} {self.method.upper()} {self.name}{self.query}"
+
+
+def _job_swipe(fixtures, n):
+    developer, job_id = fixtures['open_jobs'][n]
+    return developer, {'swipe_type': 'job', 'job_id': str(job_id), 'direction': 'right'}
+
+
+def _profile_swipe(fixtures, n):
+    return fixtures['company_user'], {'swipe_type': 'profile', 'target_user_id': str(fixtures['open_developers'][n]),
+                                      'direction': 'right'}
+
+
+def _wishlist_job(fixtures, n):
+    developer, job_id = fixtures['open_jobs'][-1 - n]
+    return developer, {'job_post_id': str(job_id)}
+
+
+def _ping(fixtures, n):
+    return fixtures['developer'], {}
+
+
+ENDPOINTS = [
+    Endpoint('developer', 'profile-status'),
+    Endpoint('developer', 'user-me'),
+    Endpoint('developer', 'developer-profile-me'),
+    Endpoint('developer', 'developer-profile-list'),
+    Endpoint('developer', 'developer-profile-detail', 'developer_profile'),
+    Endpoint('developer', 'company-profile-list'),
+    Endpoint('developer', 'company-profile-detail', 'company'),
+    Endpoint('developer', 'job-posting-list'),
+    Endpoint('developer', 'job-posting-detail', 'job'),
+    Endpoint('developer', 'wishlist-list'),
+    Endpoint('developer', 'discover-cards'),
+    Endpoint('developer', 'discover-cards-async'),
+    Endpoint('developer', 'dashboard', query='?tab=for_me'),
+    Endpoint('developer', 'dashboard', query='?tab=showed_interest'),
+    Endpoint('developer', 'dashboard', query='?tab=my_swipes'),
+    Endpoint('developer', 'dashboard', query='?tab=matches'),
+    Endpoint('developer', 'dashboard', query='?tab=stats'),
+    Endpoint('developer', 'dashboard', query='?tabs=all'),
+    Endpoint('developer', 'dashboard-async', query='?tabs=all'),
+    Endpoint('developer', 'rollup-cities'),
+    Endpoint('company', 'company-profile-me'),
+    Endpoint('company', 'company-profile-users', 'company'),
+    Endpoint('company', 'job-posting-list', query='?manage=true'),
+    Endpoint('company', 'job-posting-statistics'),
+    Endpoint('company', 'job-posting-analytics'),
+    Endpoint('company', 'job-posting-job-analytics', 'job'),
+    Endpoint('company', 'wishlist-list'),
+    Endpoint('company', 'discover-cards'),
+    Endpoint('company', 'dashboard', query='?tabs=all'),
+    Endpoint('company', 'rollup-company'),
+    # Writes last, so they don't change what the reads above see
+    Endpoint('developer', 'swipe-action', method='post', body=_job_swipe),
+    Endpoint('company', 'swipe-action', method='post', body=_profile_swipe),
+    Endpoint('developer', 'wishlist-list', method='post', body=_wishlist_job),
+    Endpoint('developer', 'update-activity', method='post', body=_ping),
+]
+
+
+def fixtures(writes=0):
+    """
+    Viewers, path arguments and, for `writes` calls of each write endpoint,
+    swipe and wishlist targets nobody has used yet
+    """
+    developer = User.objects.get(username=synthetic.username('developer', 0))
+    company_user = User.objects.get(username=synthetic.username('company', 0))
+    company = CompanyProfile.objects.get(created_by_user=company_user)
+    result = {
+        'developer': developer,
+        'company_user': company_user,
+        'company': company.id,
+        'job': JobPosting.objects.filter(company=company).order_by('id').values_list('id', flat=True)[0],
+        'developer_profile': DeveloperProfile.objects.exclude(user=developer).order_by('id')
+                                                     .values_list('id', flat=True)[0],
+        'open_jobs': [],
+        'open_developers': [],
+    }
+    if not writes:
+        return result
+
+    # Developer/job pairs for job swipes (from the front) and wishlist adds (from the back)
+    jobs = list(JobPosting.objects.filter(status='active').order_by('id').values_list('id', flat=True))
+    taken = set(SwipeActions.objects.filter(swipe_type='job').values_list('swiper_id', 'job_post_id'))
+    taken |= set(Wishlist.objects.filter(job_post__isnull=False).values_list('user_id', 'job_post_id'))
+    for candidate in User.objects.filter(role='developer', is_active=True).order_by('id').iterator():
+        result['open_jobs'].extend((candidate, job) for job in jobs if (candidate.id, job) not in taken)
+        if len(result['open_jobs']) >= writes * 2:
+            break
+
+    swiped = set(SwipeActions.objects.filter(swiper=company_user, swipe_type='profile')
+                 .values_list('swiped_on_id', flat=True))
+    result['open_developers'] = [
+        user_id for user_id in User.objects.filter(role='developer', is_active=True).order_by('id')
+                                           .values_list('id', flat=True)
+        if user_id not in swiped
+    ][:writes]
+
+    if len(result['open_jobs']) < writes * 2 or len(result['open_developers']) < writes:
+        raise ValueError(f"Not enough unswiped targets for {writes} writes per endpoint; seed a larger dataset")
+    return result
+
+
+_tokens = {}
+
+
+def authorization(user):
+    if user.pk not in _tokens:
+        _tokens[user.pk] = f'Bearer {AccessToken.for_user(user)}'
+    return _tokens[user.pk]
+
+
+def prepare(endpoint, fixture_values, n=0):
+    """(path, user, body) for the n-th call of an endpoint"""
+    kwargs = {'pk': fixture_values[endpoint.argument]} if endpoint.argument else None
+    path = reverse(endpoint.name, kwargs=kwargs) + endpoint.query
+    if endpoint.body:
+        user, body = endpoint.body(fixture_values, n)
+    else:
+        user = fixture_values['developer' if endpoint.role == 'developer' else 'company_user']
+        body = None
+    return path, user, body
+
+
+def call(client, endpoint, fixture_values, n=0):
+    """Make the n-th call of an endpoint with the test client"""
+    path, user, body = prepare(endpoint, fixture_values, n)
+    if endpoint.method == 'get':
+        return client.get(path, HTTP_AUTHORIZATION=authorization(user))
+    return getattr(client, endpoint.method)(path, body, content_type='application/json',
+                                            HTTP_AUTHORIZATION=authorization(user))
+
+
+def unchecked_get_endpoints():
+    """Named API routes that accept GET but aren't in ENDPOINTS"""
+    checked = {endpoint.name for endpoint in ENDPOINTS}
+    unchecked = set()
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            if hasattr(pattern, 'url_patterns'):
+                walk(pattern.url_patterns, prefix + str(pattern.pattern))
+                continue
+            if not prefix.startswith('api/') or not pattern.name or pattern.name in checked:
+                continue
+            callback = pattern.callback
+            actions = getattr(callback, 'actions', None)
+            view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+            if actions is not None:
+                accepts_get = 'get' in actions
+            elif view_class is not None:
+                accepts_get = hasattr(view_class, 'get')
+            else:
+                accepts_get = True
+            if accepts_get:
+                unchecked.add(pattern.name)
+
+    walk(get_resolver().url_patterns, '')
+    return sorted(unchecked)
+
+
+@contextmanager
+def closing_pool_connections():
+    """
+    Make pool threads (dashboard tabs, async views) close their connections after
+    each task. Connections they kept would stop the test database from being dropped.
+    """
+    default = connections[DEFAULT_DB_ALIAS]
+    old_max_age = default.settings_dict['CONN_MAX_AGE']
+    default.settings_dict['CONN_MAX_AGE'] = 0
+    try:
+        yield
+    finally:
+        default.settings_dict['CONN_MAX_AGE'] = old_max_age
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """Run the block against a throwaway test database (replica reads included)"""
+    default = connections[DEFAULT_DB_ALIAS]
+    old_name = default.settings_dict['NAME']
+    replica_settings = None
+    default.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        if db_router.replica_configured():
+            # Like a test mirror: replica-policy reads see the seeded test database
+            replica = connections[db_router.REPLICA_ALIAS]
+            replica.close()
+            replica_settings = dict(replica.settings_dict)
+            replica.settings_dict.update(default.settings_dict)
+        with closing_pool_connections():
+            yield
+    finally:
+        if replica_settings is not None:
+            connections[db_router.REPLICA_ALIAS].close()
+            connections[db_router.REPLICA_ALIAS].settings_dict.update(replica_settings)
+        default.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def seed(scale, seed=0):
+    """Replace the test database's contents with a synthetic dataset of the given scale"""
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+    _tokens.clear()
+    return synthetic.generate(developers=scale * 20, companies=scale * 2, jobs_per_company=5,
+                              swipes_per_developer=5, swipes_per_company=5, seed=seed)
+
+
+class QueryCount(NamedTuple):
+    status: int
+    queries: int
+    budget: int
+    statements: Counter  # runs per statement fingerprint
+
+
+def count_queries():
+    """{endpoint label: QueryCount} for one cold call of every GET endpoint on the seeded data"""
+    fixture_values = fixtures()
+    results = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                           QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=False):
+        # The middleware is loaded when the client's handler is built
+        client = Client(raise_request_exception=False)
+        for endpoint in ENDPOINTS:
+            if endpoint.method != 'get':
+                continue
+            # Every request starts cold, so cached paths don't hide per-row queries
+            cache.clear()
+            response = call(client, endpoint, fixture_values)
+            statements = Counter()
+            for sql, runs in response.wsgi_request.query_usage.statements.items():
+                statements[fingerprint(sql)] += runs
+            budget = declared_budget(resolve(response.request['PATH_INFO']).func, 'GET')
+            results[endpoint.label] = QueryCount(response.status_code, int(response['X-Query-Count']),
+                                                 budget, statements)
+    return results
+
+
+def per_row_statements(small, large):
+    """
+    {statement: (runs, runs)} for statements an endpoint runs more often on the
+    larger of two datasets, given the statements Counters of both.
+
+    Not counted: a statement that first appears there once, and batched IN (...)
+    loads. These are prefetches that only run once a relation has rows, e.g. a
+    first wishlisted company or a dashboard tab that was empty.
+    """
+    return {sql: (small[sql], runs) for sql, runs in large.items()
+            if runs > small[sql] and (small[sql] or runs > 1) and 'IN (...)' not in sql}
@@ -0,0 +1,204 @@
+"""
+On-demand request profiling.
+
+ProfilingMiddleware profiles a request when either of these holds:
+- it carries the PROFILING_HEADER header (X-Profile) and comes from a
+  staff user, by session or JWT;
+- it falls in the PROFILING_SAMPLE_RATE share of requests.
+
+Each profile lands in PROFILING_DIR as two files:
+- <id>.prof: cProfile stats for the view's thread, readable with pstats or
+  snakeviz;
+- <id>.json: the request, its timing and every SQL statement with its
+  duration.
+
+SQL is captured from other threads as well (dashboard tabs, the async
+views' query pool). The call tree only covers the request thread, and it
+is skipped for async views, since the event loop interleaves requests. It
+is also skipped when another profiler is active: from Python 3.12 only one
+can run per process, so a second profiled request at the same time, or a
+debugger, gets an SQL-only profile.
+Use `manage.py request_profiles` to list and inspect profiles.
+"""
+import cProfile
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import query_hooks
+
+logger = logging.getLogger(__name__)
+
+# Longer statements are cut in the JSON file
+SQL_MAX_LENGTH = 2000
+
+
+class _Capture:
+    """SQL statements run on behalf of one profiled request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = []
+
+    def add(self, alias, sql, many, seconds):
+        with self._lock:
+            self.queries.append({
+                'alias': alias,
+                'sql': sql[:SQL_MAX_LENGTH],
+                'many': many,
+                'ms': round(seconds * 1000, 3),
+                'thread': threading.current_thread().name,
+            })
+
+
+_capture = contextvars.ContextVar('profiling_capture', default=None)
+
+
+def _record_query(connection, sql, params, many, seconds, error):
+    capture = _capture.get()
+    if capture is not None:
+        capture.add(connection.alias, sql, many, seconds)
+
+
+def _start_call_tree():
+    """An enabled cProfile.Profile, or None if another profiler holds the hook"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: "Another profiling tool is already active"
+        logger.info("Another profiler is active; profiling SQL only")
+        return None
+    return profiler
+
+
+def profile_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+def _is_staff(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    # API clients authenticate with a JWT, which DRF only reads inside the view
+    from authentication.backends import CachedJWTAuthentication
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def _trigger(request):
+    """'header', 'sample' or None; header requests still need _is_staff()"""
+    if request.headers.get(settings.PROFILING_HEADER):
+        return 'header'
+    if random.random() < settings.PROFILING_SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+def _prune(directory):
+    """Keep the newest PROFILING_MAX_FILES profiles"""
+    profiles = sorted(directory.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in profiles[settings.PROFILING_MAX_FILES:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def _save(request, response, capture, profiler, started_at, seconds, trigger):
+    profile_id = f"{started_at:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    if profiler is not None:
+        profiler.dump_stats(directory / f'{profile_id}.prof')
+
+    match = getattr(request, 'resolver_match', None)
+    user = getattr(request, 'user', None)
+    (directory / f'{profile_id}.json').write_text(json.dumps({
+        'id': profile_id,
+        'started_at': started_at.isoformat(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': match.view_name if match else None,
+        'user': str(user.pk) if user is not None and user.is_authenticated else None,
+        'trigger': trigger,
+        'status': response.status_code,
+        'duration_ms': round(seconds * 1000, 2),
+        'sql_ms': round(sum(query['ms'] for query in capture.queries), 2),
+        'call_tree': profiler is not None,
+        'queries': capture.queries,
+    }, indent=2))
+    _prune(directory)
+    return profile_id
+
+
+class ProfilingMiddleware:
+    """Profile staff requests that ask for it, plus a sample of all requests"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        query_hooks.subscribe(_record_query)
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _start(self):
+        capture = _Capture()
+        return capture, _capture.set(capture)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        trigger = _trigger(request)
+        if trigger is None or (trigger == 'header' and not _is_staff(request)):
+            return self.get_response(request)
+
+        capture, token = self._start()
+        started_at, started = timezone.now(), time.perf_counter()
+        try:
+            profiler = _start_call_tree()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            _capture.reset(token)
+        profile_id = _save(request, response, capture, profiler, started_at, time.perf_counter() - started, trigger)
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    async def __acall__(self, request):
+        trigger = _trigger(request)
+        if trigger is None or (trigger == 'header' and not await sync_to_async(_is_staff)(request)):
+            return await self.get_response(request)
+
+        capture, token = self._start()
+        started_at, started = timezone.now(), time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _capture.reset(token)
+        profile_id = await sync_to_async(_save)(
+            request, response, capture, None, started_at, time.perf_counter() - started, trigger
+        )
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,162 @@
+"""
+Per-request query budgets.
+
+QueryBudgetMiddleware counts the queries and database time of each request.
+The counter lives in a context variable, so queries made on the request's
+behalf on other threads (dashboard tabs, the async views' query pool) count
+too. Statements are timed by query_hooks. Views declare their budget with a
+query_budget attribute: an int, or a dict keyed by viewset action. Undeclared
+views get QUERY_BUDGET_DEFAULT.
+
+Over-budget requests are logged as warnings and listed by over_budget(); with
+QUERY_BUDGET_STRICT they raise QueryBudgetExceeded instead, so a test run
+fails on the first N+1. The request's QueryUsage, with runs per statement, is
+left on request.query_usage. Enabled by QUERY_BUDGET_ENABLED (defaults to DEBUG).
+"""
+import contextvars
+import logging
+import threading
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import query_hooks
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryUsage:
+    """Queries and database time of one request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.seconds = 0.0
+        # Runs per SQL statement, so a check can tell a repeated per-row query from a new one
+        self.statements = Counter()
+
+    def add(self, seconds, sql):
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+            self.statements[sql] += 1
+
+
+_usage = contextvars.ContextVar('query_usage', default=None)
+
+
+def _count_query(connection, sql, params, many, seconds, error):
+    usage = _usage.get()
+    if usage is not None:
+        usage.add(seconds, sql)
+
+
+def start_counting():
+    """Count queries for the current context; returns (usage, token for stop_counting)"""
+    query_hooks.subscribe(_count_query)
+    usage = QueryUsage()
+    return usage, _usage.set(usage)
+
+
+def stop_counting(token):
+    _usage.reset(token)
+
+
+def query_budget(budget):
+    """Declare the budget of a function view (put it above @api_view)"""
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def declared_budget(view_func, method):
+    """The budget a view declares for this method, or QUERY_BUDGET_DEFAULT"""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        # Router views map each method to a viewset action
+        actions = getattr(view_func, 'actions', None) or {}
+        budget = budget.get(actions.get(method.lower()))
+    return budget if budget is not None else settings.QUERY_BUDGET_DEFAULT
+
+
+_offenders_lock = threading.Lock()
+_offenders = {}
+
+
+def over_budget():
+    """{url name: (worst query count, budget)} for endpoints that went over budget"""
+    with _offenders_lock:
+        return dict(_offenders)
+
+
+def reset_over_budget():
+    with _offenders_lock:
+        _offenders.clear()
+
+
+def _check(request, response, usage):
+    request.query_usage = usage
+    response['X-Query-Count'] = str(usage.queries)
+    response['X-Query-Time-Ms'] = f'{usage.seconds * 1000:.1f}'
+
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return
+    budget = declared_budget(match.func, request.method)
+    if usage.queries <= budget:
+        return
+
+    name = match.view_name or request.path
+    with _offenders_lock:
+        worst = _offenders.get(name, (0, budget))[0]
+        _offenders[name] = (max(worst, usage.queries), budget)
+    message = (f"{request.method} {request.path} ({name}) ran {usage.queries} queries "
+               f"in {usage.seconds * 1000:.1f}ms; budget is {budget}")
+    if settings.QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMiddleware:
+    """Count queries per request and flag endpoints over their budget"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        usage, token = start_counting()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_counting(token)
+        _check(request, response, usage)
+        return response
+
+    async def __acall__(self, request):
+        usage, token = start_counting()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_counting(token)
+        _check(request, response, usage)
+        return response
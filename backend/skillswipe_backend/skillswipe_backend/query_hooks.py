@@ -0,0 +1,58 @@
+"""
+One execute wrapper for all per-statement instrumentation.
+
+Query budgets, request profiling, server timing and slow-query capture all
+need the duration of every statement, on every connection of the process,
+including connections opened later on pool threads (dashboard tabs, the
+async views' query pool). subscribe() installs a single wrapper that times
+each statement once and passes it to the subscribers, in subscription order:
+
+    callback(connection, sql, params, many, seconds, error)
+
+error is the exception the statement raised, or None. Each subscriber
+checks its own context variable to tell whether the statement belongs to a
+request it is tracking. Callbacks run on the thread that ran the statement
+and must not raise.
+"""
+import threading
+import time
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_lock = threading.Lock()
+# Replaced, never mutated, so the wrapper can read it without the lock
+_subscribers = ()
+
+
+def _observe(execute, sql, params, many, context):
+    subscribers = _subscribers
+    if not subscribers:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    error = None
+    try:
+        return execute(sql, params, many, context)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        for callback in subscribers:
+            callback(context['connection'], sql, params, many, seconds, error)
+
+
+def _install(connection, **kwargs):
+    if _observe not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_observe)
+
+
+def subscribe(callback):
+    """Call callback for every statement this process runs from now on; safe to repeat"""
+    global _subscribers
+    with _lock:
+        if callback not in _subscribers:
+            _subscribers = (*_subscribers, callback)
+    connection_created.connect(_install, dispatch_uid='query_hooks')
+    for connection in connections.all():
+        _install(connection)
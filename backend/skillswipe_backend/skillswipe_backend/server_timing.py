@@ -0,0 +1,271 @@
+"""
+Per-phase request timing.
+
+ServerTimingMiddleware splits each request into phases:
+- auth: DRF authentication;
+- permissions: permission, object permission and throttle checks;
+- db: SQL statements, including those run on other threads for the request;
+- serialize: serializer validation and .data;
+- render: turning the response data into JSON;
+- app: the remainder of the view;
+- total: the whole request.
+
+SQL run inside auth, permissions, serialize or render counts as db, not as
+that phase. The phases are hooked on DRF's base classes, so every API view
+is covered, function views included.
+
+The numbers go into the Server-Timing response header (SERVER_TIMING_HEADER),
+which browser devtools show under Timing. They also go into in-process
+histograms per URL name, served to staff at /api/server-timing/. Each worker
+process keeps its own histograms. Enabled by SERVER_TIMING_ENABLED.
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import query_hooks
+
+PHASES = ('auth', 'permissions', 'db', 'serialize', 'render', 'app', 'total')
+
+# Histogram bucket upper bounds in milliseconds; slower requests fall in an overflow bucket
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Timings:
+    """Phase durations of one request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+
+    def add_query(self, seconds, phase_sql):
+        with self._lock:
+            self.queries += 1
+            self.seconds['db'] += seconds
+            if phase_sql is not None:
+                phase_sql[0] += seconds
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.seconds[phase] += seconds
+
+
+_timings = contextvars.ContextVar('server_timing', default=None)
+# SQL seconds spent inside the open phase, so the phase can leave them out
+_phase_sql = contextvars.ContextVar('server_timing_phase', default=None)
+
+
+@contextmanager
+def phase(name):
+    """Time a block as one phase; blocks nested in another phase count toward the outer one"""
+    timings = _timings.get()
+    if timings is None or _phase_sql.get() is not None:
+        yield
+        return
+    phase_sql = [0.0]
+    token = _phase_sql.set(phase_sql)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phase_sql.reset(token)
+        timings.add(name, max(time.perf_counter() - started - phase_sql[0], 0.0))
+
+
+def _time_query(connection, sql, params, many, seconds, error):
+    timings = _timings.get()
+    if timings is not None:
+        timings.add_query(seconds, _phase_sql.get())
+
+
+def _timed(function, name):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with phase(name):
+            return function(*args, **kwargs)
+    wrapper.server_timing_phase = name
+    return wrapper
+
+
+def _hook(owner, attribute, name):
+    original = owner.__dict__[attribute]
+    if isinstance(original, property):
+        if not hasattr(original.fget, 'server_timing_phase'):
+            setattr(owner, attribute, property(_timed(original.fget, name)))
+    elif not hasattr(original, 'server_timing_phase'):
+        setattr(owner, attribute, _timed(original, name))
+
+
+def install():
+    """Hook the phases into DRF and SQL timing into query_hooks; safe to call more than once"""
+    query_hooks.subscribe(_time_query)
+    _hook(APIView, 'perform_authentication', 'auth')
+    _hook(APIView, 'check_permissions', 'permissions')
+    _hook(APIView, 'check_object_permissions', 'permissions')
+    _hook(APIView, 'check_throttles', 'permissions')
+    # Serializer.data and ListSerializer.data both go through BaseSerializer.data
+    _hook(serializers.BaseSerializer, 'data', 'serialize')
+    _hook(serializers.BaseSerializer, 'is_valid', 'serialize')
+    _hook(Response, 'rendered_content', 'render')
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def add(self, ms):
+        index = 0
+        while index < len(BUCKETS_MS) and ms > BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum_ms += ms
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the percentile (None in the overflow bucket)"""
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else None
+        return None
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.sum_ms / self.count, 2) if self.count else 0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': dict(zip([*map(str, BUCKETS_MS), 'inf'], self.counts)),
+        }
+
+
+_histograms_lock = threading.Lock()
+_histograms = {}
+_since = timezone.now()
+
+
+def record(name, milliseconds):
+    """Add one request's phase durations to the histograms of a URL name"""
+    with _histograms_lock:
+        histograms = _histograms.get(name)
+        if histograms is None:
+            histograms = _histograms[name] = {phase_name: _Histogram() for phase_name in PHASES}
+        for phase_name, ms in milliseconds.items():
+            histograms[phase_name].add(ms)
+
+
+def histograms():
+    """{url name: {phase: histogram summary}} for this process"""
+    with _histograms_lock:
+        return {
+            name: {phase_name: histogram.snapshot() for phase_name, histogram in phases.items()}
+            for name, phases in sorted(_histograms.items())
+        }
+
+
+def reset_histograms():
+    global _since
+    with _histograms_lock:
+        _histograms.clear()
+        _since = timezone.now()
+
+
+def _start():
+    timings = Timings()
+    return timings, _timings.set(timings)
+
+
+def _finish(request, response, timings, seconds):
+    timings.seconds['total'] = seconds
+    measured = sum(timings.seconds[name] for name in ('auth', 'permissions', 'db', 'serialize', 'render'))
+    # db can exceed the wall clock when statements ran in parallel on other threads
+    timings.seconds['app'] = max(seconds - measured, 0.0)
+    milliseconds = {name: timings.seconds[name] * 1000 for name in PHASES}
+
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.view_name:
+        record(match.view_name, milliseconds)
+
+    if settings.SERVER_TIMING_HEADER:
+        entries = []
+        for name in PHASES:
+            entry = f'{name};dur={milliseconds[name]:.1f}'
+            if name == 'db':
+                entry += f';desc="{timings.queries} queries"'
+            entries.append(entry)
+        response['Server-Timing'] = ', '.join(entries)
+
+
+class ServerTimingMiddleware:
+    """Break requests into phases for the Server-Timing header and the histograms"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings, token = _start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        _finish(request, response, timings, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        timings, token = _start()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        _finish(request, response, timings, time.perf_counter() - started)
+        return response
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def server_timing_histograms(request):
+    """Phase histograms of this worker process; DELETE clears them"""
+    if request.method == 'DELETE':
+        reset_histograms()
+        return Response({'message': 'Histograms cleared'})
+    if not settings.SERVER_TIMING_ENABLED:
+        return Response({'error': 'Server timing is disabled (SERVER_TIMING_ENABLED)'},
+                        status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'pid': os.getpid(),
+        'since': _since.isoformat(),
+        'buckets_ms': BUCKETS_MS,
+        'views': histograms(),
+    })
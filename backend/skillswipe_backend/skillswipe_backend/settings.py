@@ -55,16 +55,22 @@ INSTALLED_APPS = [
     'profiles',
     'jobs',
     'swipes',
+    'rollups',
 ]
 
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Always at top
+    'skillswipe_backend.server_timing.ServerTimingMiddleware',  # Off unless SERVER_TIMING_ENABLED
+    'skillswipe_backend.slow_queries.SlowQueryMiddleware',  # Off unless SLOW_QUERY_ENABLED
+    'skillswipe_backend.query_budget.QueryBudgetMiddleware',  # Off unless QUERY_BUDGET_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'skillswipe_backend.profiling.ProfilingMiddleware',  # Off unless PROFILING_ENABLED
+    'skillswipe_backend.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -103,9 +109,146 @@ DATABASES = {
         'PASSWORD': os.getenv('DATABASE_PASSWORD'),
         'HOST': os.getenv('DATABASE_HOST', 'localhost'),
         'PORT': os.getenv('DATABASE_PORT', '5432'),
+        # Keep connections open across requests for this many seconds
+        # ('none' = forever, 0 = close after every request). Health checks
+        # test a reused connection before the request gets it.
+        'CONN_MAX_AGE': (
+            None if os.getenv('DATABASE_CONN_MAX_AGE', '60').lower() == 'none'
+            else int(os.getenv('DATABASE_CONN_MAX_AGE', '60'))
+        ),
+        'CONN_HEALTH_CHECKS': os.getenv('DATABASE_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
     }
 }
 
+# Connection pool instead of persistent connections. Needs psycopg 3 with the
+# pool extra (`pip install "psycopg[pool]"`) in place of psycopg2. Each
+# process gets its own pool, so size it as workers x max size <= max_connections.
+if os.getenv('DATABASE_POOL', 'False').lower() == 'true':
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # Django refuses pooling with persistent connections
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+            'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+        }
+    }
+
+# Read replica for the views that opt in (skillswipe_backend/db_router.py).
+# Unset DATABASE_REPLICA_HOST keeps every query on the primary. Replicas
+# lagging more than REPLICA_MAX_LAG_SECONDS are skipped, and users stay on the
+# primary for that long after they write.
+if os.getenv('DATABASE_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DATABASE_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DATABASE_REPLICA_HOST'),
+        'PORT': os.getenv('DATABASE_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['skillswipe_backend.db_router.ReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+
+# Write-behind swipes: stage swipes in swipe_buffer and let
+# `manage.py flush_swipes` move them into swipe_actions in batches
+SWIPE_WRITE_BEHIND = os.getenv('SWIPE_WRITE_BEHIND', 'False').lower() == 'true'
+SWIPE_FLUSH_BATCH_SIZE = int(os.getenv('SWIPE_FLUSH_BATCH_SIZE', '1000'))
+
+# Thread pool size for composite dashboard requests (?tabs=all). Each worker
+# holds its own database connection.
+DASHBOARD_TAB_WORKERS = int(os.getenv('DASHBOARD_TAB_WORKERS', '5'))
+
+# Thread pool shared by the async discover/dashboard views for their
+# concurrent queries. Each worker holds its own database connection.
+ASYNC_QUERY_WORKERS = int(os.getenv('ASYNC_QUERY_WORKERS', '10'))
+
+# Cache backend. Local memory is per process; point CACHE_BACKEND at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) in production so
+# invalidations reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'skillswipe'),
+    }
+}
+
+# Seconds a resolved user (auth fields, membership and profile IDs) stays
+# cached by CachedJWTAuthentication. Changes invalidate it immediately.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60'))
+
+# Heartbeat coalescing: buffered last_ping values reach the database within
+# PING_FLUSH_INTERVAL seconds (the staleness bound); 0 writes through
+PING_FLUSH_INTERVAL = int(os.getenv('PING_FLUSH_INTERVAL', '60'))
+PING_FLUSH_BATCH_SIZE = int(os.getenv('PING_FLUSH_BATCH_SIZE', '1000'))
+
+# Activity rules enforced by `manage.py sweep_users`
+INACTIVE_AFTER_DAYS = int(os.getenv('INACTIVE_AFTER_DAYS', '30'))
+PROFILE_REVIEW_AFTER_DAYS = int(os.getenv('PROFILE_REVIEW_AFTER_DAYS', '90'))
+
+# Async login: threads that run password hashing, and how many logins may
+# wait for one before new attempts get a 503
+LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', str(os.cpu_count() or 4)))
+LOGIN_HASH_QUEUE_LIMIT = int(os.getenv('LOGIN_HASH_QUEUE_LIMIT', '100'))
+
+# /api/auth/profile-status/ results, invalidated by profile and membership changes
+PROFILE_STATUS_CACHE_TIMEOUT = int(os.getenv('PROFILE_STATUS_CACHE_TIMEOUT', '300'))
+
+# In-process Bloom filter in front of the refresh-token blacklist check
+# (authentication/tokens.py). Requires a shared, non-evicting cache backend.
+TOKEN_BLACKLIST_BLOOM = os.getenv('TOKEN_BLACKLIST_BLOOM', 'False').lower() == 'true'
+TOKEN_BLACKLIST_BLOOM_REBUILD_SECONDS = int(os.getenv('TOKEN_BLACKLIST_BLOOM_REBUILD_SECONDS', '600'))
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = float(os.getenv('TOKEN_BLACKLIST_BLOOM_ERROR_RATE', '0.001'))
+
+# Per-user dashboard tab cache (see swipes/dashboard_cache.py)
+DASHBOARD_CACHE_ENABLED = os.getenv('DASHBOARD_CACHE_ENABLED', 'True').lower() == 'true'
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '300'))
+
+# Serialized job/developer/company cards (skillswipe_backend/tag_cache.py).
+# Writes invalidate them through tags; the timeout only bounds memory use.
+TAG_CACHE_ENABLED = os.getenv('TAG_CACHE_ENABLED', 'True').lower() == 'true'
+TAG_CACHE_TIMEOUT = int(os.getenv('TAG_CACHE_TIMEOUT', '600'))
+
+# `manage.py rollup` leaves rows newer than this for the next run, so it must
+# exceed the longest write transaction. Swipes are also held back while older
+# ones wait in the write-behind buffer, however long the flusher is behind.
+ROLLUP_LAG_SECONDS = int(os.getenv('ROLLUP_LAG_SECONDS', '300'))
+
+# Per-request query budgets (skillswipe_backend/query_budget.py). Views declare
+# query_budget; the rest get QUERY_BUDGET_DEFAULT. Strict mode raises instead
+# of printing, for test runs.
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', str(DEBUG)).lower() == 'true'
+QUERY_BUDGET_DEFAULT = int(os.getenv('QUERY_BUDGET_DEFAULT', '15'))
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False').lower() == 'true'
+
+# On-demand profiling (skillswipe_backend/profiling.py): staff requests with the
+# PROFILING_HEADER header, plus a PROFILING_SAMPLE_RATE share (0-1) of all
+# requests, are profiled into PROFILING_DIR. The oldest are pruned past
+# PROFILING_MAX_FILES.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILING_HEADER = os.getenv('PROFILING_HEADER', 'X-Profile')
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = os.getenv('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', '200'))
+
+# Per-phase timing (skillswipe_backend/server_timing.py): auth, permissions, db,
+# serialize and render times are kept in per-URL-name histograms, served to
+# staff at /api/server-timing/. SERVER_TIMING_HEADER also sends them to clients
+# in the Server-Timing header.
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'False').lower() == 'true'
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', str(DEBUG)).lower() == 'true'
+
+# Slow-query capture (skillswipe_backend/slow_queries.py): statements slower
+# than SLOW_QUERY_THRESHOLD_MS are appended to SLOW_QUERY_LOG (JSON lines,
+# rotated past SLOW_QUERY_LOG_MAX_BYTES). On PostgreSQL a SLOW_QUERY_EXPLAIN_RATE
+# share (0-1) of slow SELECTs also gets an EXPLAIN (ANALYZE, BUFFERS) plan.
+# Parameter values and other literals are redacted unless SLOW_QUERY_LOG_PARAMS.
+SLOW_QUERY_ENABLED = os.getenv('SLOW_QUERY_ENABLED', 'False').lower() == 'true'
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', str(BASE_DIR / 'logs' / 'slow_queries.jsonl'))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', str(50 * 1024 * 1024)))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', '0'))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', '5000'))
+SLOW_QUERY_LOG_PARAMS = os.getenv('SLOW_QUERY_LOG_PARAMS', 'False').lower() == 'true'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -137,7 +280,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -177,6 +320,8 @@ SIMPLE_JWT = {
 
     'JTI_CLAIM': 'jti',
 
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.tokens.BloomTokenRefreshSerializer',
+
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
@@ -0,0 +1,213 @@
+"""
+Slow-query capture.
+
+Every statement slower than SLOW_QUERY_THRESHOLD_MS is appended to
+SLOW_QUERY_LOG as one JSON line. Each line holds the SQL, the view and
+request it ran for, and the project frames of the stack that issued it.
+
+Parameter values are user data (emails, password hashes, tokens), so by
+default the log keeps only their types. The request is logged without its
+query string, quoted literals in plans are replaced by '?', and errors keep
+only their first line (Postgres puts key values in DETAIL). Set
+SLOW_QUERY_LOG_PARAMS to log all of it as is.
+
+On PostgreSQL, a SLOW_QUERY_EXPLAIN_RATE share (0-1) of slow SELECTs is
+run again under EXPLAIN (ANALYZE, BUFFERS), and the plan is stored with the
+capture. The EXPLAIN runs on the same connection, so it sees the same
+snapshot as the statement. It runs inside a transaction (or a savepoint,
+within an atomic block) that is always rolled back, and it is capped by
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS. It goes through the raw DB-API cursor, so
+query_hooks and its other subscribers don't count it.
+
+SlowQueryMiddleware subscribes the recorder to query_hooks, which covers
+every connection of the process. Enabled by SLOW_QUERY_ENABLED. Use
+`manage.py slow_queries` to read the log.
+"""
+import contextvars
+import json
+import logging
+import random
+import re
+import threading
+import traceback
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+from . import query_hooks
+
+logger = logging.getLogger(__name__)
+
+# Longer values are cut in the log
+SQL_MAX_LENGTH = 5000
+PARAM_MAX_LENGTH = 200
+STACK_DEPTH = 12
+
+_request = contextvars.ContextVar('slow_query_request', default=None)
+_write_lock = threading.Lock()
+
+_number = re.compile(r'\b\d+(\.\d+)?\b')
+_string = re.compile(r"'(?:[^']|'')*'")
+_in_list = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+
+
+def fingerprint(sql):
+    """The statement with literals and IN lists collapsed, for grouping captures"""
+    sql = _string.sub('?', sql)
+    sql = _number.sub('?', sql)
+    sql = _in_list.sub('IN (...)', sql)
+    return ' '.join(sql.split())
+
+
+def log_path():
+    return Path(settings.SLOW_QUERY_LOG)
+
+
+def _stack():
+    """Project frames that led to the statement, innermost last"""
+    base = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base) and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(('slow_queries.py', 'query_hooks.py'))
+    ]
+    return [f"{frame.filename[len(base) + 1:]}:{frame.lineno} in {frame.name}" for frame in frames[-STACK_DEPTH:]]
+
+
+def _params(params):
+    if params is None:
+        return None
+    values = params.values() if isinstance(params, dict) else params
+    if not settings.SLOW_QUERY_LOG_PARAMS:
+        return [f'<{type(value).__name__}>' for value in values]
+    return [value if isinstance(value, (int, float, bool, type(None))) else str(value)[:PARAM_MAX_LENGTH]
+            for value in values]
+
+
+def _redact(text, first_line=False):
+    """text with quoted literals replaced, unless SLOW_QUERY_LOG_PARAMS is on"""
+    if text is None or settings.SLOW_QUERY_LOG_PARAMS:
+        return text
+    if first_line:
+        text = text.split('\n', 1)[0]
+    return _string.sub("'?'", text)
+
+
+def _request_line(request):
+    if request is None:
+        return None
+    path = request.get_full_path() if settings.SLOW_QUERY_LOG_PARAMS else request.path
+    return f'{request.method} {path}'
+
+
+def _explain(connection, sql, params):
+    """EXPLAIN (ANALYZE, BUFFERS) the statement in a rolled-back transaction; returns the plan text"""
+    statement = connection.ops.compose_sql(sql, params)
+    in_transaction = not connection.get_autocommit()
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute('SAVEPOINT slow_query_explain' if in_transaction else 'BEGIN')
+        try:
+            cursor.execute(f'SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}')
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {statement}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain' if in_transaction else 'ROLLBACK')
+    finally:
+        cursor.close()
+
+
+def _should_explain(connection, sql, many):
+    return (
+        connection.vendor == 'postgresql'
+        and not many
+        and sql.lstrip()[:6].upper() == 'SELECT'
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+    )
+
+
+def _write(capture):
+    path = log_path()
+    line = json.dumps(capture, default=str) + '\n'
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size > settings.SLOW_QUERY_LOG_MAX_BYTES:
+            # Keep one previous generation
+            path.replace(path.with_name(path.name + '.1'))
+        with path.open('a') as log:
+            log.write(line)
+
+
+def _record(connection, sql, params, many, seconds, error):
+    request = _request.get()
+    match = getattr(request, 'resolver_match', None) if request is not None else None
+    capture = {
+        'at': timezone.now().isoformat(),
+        'ms': round(seconds * 1000, 2),
+        'alias': connection.alias,
+        'sql': sql[:SQL_MAX_LENGTH],
+        'fingerprint': fingerprint(sql)[:SQL_MAX_LENGTH],
+        'params': None if many else _params(params),
+        'many': many,
+        'view': match.view_name if match else None,
+        'request': _request_line(request),
+        'thread': threading.current_thread().name,
+        'stack': _stack(),
+        'error': _redact(error, first_line=True),
+        'plan': None,
+    }
+    if error is None and _should_explain(connection, sql, many):
+        try:
+            capture['plan'] = _redact(_explain(connection, sql, params))
+        except Exception as e:
+            capture['plan_error'] = _redact(str(e), first_line=True)
+    try:
+        _write(capture)
+    except OSError:
+        logger.exception("Could not write the slow-query log %s", log_path())
+
+
+def _capture_slow(connection, sql, params, many, seconds, error):
+    if seconds * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        _record(connection, sql, params, many, seconds,
+                f'{type(error).__name__}: {error}' if error is not None else None)
+
+
+def install():
+    """Record slow statements on every connection of this process"""
+    query_hooks.subscribe(_capture_slow)
+
+
+class SlowQueryMiddleware:
+    """Turn on the slow-query recorder and tell it which request each statement ran for"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_ENABLED:
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+    async def __acall__(self, request):
+        token = _request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request.reset(token)
@@ -0,0 +1,406 @@
+"""
+Synthetic data for load and query-count checks.
+
+generate() inserts the following, shaped like real usage:
+- companies with members and jobs;
+- developers with profiles;
+- job and profile swipes, the matches they imply, and wishlists.
+
+The shapes used:
+- Skill popularity is Zipf-distributed, so a few languages and tools
+  dominate profiles and job stacks.
+- Swipe activity follows a power law over users, and job and developer
+  popularity follow one over cards. The first users and jobs generated are
+  the most active and the most popular.
+- A company swipes back on reciprocal_rate of the developers who liked one
+  of its jobs, and each of those pairs gets a Match. Other company swipes
+  are picked independently and may occasionally be mutual without a Match.
+
+Rows are generated and written in chunks, so memory holds IDs rather than
+model instances. On PostgreSQL they're loaded with COPY, elsewhere with
+bulk_create. bulk_create stamps auto_now_add fields with the current time
+instead of the generated history. The same arguments always produce the
+same rows.
+"""
+import io
+import itertools
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.postgres.fields import ArrayField
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from jobs.models import JobPosting, Wishlist
+from jobs.utils import store_match_scores
+from profiles.models import DeveloperProfile, CompanyProfile, CompanyUsers
+from swipes.counters import reconcile_users
+from swipes.models import SwipeActions, Match, MatchParticipant
+
+User = get_user_model()
+
+EMAIL_DOMAIN = 'synthetic.test'
+# Signup doesn't accept '~' in usernames, so no real account can take one of these
+USERNAME_PREFIX = '~synthetic-'
+
+CITIES = ['Bangalore', 'Mumbai', 'Delhi', 'Pune', 'Hyderabad', 'Chennai', 'Kolkata', 'Noida', 'Gurgaon', 'Ahmedabad']
+LANGUAGES = ['Python', 'JavaScript', 'Java', 'TypeScript', 'Go', 'C++', 'C#', 'Kotlin', 'Rust', 'Ruby', 'Swift', 'PHP']
+TOOLS = ['React', 'Django', 'Docker', 'Node.js', 'Spring', 'Kubernetes', 'Flask', 'Angular', 'Vue', 'Terraform']
+DATABASES = ['PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'SQLite', 'Cassandra']
+CLOUDS = ['AWS', 'GCP', 'Azure', 'DigitalOcean']
+
+# Zipf exponents: skills across profiles/jobs, swipes across users, swipes across cards
+SKILL_SKEW = 1.1
+ACTIVITY_SKEW = 0.8
+POPULARITY_SKEW = 0.9
+
+# A user never swipes through more than this share of the available cards
+MAX_SWIPE_SHARE = 0.5
+
+# Generated activity reaches this far back
+HISTORY_DAYS = 180
+
+# Reconciled users per batch of counter queries
+RECONCILE_CHUNK = 1000
+
+
+class _Picker:
+    """Weighted choices from a fixed population, most popular first"""
+
+    def __init__(self, population, skew):
+        self.population = population
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(len(population))))
+
+    def one(self, rng):
+        return rng.choices(self.population, cum_weights=self.cum_weights)[0]
+
+    def distinct(self, rng, count):
+        """Up to `count` distinct items, favouring popular ones"""
+        count = min(count, len(self.population))
+        if count <= 0:
+            return []
+        picked = dict.fromkeys(rng.choices(self.population, cum_weights=self.cum_weights, k=count * 2))
+        if len(picked) < count:
+            # The tail is too thin to reach `count` by weight; top up uniformly
+            for item in rng.sample(self.population, count):
+                picked.setdefault(item)
+                if len(picked) >= count:
+                    break
+        return list(picked)[:count]
+
+
+def _activity(count, mean, skew, cap):
+    """Per-user action counts averaging `mean`, following a power law by rank"""
+    if not count:
+        return []
+    weights = [1 / (rank + 1) ** skew for rank in range(count)]
+    scale = mean * count / sum(weights)
+    return [min(cap, round(weight * scale)) for weight in weights]
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _moment(rng, now, days=HISTORY_DAYS):
+    return now - timedelta(seconds=rng.uniform(0, days * 86400))
+
+
+def _copy_text(field, obj, now):
+    """One column of a COPY text-format row"""
+    value = getattr(obj, field.attname)
+    if value is None and (getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)):
+        value = now
+    if value is None:
+        return r'\N'
+    if isinstance(field, ArrayField):
+        text = '{' + ','.join(
+            '"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"' for item in value
+        ) + '}'
+    elif isinstance(field, models.JSONField):
+        text = json.dumps(value)
+    elif isinstance(value, bool):
+        text = 't' if value else 'f'
+    elif isinstance(value, datetime):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy(model, objects, now):
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write('\t'.join(_copy_text(field, obj, now) for field in fields))
+        buffer.write('\n')
+
+    quote = connection.ops.quote_name
+    sql = (f"COPY {quote(model._meta.db_table)} "
+           f"({', '.join(quote(field.column) for field in fields)}) FROM STDIN")
+    with connection.cursor() as cursor:
+        if hasattr(cursor.cursor, 'copy_expert'):  # psycopg2
+            buffer.seek(0)
+            cursor.cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+class _Loader:
+    """Writes model instances in chunks with COPY or bulk_create and counts them"""
+
+    def __init__(self, chunk_size, use_copy, now, log):
+        self.chunk_size = chunk_size
+        self.use_copy = use_copy
+        self.now = now
+        self.log = log
+        self.counts = {}
+
+    def load(self, model, objects):
+        name = model._meta.model_name
+        iterator = iter(objects)
+        while chunk := list(itertools.islice(iterator, self.chunk_size)):
+            if self.use_copy:
+                _copy(model, chunk, self.now)
+            else:
+                model.objects.bulk_create(chunk, batch_size=1000)
+            self.counts[name] = self.counts.get(name, 0) + len(chunk)
+        self.log(f"{name}: {self.counts.get(name, 0):,} rows")
+
+
+def username(role, n):
+    """Username of the nth generated user of a role; n=0 is the most active"""
+    return f'{USERNAME_PREFIX}{role}{n}'
+
+
+def synthetic_users():
+    return User.objects.filter(username__startswith=USERNAME_PREFIX, email__endswith=f'@{EMAIL_DOMAIN}')
+
+
+def _delete_rows(model, pks_sql, params, cursor, path=()):
+    """
+    Delete the rows of `model` whose pk is selected by pks_sql, after what refers to
+    them: CASCADE and PROTECT children are deleted the same way first, SET_NULL
+    references are cleared. Each step is one statement over a subquery, so nothing
+    is loaded into Python and no signals run. Returns rows deleted.
+    """
+    qn = connection.ops.quote_name
+    meta = model._meta.concrete_model._meta
+    path += (meta.concrete_model,)
+    deleted = 0
+    for relation in meta.related_objects:
+        if relation.many_to_many:
+            continue  # auto-created through tables are cleared below, from this side or theirs
+        related = relation.related_model._meta.concrete_model
+        column = qn(relation.field.column)
+        if relation.on_delete in (models.CASCADE, models.PROTECT) and related not in path:
+            related_meta = related._meta
+            deleted += _delete_rows(
+                related,
+                f'SELECT {qn(related_meta.pk.column)} FROM {qn(related_meta.db_table)} '
+                f'WHERE {column} IN ({pks_sql})',
+                params, cursor, path
+            )
+        elif relation.on_delete is models.SET_NULL:
+            cursor.execute(f'UPDATE {qn(related._meta.db_table)} SET {column} = NULL WHERE {column} IN ({pks_sql})',
+                           params)
+    for field in meta.many_to_many:
+        through = field.remote_field.through._meta
+        if through.auto_created:
+            cursor.execute(f'DELETE FROM {qn(through.db_table)} WHERE {qn(field.m2m_column_name())} IN ({pks_sql})',
+                           params)
+    cursor.execute(f'DELETE FROM {qn(meta.db_table)} WHERE {qn(meta.pk.column)} IN ({pks_sql})', params)
+    return deleted + cursor.rowcount
+
+
+def delete_synthetic():
+    """
+    Delete the synthetic users and every row that hangs off them (profiles,
+    companies, jobs, swipes, matches, counters, ...) with set-based SQL, in one
+    transaction; returns rows deleted. Signals don't run, so counters and caches
+    of other users aren't adjusted: generate() only links synthetic users to
+    each other.
+    """
+    sql, params = synthetic_users().values('pk').query.sql_with_params()
+    with transaction.atomic(), connection.cursor() as cursor:
+        return _delete_rows(User, sql, params, cursor)
+
+
+def generate(developers, companies, jobs_per_company=3, swipes_per_developer=20, swipes_per_company=20,
+             reciprocal_rate=0.15, wishlist_per_user=3, seed=0, chunk_size=10000, use_copy=None, log=None):
+    """Insert a synthetic dataset; returns row counts by model name"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    log = log or (lambda message: None)
+    if use_copy is None:
+        use_copy = connection.vendor == 'postgresql'
+    loader = _Loader(chunk_size, use_copy, now, log)
+    password = make_password(None)
+
+    languages = _Picker(LANGUAGES, SKILL_SKEW)
+    tools = _Picker(TOOLS, SKILL_SKEW)
+    databases = _Picker(DATABASES, SKILL_SKEW)
+    clouds = _Picker(CLOUDS, SKILL_SKEW)
+    cities = _Picker(CITIES, SKILL_SKEW)
+
+    company_user_ids = [_uuid(rng) for _ in range(companies)]
+    company_ids = [_uuid(rng) for _ in range(companies)]
+    company_cities = [cities.one(rng) for _ in range(companies)]
+    developer_ids = [_uuid(rng) for _ in range(developers)]
+
+    # (job id, company index); companies post 1 to 2 * jobs_per_company - 1 jobs
+    jobs = [
+        (_uuid(rng), company)
+        for company in range(companies)
+        for _ in range(1 + rng.randrange(max(1, 2 * jobs_per_company - 1)))
+    ]
+    job_picker = _Picker(range(len(jobs)), POPULARITY_SKEW)
+    developer_picker = _Picker(range(developers), POPULARITY_SKEW)
+
+    # (company index, developer index) -> job index, for pairs that match
+    reciprocal = {}
+    wishlist = []
+
+    def users(role, ids):
+        for n, user_id in enumerate(ids):
+            joined = _moment(rng, now)
+            yield User(
+                id=user_id,
+                username=username(role, n),
+                email=f'{role}{n}@{EMAIL_DOMAIN}',
+                password=password,
+                role=role,
+                status='active',
+                date_joined=joined,
+                created_at=joined,
+                updated_at=joined,
+                last_ping=_moment(rng, now, days=30),
+                last_profile_update=joined
+            )
+
+    def company_profiles():
+        for n, (company_id, user_id) in enumerate(zip(company_ids, company_user_ids)):
+            yield CompanyProfile(id=company_id, created_by_user_id=user_id, name=f'Company {n}',
+                                 location=company_cities[n], created_at=_moment(rng, now))
+
+    def memberships():
+        for company_id, user_id in zip(company_ids, company_user_ids):
+            yield CompanyUsers(id=_uuid(rng), user_id=user_id, company_id=company_id, role='admin', joined_at=now)
+
+    def developer_profiles():
+        for n, user_id in enumerate(developer_ids):
+            yield DeveloperProfile(
+                id=_uuid(rng),
+                user_id=user_id,
+                name=f'Developer {n}',
+                city=cities.one(rng),
+                current_location=cities.one(rng),
+                experience_years=min(30, int(rng.expovariate(1 / 4))),
+                top_languages=languages.distinct(rng, 2),
+                tools=tools.distinct(rng, 2),
+                databases=databases.distinct(rng, 2),
+                clouds=clouds.distinct(rng, 1),
+                top_two_cities=cities.distinct(rng, 2),
+                created_at=_moment(rng, now)
+            )
+
+    def job_postings():
+        for n, (job_id, company) in enumerate(jobs):
+            stack = languages.distinct(rng, 2) + tools.distinct(rng, rng.randint(1, 2))
+            salary_min = rng.randrange(300000, 3000000, 50000)
+            yield JobPosting(
+                id=job_id,
+                company_id=company_ids[company],
+                created_by_id=company_user_ids[company],
+                title=f'{stack[0]} Engineer {n}',
+                description='Synthetic job posting',
+                job_type=rng.choices(['full-time', 'part-time', 'intern', 'contract'], weights=[80, 5, 10, 5])[0],
+                work_mode=rng.choices(['remote', 'in-office', 'hybrid'], weights=[30, 30, 40])[0],
+                tech_stack=stack,
+                location=company_cities[company],
+                salary_min=salary_min,
+                salary_max=salary_min + rng.randrange(100000, 1500000, 50000),
+                experience_required=rng.choice(['entry', 'mid', 'senior', 'lead']),
+                status=rng.choices(['active', 'closed', 'draft'], weights=[85, 10, 5])[0],
+                created_at=_moment(rng, now)
+            )
+
+    def job_swipes():
+        """Developer swipes on jobs; fills `reciprocal` and developers' wishlists"""
+        cap = max(1, int(len(jobs) * MAX_SWIPE_SHARE))
+        for developer, count in enumerate(_activity(developers, swipes_per_developer, ACTIVITY_SKEW, cap)):
+            liked = job_picker.distinct(rng, count)
+            for job in liked:
+                job_id, company = jobs[job]
+                yield SwipeActions(id=_uuid(rng), swiper_id=developer_ids[developer],
+                                   swiped_on_id=company_user_ids[company], job_post_id=job_id,
+                                   swipe_type='job', timestamp=_moment(rng, now, days=90))
+                if rng.random() < reciprocal_rate:
+                    reciprocal.setdefault((company, developer), job)
+
+            saved = job_picker.distinct(rng, min(cap, int(rng.expovariate(1 / wishlist_per_user))))
+            wishlist.extend(
+                Wishlist(id=_uuid(rng), user_id=developer_ids[developer], job_post_id=jobs[job][0],
+                         saved_on=_moment(rng, now, days=90))
+                for job in set(saved) - set(liked)
+            )
+
+    def profile_swipes():
+        """Company swipes on developers, including every swipe back; fills companies' bookmarks"""
+        cap = max(1, int(developers * MAX_SWIPE_SHARE))
+        swiped_back = {}
+        for company, developer in reciprocal:
+            swiped_back.setdefault(company, []).append(developer)
+
+        for company, count in enumerate(_activity(companies, swipes_per_company, ACTIVITY_SKEW, cap)):
+            liked = dict.fromkeys(swiped_back.get(company, []))
+            liked.update(dict.fromkeys(developer_picker.distinct(rng, count)))
+            for developer in liked:
+                yield SwipeActions(id=_uuid(rng), swiper_id=company_user_ids[company],
+                                   swiped_on_id=developer_ids[developer], swipe_type='profile',
+                                   timestamp=_moment(rng, now, days=90))
+
+            saved = developer_picker.distinct(rng, min(cap, int(rng.expovariate(1 / wishlist_per_user))))
+            wishlist.extend(
+                Wishlist(id=_uuid(rng), user_id=company_user_ids[company],
+                         wishlisted_user_id=developer_ids[developer], saved_on=_moment(rng, now, days=90))
+                for developer in set(saved) - set(liked)
+            )
+
+    with transaction.atomic():
+        loader.load(User, itertools.chain(users('company', company_user_ids), users('developer', developer_ids)))
+        loader.load(CompanyProfile, company_profiles())
+        loader.load(CompanyUsers, memberships())
+        loader.load(DeveloperProfile, developer_profiles())
+        loader.load(JobPosting, job_postings())
+        loader.load(SwipeActions, job_swipes())
+        loader.load(SwipeActions, profile_swipes())
+        loader.load(Wishlist, wishlist)
+
+        matches = []
+        for (company, developer), job in reciprocal.items():
+            user_1, user_2 = sorted((company_user_ids[company], developer_ids[developer]))
+            matches.append(Match(id=_uuid(rng), user_1_id=user_1, user_2_id=user_2, job_post_id=jobs[job][0],
+                                 status='active', matched_on=_moment(rng, now, days=60)))
+        loader.load(Match, matches)
+        # Match.create_if_mutual_swipe() normally stores the score
+        store_match_scores(Match.objects.filter(job_match_score__isnull=True))
+        # Match.save() normally keeps participants in step
+        loader.load(MatchParticipant, (
+            MatchParticipant(id=_uuid(rng), user_id=user_id, match_id=match.id,
+                             matched_on=match.matched_on, status=match.status)
+            for match in matches
+            for user_id in (match.user_1_id, match.user_2_id)
+        ))
+
+        user_ids = company_user_ids + developer_ids
+        for start in range(0, len(user_ids), RECONCILE_CHUNK):
+            reconcile_users(user_ids[start:start + RECONCILE_CHUNK])
+        log(f"activity counters: {len(user_ids):,} users reconciled")
+
+    return loader.counts
@@ -0,0 +1,84 @@
+"""
+Project-wide cache with tag-based invalidation.
+
+Each cached value is stored together with the versions of the tags it
+depends on (e.g. 'job:<id>'). invalidate_tags() bumps those versions after
+the transaction commits, which turns every value stored under an older
+version into a miss; nothing has to be found and deleted.
+
+get_many() reads tag versions before loading the missing rows, so a write
+that commits while a value is being built still invalidates what gets stored.
+Missing rows are loaded from the primary: a lagging replica could otherwise
+store pre-write data under the post-write version.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_versions import bump_on_commit, get_versions
+from .db_router import primary_reads
+
+
+def cache_enabled():
+    """Check if tagged values should be cached"""
+    return getattr(settings, 'TAG_CACHE_ENABLED', True)
+
+
+def _tag_key(tag):
+    return f'tag:v:{tag}'
+
+
+def invalidate_tags(*tags):
+    """Invalidate every value depending on any of these tags (after commit)"""
+    bump_on_commit(_tag_key(tag) for tag in tags if tag)
+
+
+def _tag_versions(tags):
+    """Current version of each tag, initialising missing ones"""
+    keys = {tag: _tag_key(tag) for tag in tags}
+    versions = get_versions(list(keys.values()))
+    return {tag: versions[key] for tag, key in keys.items()}
+
+
+def get_many(prefix, ids, tags_for, load, timeout=None):
+    """
+    Fetch values for ids in bulk, building misses with load(missing_ids).
+
+    tags_for(id) lists the tags a value depends on; load returns {id: value}
+    and may leave out ids that don't exist. IDs are handled as strings, and
+    the result is {str(id): value}.
+    """
+    ids = list(dict.fromkeys(str(value_id) for value_id in ids))
+    if not ids:
+        return {}
+    if not cache_enabled():
+        return {str(value_id): value for value_id, value in load(ids).items()}
+
+    tags = {value_id: tags_for(value_id) for value_id in ids}
+    versions = _tag_versions({tag for value_tags in tags.values() for tag in value_tags})
+    keys = {value_id: f'{prefix}:{value_id}' for value_id in ids}
+    entries = cache.get_many(keys.values())
+
+    values, missing = {}, []
+    for value_id in ids:
+        entry = entries.get(keys[value_id])
+        if entry and all(entry['tags'].get(tag) == versions[tag] for tag in tags[value_id]):
+            values[value_id] = entry['value']
+        else:
+            missing.append(value_id)
+
+    if missing:
+        with primary_reads():
+            loaded = {str(value_id): value for value_id, value in load(missing).items()}
+        cache.set_many(
+            {
+                keys[value_id]: {
+                    'tags': {tag: versions[tag] for tag in tags[value_id]},
+                    'value': value
+                }
+                for value_id, value in loaded.items() if value_id in keys
+            },
+            timeout=timeout if timeout is not None else getattr(settings, 'TAG_CACHE_TIMEOUT', 600)
+        )
+        values.update(loaded)
+
+    return values
@@ -0,0 +1,137 @@
+import json
+import tempfile
+import uuid
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from jobs.models import JobPosting
+from . import db_router, slow_queries, tag_cache
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Which alias ReplicaRouter picks for a request's reads"""
+
+    def setUp(self):
+        cache.clear()
+        self.router = db_router.ReplicaRouter()
+        self.user = mock.Mock(pk=uuid.uuid4())
+        patches = [
+            mock.patch.object(db_router, 'replica_configured', return_value=True),
+            mock.patch.object(db_router, 'replica_lag', return_value=0.0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        token = db_router.begin_request()
+        self.addCleanup(db_router.end_request, token)
+
+    def read_alias(self):
+        return self.router.db_for_read(JobPosting)
+
+    def test_reads_stay_on_primary_unless_the_view_opts_in(self):
+        self.assertEqual(self.read_alias(), 'default')
+        self.assertTrue(db_router.use_replica(self.user))
+        self.assertEqual(self.read_alias(), 'replica')
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        db_router.use_replica(self.user)
+        self.router.db_for_write(JobPosting)
+        self.assertEqual(self.read_alias(), 'default')
+        self.assertFalse(db_router.use_replica(self.user))
+
+    def test_primary_reads_overrides_the_request_policy(self):
+        db_router.use_replica(self.user)
+        with db_router.primary_reads():
+            self.assertEqual(self.read_alias(), 'default')
+        self.assertEqual(self.read_alias(), 'replica')
+
+    def test_recent_writer_is_pinned_to_the_primary(self):
+        db_router.mark_recent_write(self.user.pk)
+        self.assertFalse(db_router.use_replica(self.user))
+        self.assertEqual(self.read_alias(), 'default')
+
+    def test_lagging_or_unreachable_replica_is_skipped(self):
+        for lag in (db_router.max_lag() + 1, None):
+            with self.subTest(lag=lag), mock.patch.object(db_router, 'replica_lag', return_value=lag):
+                self.assertFalse(db_router.use_replica(self.user))
+                self.assertEqual(self.read_alias(), 'default')
+
+
+class TagCacheTests(TestCase):
+    """Values are reused until one of their tags is invalidated"""
+
+    def setUp(self):
+        cache.clear()
+        self.loads = []
+
+    def load(self, ids):
+        self.loads.append(sorted(ids))
+        return {value_id: f'value {value_id} #{len(self.loads)}' for value_id in ids if value_id != 'gone'}
+
+    def get(self, *ids, load=None):
+        return tag_cache.get_many('test', ids, lambda value_id: [f'item:{value_id}', 'shared'], load or self.load)
+
+    def test_misses_are_loaded_once(self):
+        self.assertEqual(self.get('a', 'b', 'gone'), {'a': 'value a #1', 'b': 'value b #1'})
+        self.assertEqual(self.get('a', 'b'), {'a': 'value a #1', 'b': 'value b #1'})
+        self.assertEqual(self.loads, [['a', 'b', 'gone']])
+
+    def test_invalidation_applies_after_commit(self):
+        self.get('a', 'b')
+        with self.captureOnCommitCallbacks(execute=True):
+            tag_cache.invalidate_tags('item:a')
+            self.assertEqual(self.get('a')['a'], 'value a #1')
+        self.assertEqual(self.get('a', 'b'), {'a': 'value a #2', 'b': 'value b #1'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag_cache.invalidate_tags('shared')
+        self.get('a', 'b')
+        self.assertEqual(self.loads[-1], ['a', 'b'])
+
+    def test_write_committed_during_a_load_invalidates_the_stored_value(self):
+        def load_racing_a_write(ids):
+            with self.captureOnCommitCallbacks(execute=True):
+                tag_cache.invalidate_tags('item:a')
+            return self.load(ids)
+
+        self.get('a', load=load_racing_a_write)
+        self.assertEqual(self.get('a')['a'], 'value a #2')
+
+
+class SlowQueryLogTests(SimpleTestCase):
+    """What a slow-query capture keeps of the user data a statement carries"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = Path(directory.name) / 'slow.jsonl'
+        token = slow_queries._request.set(RequestFactory().get('/api/jobs/', {'token': 'secret-token'}))
+        self.addCleanup(slow_queries._request.reset, token)
+
+    def capture(self):
+        with override_settings(SLOW_QUERY_LOG=str(self.log)):
+            slow_queries._record(
+                connection, 'SELECT id FROM users WHERE email = %s AND age > %s',
+                ['dev@example.com', 30], False, 0.5,
+                'IntegrityError: duplicate key\nDETAIL:  Key (email)=(dev@example.com) already exists.',
+            )
+        return json.loads(self.log.read_text().splitlines()[-1])
+
+    def test_user_data_is_redacted_by_default(self):
+        capture = self.capture()
+        self.assertEqual(capture['params'], ['<str>', '<int>'])
+        self.assertEqual(capture['request'], 'GET /api/jobs/')
+        self.assertEqual(capture['error'], 'IntegrityError: duplicate key')
+        self.assertNotIn('dev@example.com', json.dumps(capture))
+        self.assertEqual(slow_queries._redact("Filter: (email = 'dev@example.com'::text)"), "Filter: (email = '?'::text)")
+
+    @override_settings(SLOW_QUERY_LOG_PARAMS=True)
+    def test_log_params_setting_keeps_values(self):
+        capture = self.capture()
+        self.assertEqual(capture['params'], ['dev@example.com', 30])
+        self.assertEqual(capture['request'], 'GET /api/jobs/?token=secret-token')
+        self.assertIn('Key (email)=(dev@example.com)', capture['error'])
@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .server_timing import server_timing_histograms
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include([
@@ -24,5 +26,7 @@ urlpatterns = [
         path('profiles/', include('profiles.urls')),
         path('jobs/', include('jobs.urls')),
         path('swipes/', include('swipes.urls')), 
+        path('rollups/', include('rollups.urls')),
+        path('server-timing/', server_timing_histograms, name='server-timing'),
     ])),
 ]
\ No newline at end of file
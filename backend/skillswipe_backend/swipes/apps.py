@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SwipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'swipes'
+
+    def ready(self):
+        # Dashboard cache invalidation
+        from . import signals  # noqa: F401
@@ -0,0 +1,303 @@
+"""
+Async (ASGI-native) discover and dashboard views.
+
+They return the same payloads as DiscoverAPIView and DashboardAPIView, but a
+request waiting on the database doesn't hold a worker thread. Django's async
+ORM still runs every query of a request on one shared thread, one after the
+other, so queries that don't depend on each other go through _concurrently()
+instead: each runs on its own pool thread and connection, at the same time.
+
+The deck is picked speculatively: the newest candidates are fetched together
+with the swiped/wishlisted/passed sets and filtered in Python. Only when too
+many of them turn out to be excluded is the deck queried again with the
+exclusions applied in SQL.
+
+They only run concurrently when served through skillswipe_backend/asgi.py;
+under WSGI Django gives each request its own event loop.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from authentication.backends import CachedJWTAuthentication
+from jobs.analytics import record_job_activity
+from jobs.cards import get_job_cards
+from jobs.models import JobPosting, Wishlist
+from profiles.cards import get_developer_cards
+from skillswipe_backend.db_router import use_replica, stop_replica, primary_reads
+from skillswipe_backend.query_budget import query_budget
+from skillswipe_backend.server_timing import phase
+from . import dashboard_cache
+from .models import SwipeActions, PassedCards
+from .views import DashboardAPIView, TAB_ERROR, tabs_payload, filter_jobs, filter_developers
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+DECK_SIZE = 20
+
+# Extra candidates fetched alongside the exclusion sets
+CANDIDATE_HEADROOM = 30
+
+# Each worker holds its own database connection
+_query_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'ASYNC_QUERY_WORKERS', 10),
+    thread_name_prefix='async-query'
+)
+
+_authenticator = CachedJWTAuthentication()
+
+
+def _on_own_connection(func):
+    # Pool threads hold their own DB connection; apply the usual per-request lifecycle
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def _concurrently(*funcs):
+    """Run zero-argument sync callables at the same time, each on its own thread and connection"""
+    return await asyncio.gather(*(
+        sync_to_async(_on_own_connection, thread_sensitive=False, executor=_query_executor)(func)
+        for func in funcs
+    ))
+
+
+def _json(payload, status_code=status.HTTP_200_OK):
+    # DRF's encoder, so dates and decimals render exactly as in the sync views
+    with phase('render'):
+        return JsonResponse(payload, status=status_code, encoder=JSONEncoder, safe=False)
+
+
+async def _authenticate(request):
+    """Resolve the JWT user; returns (user, None) or (None, 401 response)"""
+    try:
+        with phase('auth'):
+            result = await sync_to_async(_authenticator.authenticate)(request)
+    except AuthenticationFailed as e:
+        detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+        return None, _json(detail, status.HTTP_401_UNAUTHORIZED)
+    if result is None:
+        return None, _json({'detail': 'Authentication credentials were not provided.'},
+                           status.HTTP_401_UNAUTHORIZED)
+    # Lets the routing middleware see who made the request
+    request.user = result[0]
+    return result[0], None
+
+
+def _swiped_ids(user, swipe_type):
+    field = 'job_post_id' if swipe_type == 'job' else 'swiped_on_id'
+    return set(SwipeActions.objects.filter(swiper=user, swipe_type=swipe_type).values_list(field, flat=True))
+
+
+def _wishlisted_ids(user, field):
+    return set(Wishlist.objects.filter(user=user, **{f'{field}__isnull': False}).values_list(field, flat=True))
+
+
+def _passed_ids(user, kind):
+    passed_jobs, passed_users = PassedCards.for_user(user)
+    return passed_jobs if kind == 'job' else passed_users
+
+
+def _job_candidates(params, limit, excluded=()):
+    queryset = filter_jobs(JobPosting.objects.filter(status='active'), params)
+    if excluded:
+        queryset = queryset.exclude(id__in=excluded)
+    return list(queryset.order_by('-created_at').values_list('id', flat=True)[:limit])
+
+
+def _developer_candidates(user, params, limit, excluded=()):
+    queryset = User.objects.filter(role='developer', is_active=True).exclude(id=user.id)
+    queryset = filter_developers(queryset, params)
+    if excluded:
+        queryset = queryset.exclude(id__in=excluded)
+    return list(queryset.order_by('-date_joined').values_list('id', flat=True)[:limit])
+
+
+async def _pick_deck(candidates, *exclusions):
+    """
+    Newest DECK_SIZE candidate IDs not in any exclusion set.
+    candidates(limit, excluded) and each exclusion loader are sync callables.
+    """
+    pool, *excluded_sets = await _concurrently(
+        partial(candidates, DECK_SIZE + CANDIDATE_HEADROOM), *exclusions
+    )
+    excluded = set().union(*excluded_sets)
+    deck = [candidate for candidate in pool if candidate not in excluded]
+
+    if len(deck) < DECK_SIZE and len(pool) == DECK_SIZE + CANDIDATE_HEADROOM:
+        # Most of the newest candidates were excluded; apply the exclusions in SQL
+        deck, = await _concurrently(partial(candidates, DECK_SIZE, excluded))
+    return deck[:DECK_SIZE]
+
+
+async def _job_deck(user, params, exclude_wishlisted):
+    exclusions = [partial(_swiped_ids, user, 'job'), partial(_passed_ids, user, 'job')]
+    if exclude_wishlisted:
+        exclusions.append(partial(_wishlisted_ids, user, 'job_post_id'))
+    job_ids = await _pick_deck(partial(_job_candidates, params), *exclusions)
+
+    # Card fetch and impression counting don't depend on each other
+    cards, _ = await _concurrently(
+        partial(get_job_cards, job_ids, user),
+        partial(record_job_activity, impressions=job_ids)
+    )
+    return cards
+
+
+async def _developer_deck(user, params, exclude_bookmarked):
+    exclusions = [partial(_swiped_ids, user, 'profile'), partial(_passed_ids, user, 'profile')]
+    if exclude_bookmarked:
+        exclusions.append(partial(_wishlisted_ids, user, 'wishlisted_user_id'))
+    developer_ids = await _pick_deck(partial(_developer_candidates, user, params), *exclusions)
+
+    cards, = await _concurrently(partial(get_developer_cards, developer_ids))
+    return cards
+
+
+@require_GET
+async def discover_async(request):
+    """Async DiscoverAPIView"""
+    user, error = await _authenticate(request)
+    if error:
+        return error
+
+    # Measuring replica lag may query the replica
+    await sync_to_async(use_replica)(user)
+    try:
+        if user.role == 'developer':
+            cards = await _job_deck(user, request.GET, exclude_wishlisted=False)
+            card_type = 'jobs'
+        else:  # company
+            cards = await _developer_deck(user, request.GET, exclude_bookmarked=False)
+            card_type = 'developers'
+    finally:
+        stop_replica()
+
+    return _json({
+        'type': card_type,
+        'count': len(cards),
+        'results': cards
+    })
+
+
+async def _for_me_payload(user):
+    """The for_me tab, with its queries issued concurrently"""
+    if user.role == 'developer':
+        cards = await _job_deck(user, {}, exclude_wishlisted=True)
+        return {
+            'tab': 'for_me',
+            'title': 'Discover New Job Opportunities',
+            'type': 'jobs',
+            'count': len(cards),
+            'results': cards
+        }
+    cards = await _developer_deck(user, {}, exclude_bookmarked=True)
+    return {
+        'tab': 'for_me',
+        'title': 'Discover New Developer Talent',
+        'type': 'developers',
+        'count': len(cards),
+        'results': cards
+    }
+
+
+async def _tab_payload(view, drf_request, tab):
+    """(payload, status, cache state) for one tab; other tabs run their sync handler on a pool thread"""
+    if tab != 'for_me':
+        result, = await _concurrently(partial(view._get_tab_payload, drf_request, tab))
+        return result
+
+    user = drf_request.user
+    if not dashboard_cache.cache_enabled():
+        return await _for_me_payload(user), status.HTTP_200_OK, 'off'
+
+    key, payload = await sync_to_async(dashboard_cache.get_cached_tab)(user.id, tab)
+    if payload is not None:
+        if payload.get('type') == 'jobs':
+            # Cached cards are still served cards
+            await _concurrently(partial(record_job_activity, impressions=[job['id'] for job in payload['results']]))
+        return payload, status.HTTP_200_OK, 'hit'
+
+    # Built from the primary, so a lagging replica can't fill the new version with old data
+    with primary_reads():
+        payload = await _for_me_payload(user)
+    await sync_to_async(dashboard_cache.set_cached_tab)(key, payload)
+    return payload, status.HTTP_200_OK, 'miss'
+
+
+async def _timed_tab(view, drf_request, tab):
+    started = time.perf_counter()
+    succeeded = True
+    try:
+        payload, _, _ = await _tab_payload(view, drf_request, tab)
+    except Exception:
+        logger.exception("Dashboard tab %s failed for user %s", tab, drf_request.user.pk)
+        payload, succeeded = {'tab': tab, 'error': TAB_ERROR}, False
+    return payload, round((time.perf_counter() - started) * 1000, 2), succeeded
+
+
+@query_budget(DashboardAPIView.query_budget)
+@require_GET
+async def dashboard_async(request):
+    """Async DashboardAPIView; composite requests compute their tabs concurrently"""
+    user, error = await _authenticate(request)
+    if error:
+        return error
+
+    # The sync tab handlers expect a DRF request
+    drf_request = Request(request)
+    drf_request.user = user
+    view = DashboardAPIView()
+
+    await sync_to_async(use_replica)(user)
+    try:
+        tabs = request.GET.get('tabs')
+        if tabs:
+            requested = list(view.TABS) if tabs == 'all' else [tab.strip() for tab in tabs.split(',') if tab.strip()]
+            invalid = [tab for tab in requested if tab not in view.TABS]
+            if invalid or not requested:
+                return _json(
+                    {'error': f"Invalid tabs: {', '.join(invalid) or tabs}. Use 'all' or a comma-separated list of: "
+                              f"{', '.join(view.TABS)}"},
+                    status.HTTP_400_BAD_REQUEST
+                )
+
+            started = time.perf_counter()
+            outcomes = await asyncio.gather(*(_timed_tab(view, drf_request, tab) for tab in requested))
+            payload, status_code = tabs_payload(
+                {tab: payload for tab, (payload, _, _) in zip(requested, outcomes)},
+                {tab: elapsed for tab, (_, elapsed, _) in zip(requested, outcomes)},
+                [tab for tab, (_, _, succeeded) in zip(requested, outcomes) if not succeeded],
+                started
+            )
+            return _json(payload, status_code)
+
+        tab = request.GET.get('tab', 'for_me')
+        if tab not in view.TABS:
+            return _json(
+                {'error': 'Invalid tab. Choose: for_me, showed_interest, my_swipes, matches, stats'},
+                status.HTTP_400_BAD_REQUEST
+            )
+        payload, status_code, cache_state = await _tab_payload(view, drf_request, tab)
+        response = _json(payload, status_code)
+        response['X-Dashboard-Cache'] = cache_state
+        return response
+    finally:
+        stop_replica()
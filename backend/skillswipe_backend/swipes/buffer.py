@@ -0,0 +1,133 @@
+"""
+Write-behind buffering for swipe bursts.
+
+When SWIPE_WRITE_BEHIND is enabled, swipes are staged in swipe_buffer and
+acknowledged immediately. flush_swipe_buffer() moves them into swipe_actions
+in batches and runs match detection. The move and the delete happen in one
+transaction, so entries left behind by a crashed flusher are replayed on the
+next run.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+
+from .models import SwipeActions, SwipeBuffer, Match
+from .counters import swipe_deltas, apply_counter_deltas
+from .dashboard_cache import bump_users
+from jobs.models import JobPosting
+from jobs.analytics import record_job_activity
+
+User = get_user_model()
+
+
+def write_behind_enabled():
+    """Check if swipes should be staged instead of written synchronously"""
+    return getattr(settings, 'SWIPE_WRITE_BEHIND', False)
+
+
+def is_duplicate_swipe(swiper, swiped_on, job_post, swipe_type):
+    """Check if the swipe is already recorded in swipe_actions"""
+    if swipe_type == 'job':
+        return SwipeActions.objects.filter(
+            swiper=swiper, job_post=job_post, swipe_type='job'
+        ).exists()
+    return SwipeActions.objects.filter(
+        swiper=swiper, swiped_on=swiped_on, swipe_type='profile'
+    ).exists()
+
+
+def buffer_swipe(swiper, swiped_on, job_post, swipe_type):
+    """
+    Stage a swipe for the flusher.
+    Returns the buffered entry, or None if the swipe already exists.
+    """
+    if is_duplicate_swipe(swiper, swiped_on, job_post, swipe_type):
+        return None
+
+    try:
+        with transaction.atomic():
+            return SwipeBuffer.objects.create(
+                swiper=swiper,
+                swiped_on=swiped_on,
+                job_post=job_post,
+                swipe_type=swipe_type
+            )
+    except IntegrityError:
+        # Already waiting in the buffer
+        return None
+
+
+def _move_to_swipe_actions(entry_ids):
+    """
+    Copy buffered rows into swipe_actions, skipping ones that already exist.
+    Returns (swiper_id, swiped_on_id, job_post_id) for each row actually inserted.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {SwipeActions._meta.db_table}
+                (id, swiper_id, swiped_on_id, job_post_id, swipe_type, timestamp)
+            SELECT id, swiper_id, swiped_on_id, job_post_id, swipe_type, timestamp
+            FROM {SwipeBuffer._meta.db_table}
+            WHERE id = ANY(%s)
+            ORDER BY timestamp
+            ON CONFLICT DO NOTHING
+            RETURNING swiper_id, swiped_on_id, job_post_id
+            """,
+            [list(entry_ids)]
+        )
+        return cursor.fetchall()
+
+
+def flush_swipe_buffer(batch_size=None):
+    """
+    Move one batch of buffered swipes into swipe_actions and detect matches.
+    Returns (flushed_count, inserted_count, matches_created).
+    """
+    batch_size = batch_size or getattr(settings, 'SWIPE_FLUSH_BATCH_SIZE', 1000)
+
+    with transaction.atomic():
+        # SKIP LOCKED lets several flushers drain the buffer side by side
+        entries = list(
+            SwipeBuffer.objects.select_for_update(skip_locked=True)
+            .order_by('timestamp')[:batch_size]
+        )
+        if not entries:
+            return 0, 0, 0
+
+        entry_ids = [entry.id for entry in entries]
+        inserted = _move_to_swipe_actions(entry_ids)
+        
+        # Counters only for rows that weren't duplicates
+        deltas = {}
+        for swiper_id, swiped_on_id, _ in inserted:
+            swipe_deltas(deltas, swiper_id, swiped_on_id)
+        apply_counter_deltas(deltas)
+        bump_users(*deltas)
+        record_job_activity(right_swipes=[job_post_id for _, _, job_post_id in inserted])
+
+        # Load everything match detection needs in two queries
+        user_ids = {entry.swiper_id for entry in entries} | {entry.swiped_on_id for entry in entries}
+        users = User.objects.in_bulk(user_ids)
+        job_ids = {entry.job_post_id for entry in entries if entry.job_post_id}
+        jobs = JobPosting.objects.in_bulk(job_ids) if job_ids else {}
+
+        # Every swipe in the batch is already visible here, so swipes that
+        # match each other inside the same batch are detected too
+        matches_created = 0
+        for entry in entries:
+            swiper = users.get(entry.swiper_id)
+            swiped_on = users.get(entry.swiped_on_id)
+            if not swiper or not swiped_on:
+                continue
+            _, created = Match.create_if_mutual_swipe(
+                swiper=swiper,
+                swiped_on=swiped_on,
+                job_post=jobs.get(entry.job_post_id)
+            )
+            if created:
+                matches_created += 1
+
+        SwipeBuffer.objects.filter(id__in=entry_ids).delete()
+
+    return len(entries), len(inserted), matches_created
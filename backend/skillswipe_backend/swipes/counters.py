@@ -0,0 +1,216 @@
+"""
+Maintenance of the denormalized user_activity_counters table.
+
+Swipe and match writes add deltas with apply_counter_deltas(), which issues a
+single multi-row upsert. Deletes and match status changes go through
+adjust_counters(), which only touches existing rows. reconcile_users() recomputes exact values from
+swipe_actions and match_participant and is used by the reconcile_activity_counters command
+and for users that don't have a counters row yet.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import SwipeActions, MatchParticipant, UserActivityCounters
+
+
+EPOCH = date(1970, 1, 1)
+
+COUNTER_FIELDS = ['swipes_made', 'swipes_received', 'total_matches', 'active_matches']
+
+
+def bucket_slot(day):
+    """Zero-based ring slot holding the given day"""
+    return (day - EPOCH).days % UserActivityCounters.BUCKET_COUNT
+
+
+def add_delta(deltas, user_id, **increments):
+    """Accumulate counter increments for one user"""
+    user_delta = deltas.setdefault(str(user_id), defaultdict(int))
+    for field, value in increments.items():
+        user_delta[field] += value
+
+
+def swipe_deltas(deltas, swiper_id, swiped_on_id, sign=1):
+    """Add the counter changes caused by one swipe (sign=-1 for a deleted one)"""
+    add_delta(deltas, swiper_id, swipes_made=sign, recent_swipes=sign)
+    add_delta(deltas, swiped_on_id, swipes_received=sign, recent_swipes=sign)
+
+
+def match_deltas(deltas, match, sign=1):
+    """Add the counter changes caused by one new match (sign=-1 for a deleted one)"""
+    active = sign if match.status == 'active' else 0
+    for user_id in (match.user_1_id, match.user_2_id):
+        add_delta(deltas, user_id, total_matches=sign, active_matches=active, recent_matches=sign)
+
+
+def apply_counter_deltas(deltas, today=None):
+    """
+    Add per-user deltas to user_activity_counters in one upsert.
+    Call inside the transaction that writes the swipe or match.
+    """
+    if not deltas:
+        return
+
+    today = today or timezone.now().date()
+
+    bucket_count = UserActivityCounters.BUCKET_COUNT
+    slot = bucket_slot(today)
+    # Postgres arrays are 1-based
+    index = slot + 1
+
+    rows, params = [], []
+    # Sorted so concurrent writers lock rows in the same order
+    for user_id in sorted(deltas):
+        delta = deltas[user_id]
+        days = [None] * bucket_count
+        swipes = [0] * bucket_count
+        matches = [0] * bucket_count
+        days[slot] = today
+        swipes[slot] = delta['recent_swipes']
+        matches[slot] = delta['recent_matches']
+
+        rows.append("(%s, %s, %s, %s, %s, %s::date[], %s::integer[], %s::integer[], now())")
+        params += [user_id] + [delta[field] for field in COUNTER_FIELDS] + [days, swipes, matches]
+
+    counter_updates = ',\n'.join(f"{field} = c.{field} + EXCLUDED.{field}" for field in COUNTER_FIELDS)
+    sql = f"""
+        INSERT INTO {UserActivityCounters._meta.db_table} AS c
+            (user_id, {', '.join(COUNTER_FIELDS)},
+             bucket_days, bucket_swipes, bucket_matches, updated_at)
+        VALUES {', '.join(rows)}
+        ON CONFLICT (user_id) DO UPDATE SET
+            {counter_updates},
+            bucket_swipes[{index}] = CASE WHEN c.bucket_days[{index}] = EXCLUDED.bucket_days[{index}]
+                THEN c.bucket_swipes[{index}] ELSE 0 END + EXCLUDED.bucket_swipes[{index}],
+            bucket_matches[{index}] = CASE WHEN c.bucket_days[{index}] = EXCLUDED.bucket_days[{index}]
+                THEN c.bucket_matches[{index}] ELSE 0 END + EXCLUDED.bucket_matches[{index}],
+            bucket_days[{index}] = EXCLUDED.bucket_days[{index}],
+            updated_at = EXCLUDED.updated_at
+        RETURNING user_id, xmax = 0
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        # xmax is 0 on rows the statement inserted rather than updated
+        inserted = [user_id for user_id, is_new in cursor.fetchall() if is_new]
+    # A user who had no row now has one holding only this delta. Rebuild it from
+    # the source tables, which already include this transaction's writes.
+    if inserted:
+        reconcile_users(inserted, today)
+
+
+def adjust_counters(deltas, day=None):
+    """
+    Add per-user deltas to existing counters rows, with the recent deltas going
+    to day's bucket while the ring still holds that day. Users without a row
+    are skipped; get_user_counters() builds their row from the source tables.
+    Used for deletes, where an inserted row would have nothing to rebuild from,
+    and for match status changes.
+    """
+    if not deltas:
+        return
+
+    day = day or timezone.now().date()
+    # Postgres arrays are 1-based
+    index = bucket_slot(day) + 1
+
+    rows, params = [], []
+    for user_id in sorted(deltas):
+        delta = deltas[user_id]
+        rows.append("(%s::uuid, %s, %s, %s, %s, %s, %s)")
+        params += [user_id] + [delta[field] for field in COUNTER_FIELDS] + [delta['recent_swipes'],
+                                                                             delta['recent_matches']]
+
+    counter_updates = ',\n'.join(f"{field} = c.{field} + d.{field}" for field in COUNTER_FIELDS)
+    sql = f"""
+        UPDATE {UserActivityCounters._meta.db_table} AS c SET
+            {counter_updates},
+            bucket_swipes[{index}] = CASE WHEN c.bucket_days[{index}] = %s
+                THEN c.bucket_swipes[{index}] + d.recent_swipes ELSE c.bucket_swipes[{index}] END,
+            bucket_matches[{index}] = CASE WHEN c.bucket_days[{index}] = %s
+                THEN c.bucket_matches[{index}] + d.recent_matches ELSE c.bucket_matches[{index}] END,
+            updated_at = now()
+        FROM (VALUES {', '.join(rows)})
+            AS d(user_id, {', '.join(COUNTER_FIELDS)}, recent_swipes, recent_matches)
+        WHERE c.user_id = d.user_id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [day, day] + params)
+
+
+def _grouped_counts(queryset, *group_by):
+    """Run a grouped COUNT and return {group_key: count}"""
+    rows = queryset.order_by().values_list(*group_by).annotate(n=Count('pk'))
+    if len(group_by) == 1:
+        return {row[0]: row[1] for row in rows}
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def reconcile_users(user_ids, today=None):
+    """Recompute exact counters for the given users and overwrite their rows"""
+    user_ids = [uuid.UUID(str(user_id)) for user_id in user_ids]
+    if not user_ids:
+        return 0
+
+    today = today or timezone.now().date()
+    bucket_count = UserActivityCounters.BUCKET_COUNT
+    cutoff = today - timedelta(days=bucket_count - 1)
+
+    swipes = SwipeActions.objects.all()
+    recent_swipes = swipes.filter(timestamp__date__gte=cutoff).annotate(day=TruncDate('timestamp'))
+    matches = MatchParticipant.objects.filter(user_id__in=user_ids)
+    recent_matches = matches.filter(matched_on__date__gte=cutoff).annotate(day=TruncDate('matched_on'))
+
+    made = _grouped_counts(swipes.filter(swiper_id__in=user_ids), 'swiper_id')
+    received = _grouped_counts(swipes.filter(swiped_on_id__in=user_ids), 'swiped_on_id')
+    daily_made = _grouped_counts(recent_swipes.filter(swiper_id__in=user_ids), 'swiper_id', 'day')
+    daily_received = _grouped_counts(recent_swipes.filter(swiped_on_id__in=user_ids), 'swiped_on_id', 'day')
+
+    total_matches = _grouped_counts(matches, 'user_id')
+    active_matches = _grouped_counts(matches.filter(status='active'), 'user_id')
+    daily_matches = _grouped_counts(recent_matches, 'user_id', 'day')
+
+    counters = []
+    for user_id in user_ids:
+        days = [None] * bucket_count
+        day_swipes = [0] * bucket_count
+        day_matches = [0] * bucket_count
+        for offset in range(bucket_count):
+            day = today - timedelta(days=offset)
+            slot = bucket_slot(day)
+            days[slot] = day
+            day_swipes[slot] = daily_made.get((user_id, day), 0) + daily_received.get((user_id, day), 0)
+            day_matches[slot] = daily_matches.get((user_id, day), 0)
+
+        counters.append(UserActivityCounters(
+            user_id=user_id,
+            swipes_made=made.get(user_id, 0),
+            swipes_received=received.get(user_id, 0),
+            total_matches=total_matches.get(user_id, 0),
+            active_matches=active_matches.get(user_id, 0),
+            bucket_days=days,
+            bucket_swipes=day_swipes,
+            bucket_matches=day_matches
+        ))
+
+    UserActivityCounters.objects.bulk_create(
+        counters,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=COUNTER_FIELDS + ['bucket_days', 'bucket_swipes', 'bucket_matches', 'updated_at']
+    )
+    return len(counters)
+
+
+def get_user_counters(user):
+    """Primary-key read of the user's counters, building the row on first use"""
+    counters = UserActivityCounters.objects.filter(user=user).first()
+    if counters is None:
+        reconcile_users([user.id])
+        counters = UserActivityCounters.objects.get(user=user)
+    return counters
@@ -0,0 +1,91 @@
+"""
+Versioned cache for DashboardAPIView tab responses.
+
+A cached tab is keyed by user, tab and version numbers:
+- the user's own version, bumped by their swipes, matches, passes,
+  wishlist changes and profile edits;
+- a global content version, bumped by job and profile writes, which change
+  the cards every user may see. The stats tab ignores it.
+
+Bumping a version orphans the old entries, so invalidation is exact and costs
+one cache write. Hits and misses are counted in the cache so hit rates cover
+every worker process.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from skillswipe_backend.cache_versions import bump_on_commit, get_versions
+
+
+CONTENT_VERSION_KEY = 'dashboard:v:content'
+
+# Tabs whose payload doesn't include other users' jobs or profiles
+USER_ONLY_TABS = {'stats'}
+
+
+def cache_enabled():
+    """Check if dashboard responses should be cached"""
+    return getattr(settings, 'DASHBOARD_CACHE_ENABLED', True)
+
+
+def _user_version_key(user_id):
+    return f'dashboard:v:user:{user_id}'
+
+
+def bump_users(*user_ids):
+    """Invalidate every cached tab for these users"""
+    bump_on_commit(_user_version_key(user_id) for user_id in user_ids if user_id)
+
+
+def bump_content():
+    """Invalidate card-bearing tabs for everyone (a job or profile changed)"""
+    bump_on_commit([CONTENT_VERSION_KEY])
+
+
+def _tab_key(user_id, tab):
+    """Build the current cache key for a user's tab"""
+    user_key = _user_version_key(user_id)
+    versions = get_versions([user_key, CONTENT_VERSION_KEY])
+
+    content_version = 0 if tab in USER_ONLY_TABS else versions[CONTENT_VERSION_KEY]
+    return f'dashboard:{user_id}:{tab}:{versions[user_key]}:{content_version}'
+
+
+def get_cached_tab(user_id, tab):
+    """Return (cache_key, cached payload or None)"""
+    key = _tab_key(user_id, tab)
+    payload = cache.get(key)
+    _count(tab, 'hit' if payload is not None else 'miss')
+    return key, payload
+
+
+def set_cached_tab(key, payload):
+    """Store a computed tab payload under the key from get_cached_tab"""
+    cache.set(key, payload, timeout=getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+
+
+def _count(tab, outcome):
+    key = f'dashboard:stats:{tab}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_hit_stats(tabs):
+    """Hits, misses and hit rate per tab"""
+    keys = [f'dashboard:stats:{tab}:{outcome}' for tab in tabs for outcome in ('hit', 'miss')]
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for tab in tabs:
+        hits = counts.get(f'dashboard:stats:{tab}:hit', 0)
+        misses = counts.get(f'dashboard:stats:{tab}:miss', 0)
+        total = hits + misses
+        stats[tab] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0
+        }
+    return stats
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from skillswipe_backend.benchmarking import percentiles
+
+User = get_user_model()
+
+ENDPOINTS = {
+    'discover': ('discover-cards', 'discover-cards-async', ''),
+    'dashboard': ('dashboard', 'dashboard-async', '?tabs=all'),
+}
+
+
+class Command(BaseCommand):
+    """Compare the sync (WSGI) and async (ASGI) discover/dashboard views under concurrency"""
+
+    help = (
+        "Send the same requests to the sync view through the WSGI handler (one thread per "
+        "in-flight request) and to its async twin through the ASGI handler (one event loop), "
+        "at each concurrency level, and report req/s and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', default='discover', choices=sorted(ENDPOINTS))
+        parser.add_argument('--requests', type=int, default=200, help="Requests per run")
+        parser.add_argument('--concurrency', default='1,10,50', help="Comma-separated in-flight request counts")
+        parser.add_argument('--user', help="Email of the user to request as (default: first active developer)")
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.by_email(options['user']).first()
+        else:
+            user = User.objects.filter(role='developer', is_active=True).first()
+        if not user:
+            raise CommandError("Need an active user to request as")
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(f"Running against {connection.vendor}; numbers won't transfer"))
+
+        sync_name, async_name, query = ENDPOINTS[options['endpoint']]
+        sync_path = reverse(sync_name) + query
+        async_path = reverse(async_name) + query
+        auth = f'Bearer {AccessToken.for_user(user)}'
+        levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for level in levels:
+                self._report(f"wsgi  c={level}", self._run_wsgi(sync_path, auth, options['requests'], level))
+                self._report(f"asgi  c={level}", asyncio.run(self._run_asgi(async_path, auth, options['requests'], level)))
+
+    def _run_wsgi(self, path, auth, total, concurrency):
+        """Send `total` requests from `concurrency` threads; returns (elapsed, latencies, errors)"""
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        lock = threading.Lock()
+        remaining = [total]
+        latencies, errors = [], [0]
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    environ = factory.get(path, HTTP_AUTHORIZATION=auth).environ
+                    started = time.perf_counter()
+                    response = handler(environ, lambda status, headers: None)
+                    # Closing the response fires request_finished, like a real server
+                    response.close()
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                        if response.status_code >= 400:
+                            errors[0] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started, latencies, errors[0]
+
+    async def _run_asgi(self, path, auth, total, concurrency):
+        """Send `total` requests with `concurrency` in flight on one event loop"""
+        client = AsyncClient()
+        remaining = [total]
+        latencies, errors = [], [0]
+
+        async def worker():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                started = time.perf_counter()
+                response = await client.get(path, headers={'Authorization': auth})
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors[0] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies, errors[0]
+
+    def _report(self, label, result):
+        elapsed, latencies, errors = result
+        p50, p95 = percentiles(latencies)
+        self.stdout.write(
+            f"{label}: {len(latencies) / elapsed:,.1f} req/s p50={p50:.1f}ms p95={p95:.1f}ms errors={errors}"
+        )
@@ -0,0 +1,99 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from skillswipe_backend.benchmarking import percentiles
+from swipes.models import SwipeActions
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Measure swipe_actions insert throughput and per-user query latency"""
+
+    help = (
+        "Benchmark swipe_actions inserts (rolled back) and the per-user queries "
+        "used by swipes/views.py, and check partition pruning with EXPLAIN. "
+        "Load a large dataset first to get numbers at production scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inserts', type=int, default=5000,
+                            help="Single-row inserts to time (rolled back afterwards)")
+        parser.add_argument('--users', type=int, default=200,
+                            help="Number of swipers to sample for query latency")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        developers = list(User.objects.filter(role='developer').values_list('id', flat=True)[:5000])
+        companies = list(User.objects.filter(role='company').values_list('id', flat=True)[:5000])
+        if not developers or not companies:
+            raise CommandError("Need at least one developer and one company user")
+
+        # Planner estimate is instant even at 50M+ rows
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(SUM(c.reltuples), 0)::bigint FROM pg_class c "
+                "WHERE c.relkind = 'r' AND (c.relname = %s OR c.relname LIKE %s)",
+                [SwipeActions._meta.db_table, f'{SwipeActions._meta.db_table}\\_p%']
+            )
+            estimated_rows = cursor.fetchone()[0]
+        self.stdout.write(f"swipe_actions rows (estimate): {estimated_rows:,}")
+
+        self._benchmark_inserts(rng, developers, companies, options['inserts'])
+        self._benchmark_queries(rng, developers + companies, options['users'])
+        self._check_pruning(developers[0])
+
+    def _benchmark_inserts(self, rng, developers, companies, count):
+        """Time single-row inserts the way SwipeAPIView issues them"""
+        with transaction.atomic():
+            started = time.perf_counter()
+            for _ in range(count):
+                # Conflicts are skipped so random pairs can't abort the run
+                SwipeActions.objects.bulk_create([
+                    SwipeActions(
+                        swiper_id=rng.choice(companies),
+                        swiped_on_id=rng.choice(developers),
+                        swipe_type='profile'
+                    )
+                ], ignore_conflicts=True)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Inserts: {count} in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s)")
+
+    def _benchmark_queries(self, rng, user_ids, sample_size):
+        """Time the per-user lookups the discover and dashboard paths run"""
+        sample = rng.sample(user_ids, min(sample_size, len(user_ids)))
+        made, received = [], []
+
+        for user_id in sample:
+            started = time.perf_counter()
+            list(SwipeActions.objects.filter(swiper_id=user_id).values_list('swiped_on_id', 'job_post_id'))
+            made.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            SwipeActions.objects.filter(swiped_on_id=user_id).count()
+            received.append(time.perf_counter() - started)
+
+        for label, samples in [('swipes made (by swiper)', made), ('swipes received (by swiped_on)', received)]:
+            p50, p95 = percentiles(samples)
+            self.stdout.write(f"{label}: p50={p50:.2f}ms p95={p95:.2f}ms over {len(samples)} users")
+
+    def _check_pruning(self, user_id):
+        """Report how many partitions a per-swiper query touches"""
+        plan = SwipeActions.objects.filter(swiper_id=user_id, swipe_type='job').explain()
+        scanned = {
+            word.strip('"')
+            for word in plan.split()
+            if word.strip('"').startswith(f'{SwipeActions._meta.db_table}_p')
+        }
+        if scanned:
+            self.stdout.write(f"Per-swiper query scans {len(scanned)} partition(s): {', '.join(sorted(scanned))}")
+        else:
+            self.stdout.write("swipe_actions is not partitioned")
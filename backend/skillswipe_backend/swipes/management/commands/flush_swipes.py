@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from swipes.buffer import flush_swipe_buffer
+
+
+class Command(BaseCommand):
+    """Move write-behind swipes from swipe_buffer into swipe_actions"""
+    
+    help = (
+        "Flush buffered swipes into swipe_actions and run match detection. "
+        "Entries left over from a crashed run are replayed automatically."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Rows per transaction (default: SWIPE_FLUSH_BATCH_SIZE)")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running and flush continuously")
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Seconds to sleep when the buffer is empty (with --loop)")
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        
+        while True:
+            total_flushed = total_inserted = total_matches = 0
+            
+            # Drain everything currently buffered
+            while True:
+                flushed, inserted, matches = flush_swipe_buffer(batch_size)
+                if not flushed:
+                    break
+                total_flushed += flushed
+                total_inserted += inserted
+                total_matches += matches
+            
+            if total_flushed:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Flushed {total_flushed} swipes "
+                    f"({total_inserted} new, {total_flushed - total_inserted} duplicates), "
+                    f"{total_matches} matches created"
+                ))
+            
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from swipes.counters import reconcile_users
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """Rebuild user_activity_counters from swipe_actions and match"""
+    
+    help = "Recompute per-user activity counters in chunks, repairing any drift."
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Users recomputed per batch of grouped queries")
+        parser.add_argument('--user', dest='user_ids', action='append', default=[],
+                            help="Only reconcile this user id (can be repeated)")
+    
+    def handle(self, *args, **options):
+        if options['user_ids']:
+            count = reconcile_users(options['user_ids'])
+            self.stdout.write(self.style.SUCCESS(f"Reconciled {count} users"))
+            return
+        
+        chunk_size = options['chunk_size']
+        total = 0
+        last_id = None
+        
+        # Keyset pagination over the primary key keeps every chunk cheap
+        while True:
+            users = User.objects.order_by('id')
+            if last_id is not None:
+                users = users.filter(id__gt=last_id)
+            chunk = list(users.values_list('id', flat=True)[:chunk_size])
+            if not chunk:
+                break
+            
+            total += reconcile_users(chunk)
+            last_id = chunk[-1]
+            self.stdout.write(f"Reconciled {total} users...")
+        
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {total} users"))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:47
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_alter_profilebookmark_unique_together_and_more'),
+        ('swipes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SwipeBuffer',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('swipe_type', models.CharField(choices=[('profile', 'Profile Swipe'), ('job', 'Job Swipe')], default='profile', max_length=20)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('job_post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.jobposting')),
+                ('swiped_on', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('swiper', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'swipe_buffer',
+                'indexes': [models.Index(fields=['timestamp'], name='idx_swipe_buffer_ts')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('swipe_type', 'profile')), fields=('swiper', 'swiped_on'), name='unique_buffered_profile_swipe'), models.UniqueConstraint(condition=models.Q(('swipe_type', 'job')), fields=('swiper', 'job_post'), name='unique_buffered_job_swipe')],
+            },
+        ),
+    ]
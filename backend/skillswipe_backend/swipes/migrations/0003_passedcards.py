@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:47
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('swipes', '0002_swipebuffer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PassedCards',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='passed_cards', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('job_ids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), blank=True, default=list, help_text='Jobs the user passed on', size=None)),
+                ('user_ids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), blank=True, default=list, help_text='Profiles the user passed on', size=None)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'passed_cards',
+            },
+        ),
+    ]
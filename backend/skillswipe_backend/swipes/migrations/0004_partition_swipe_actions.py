@@ -0,0 +1,162 @@
+# Converts swipe_actions into a hash-partitioned table on swiper_id.
+#
+# Hash on swiper_id (rather than range on timestamp) keeps both partial unique
+# constraints valid, since Postgres requires unique indexes on a partitioned
+# table to include the partition key. Every "my swipes" query filters on
+# swiper, so it is pruned to a single partition.
+#
+# The primary key becomes (id, swiper_id), which is allowed because no table
+# references swipe_actions. The single-column FK indexes on swiper_id and
+# swiped_on_id are not recreated; they are covered by the composite indexes
+# below and only cost writes. The job_post_id index is recreated under its own
+# name. The state operations record all of this on the model.
+#
+# Migration 0010 returns to a single table, which measured faster.
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+PARTITION_COUNT = 16
+
+TABLE = 'swipe_actions'
+
+COLUMNS = 'id, swipe_type, "timestamp", job_post_id, swiped_on_id, swiper_id'
+
+INDEXES = [
+    ('idx_swipe_swiped_on', 'swiped_on_id, "timestamp"'),
+    ('idx_swipe_swiper', 'swiper_id, job_post_id'),
+    ('idx_swipe_timestamp', '"timestamp"'),
+    ('idx_swipe_job_post', 'job_post_id'),
+]
+
+UNIQUE_INDEXES = [
+    ('unique_profile_swipe', 'swiper_id, swiped_on_id', "swipe_type = 'profile'"),
+    ('unique_job_swipe', 'swiper_id, job_post_id', "swipe_type = 'job'"),
+]
+
+
+def _create_table_sql(partitioned):
+    """Build the CREATE TABLE statements for swipe_actions"""
+    primary_key = 'PRIMARY KEY (id, swiper_id)' if partitioned else 'PRIMARY KEY (id)'
+    partition_clause = ' PARTITION BY HASH (swiper_id)' if partitioned else ''
+
+    statements = [
+        f"""
+        CREATE TABLE {TABLE} (
+            id uuid NOT NULL,
+            swipe_type varchar(20) NOT NULL,
+            "timestamp" timestamp with time zone NOT NULL,
+            job_post_id uuid NULL
+                REFERENCES job_posting (id) DEFERRABLE INITIALLY DEFERRED,
+            swiped_on_id uuid NOT NULL
+                REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+            swiper_id uuid NOT NULL
+                REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+            {primary_key}
+        ){partition_clause}
+        """
+    ]
+
+    partitions = [f'{TABLE}_p{i:02d}' for i in range(PARTITION_COUNT)] if partitioned else []
+    statements += [
+        f"CREATE TABLE {partition} PARTITION OF {TABLE} "
+        f"FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {i})"
+        for i, partition in enumerate(partitions)
+    ]
+    return statements
+
+
+def _create_indexes_sql(partitioned):
+    """Build the index statements for swipe_actions"""
+    statements = []
+    index_specs = [(name, cols, '', '') for name, cols in INDEXES]
+    index_specs += [(name, cols, f' WHERE {condition}', 'UNIQUE ') for name, cols, condition in UNIQUE_INDEXES]
+
+    for name, cols, where, unique in index_specs:
+        if not partitioned:
+            statements.append(f"CREATE {unique}INDEX {name} ON {TABLE} ({cols}){where}")
+            continue
+        # Name each partition's index after the parent so unique violations
+        # still mention e.g. unique_profile_swipe in the error message
+        statements.append(f"CREATE {unique}INDEX {name} ON ONLY {TABLE} ({cols}){where}")
+        for i in range(PARTITION_COUNT):
+            statements += [
+                f"CREATE {unique}INDEX {name}_p{i:02d} ON {TABLE}_p{i:02d} ({cols}){where}",
+                f"ALTER INDEX {name} ATTACH PARTITION {name}_p{i:02d}",
+            ]
+    return statements
+
+
+def _swap_table_sql(partitioned):
+    """Rebuild swipe_actions in the requested layout and copy existing rows"""
+    index_names = (
+        [f'{TABLE}_pkey']
+        + [name for name, _ in INDEXES]
+        + [name for name, _, _ in UNIQUE_INDEXES]
+    )
+    return (
+        [f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old"]
+        # Free the index names so the new table can reuse them
+        + [f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_old" for name in index_names]
+        + _create_table_sql(partitioned)
+        # Copy before building secondary indexes, which is much faster on large tables
+        + [
+            f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {TABLE}_old",
+            f"DROP TABLE {TABLE}_old",
+        ]
+        + _create_indexes_sql(partitioned)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('swipes', '0003_passedcards'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=_swap_table_sql(partitioned=True),
+                    reverse_sql=_swap_table_sql(partitioned=False),
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='swipeactions',
+                    name='pk',
+                    field=models.CompositePrimaryKey('id', 'swiper', blank=True, editable=False,
+                                                     primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='swipeactions',
+                    name='id',
+                    field=models.UUIDField(default=uuid.uuid4, editable=False),
+                ),
+                migrations.AlterField(
+                    model_name='swipeactions',
+                    name='job_post',
+                    field=models.ForeignKey(blank=True, db_index=False, help_text='Job posting context (for job swipes)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='swipes', to='jobs.jobposting'),
+                ),
+                migrations.AlterField(
+                    model_name='swipeactions',
+                    name='swiped_on',
+                    field=models.ForeignKey(db_index=False, help_text='User who was swiped on (for profile swipes)', on_delete=django.db.models.deletion.CASCADE, related_name='swipes_received', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AlterField(
+                    model_name='swipeactions',
+                    name='swiper',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='swipes_made', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AddIndex(
+                    model_name='swipeactions',
+                    index=models.Index(fields=['job_post'], name='idx_swipe_job_post'),
+                ),
+            ],
+        ),
+    ]
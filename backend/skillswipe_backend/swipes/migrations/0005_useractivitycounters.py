@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:51
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('swipes', '0004_partition_swipe_actions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivityCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('swipes_made', models.PositiveIntegerField(default=0)),
+                ('swipes_received', models.PositiveIntegerField(default=0)),
+                ('total_matches', models.PositiveIntegerField(default=0)),
+                ('active_matches', models.PositiveIntegerField(default=0)),
+                ('bucket_days', django.contrib.postgres.fields.ArrayField(base_field=models.DateField(null=True), blank=True, default=list, size=7)),
+                ('bucket_swipes', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, size=7)),
+                ('bucket_matches', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, size=7)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_activity_counters',
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_jobdailystats'),
+        ('swipes', '0005_useractivitycounters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['matched_on'], name='idx_match_matched_on'),
+        ),
+    ]
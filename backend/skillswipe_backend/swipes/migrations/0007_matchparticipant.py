@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('swipes', '0006_match_idx_match_matched_on'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchParticipant',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('matched_on', models.DateTimeField()),
+                ('status', models.CharField(choices=[('active', 'Active'), ('archived', 'Archived'), ('blocked', 'Blocked')], max_length=20)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='swipes.match')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'match_participant',
+                'ordering': ['-matched_on'],
+                'indexes': [models.Index(fields=['user', 'status', '-matched_on'], name='idx_participant_feed')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'match'), name='unique_match_participant')],
+            },
+        ),
+        # Backfill both sides of existing matches
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO match_participant (id, user_id, match_id, matched_on, status)
+                SELECT gen_random_uuid(), user_1_id, id, matched_on, status FROM match
+                UNION ALL
+                SELECT gen_random_uuid(), user_2_id, id, matched_on, status FROM match
+                ON CONFLICT DO NOTHING;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
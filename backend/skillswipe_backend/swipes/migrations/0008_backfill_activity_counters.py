@@ -0,0 +1,90 @@
+from django.db import migrations
+from django.utils import timezone
+
+CHUNK_SIZE = 500
+
+# UserActivityCounters.BUCKET_COUNT when this migration was written
+BUCKET_COUNT = 7
+
+
+def _recount_sql(users, swipes, participants, counters):
+    """
+    One upsert that recounts a chunk of users, the way swipes.counters.reconcile_users()
+    did when this migration was written. Bucket slot is days since 1970-01-01 modulo
+    BUCKET_COUNT, 1-based in the arrays.
+    """
+    return f"""
+        INSERT INTO {counters} AS c
+            (user_id, swipes_made, swipes_received, total_matches, active_matches,
+             bucket_days, bucket_swipes, bucket_matches, updated_at)
+        SELECT
+            u.id,
+            (SELECT count(*) FROM {swipes} s WHERE s.swiper_id = u.id),
+            (SELECT count(*) FROM {swipes} s WHERE s.swiped_on_id = u.id),
+            (SELECT count(*) FROM {participants} p WHERE p.user_id = u.id),
+            (SELECT count(*) FROM {participants} p WHERE p.user_id = u.id AND p.status = 'active'),
+            b.days, b.swipes, b.matches, now()
+        FROM {users} u
+        CROSS JOIN LATERAL (
+            SELECT
+                array_agg(d.day ORDER BY d.slot) AS days,
+                array_agg(
+                    (SELECT count(*) FROM {swipes} s WHERE s.swiper_id = u.id AND s."timestamp"::date = d.day)
+                    + (SELECT count(*) FROM {swipes} s WHERE s.swiped_on_id = u.id AND s."timestamp"::date = d.day)
+                    ORDER BY d.slot
+                ) AS swipes,
+                array_agg(
+                    (SELECT count(*) FROM {participants} p WHERE p.user_id = u.id AND p.matched_on::date = d.day)
+                    ORDER BY d.slot
+                ) AS matches
+            FROM (
+                SELECT day::date AS day, (day::date - DATE '1970-01-01') %% {BUCKET_COUNT} AS slot
+                FROM generate_series(%s::date - {BUCKET_COUNT - 1}, %s::date, interval '1 day') AS day
+            ) d
+        ) b
+        WHERE u.id = ANY(%s::uuid[])
+        ON CONFLICT (user_id) DO UPDATE SET
+            swipes_made = EXCLUDED.swipes_made,
+            swipes_received = EXCLUDED.swipes_received,
+            total_matches = EXCLUDED.total_matches,
+            active_matches = EXCLUDED.active_matches,
+            bucket_days = EXCLUDED.bucket_days,
+            bucket_swipes = EXCLUDED.bucket_swipes,
+            bucket_matches = EXCLUDED.bucket_matches,
+            updated_at = EXCLUDED.updated_at
+    """
+
+
+def backfill_counters(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    sql = _recount_sql(
+        users=User._meta.db_table,
+        swipes=apps.get_model('swipes', 'SwipeActions')._meta.db_table,
+        participants=apps.get_model('swipes', 'MatchParticipant')._meta.db_table,
+        counters=apps.get_model('swipes', 'UserActivityCounters')._meta.db_table,
+    )
+    today = timezone.now().date()
+
+    last_id = None
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            users = User.objects.order_by('id')
+            if last_id is not None:
+                users = users.filter(id__gt=last_id)
+            chunk = list(users.values_list('id', flat=True)[:CHUNK_SIZE])
+            if not chunk:
+                break
+            cursor.execute(sql, [today, today, [str(user_id) for user_id in chunk]])
+            last_id = chunk[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_sweeper'),
+        ('swipes', '0007_matchparticipant'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
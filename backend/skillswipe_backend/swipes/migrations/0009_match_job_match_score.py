@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:18
+
+from django.db import migrations, models
+
+
+CHUNK_SIZE = 1000
+
+EXPERIENCE_RANGES = {'entry': (0, 2), 'mid': (2, 5), 'senior': (5, 10), 'lead': (10, 50)}
+
+
+def _job_match_score(job, profile):
+    """jobs.utils.calculate_job_match_score as it was when this migration was written"""
+    score = 0
+    if job.tech_stack and profile.top_languages:
+        common_tech = set(job.tech_stack) & set(profile.top_languages + profile.tools)
+        score += (len(common_tech) / len(job.tech_stack)) * 40
+    if job.experience_required and profile.experience_years:
+        req_min, req_max = EXPERIENCE_RANGES.get(job.experience_required, (0, 50))
+        if req_min <= profile.experience_years <= req_max:
+            score += 30
+        elif abs(profile.experience_years - req_min) <= 1:
+            score += 15
+    if job.location and profile.current_location:
+        if job.location.lower() in profile.current_location.lower():
+            score += 20
+        elif profile.willing_to_relocate and profile.top_two_cities:
+            if any(city.lower() in job.location.lower() for city in profile.top_two_cities):
+                score += 10
+    if job.salary_min and profile.salary_expectation_min:
+        if job.salary_min >= profile.salary_expectation_min:
+            score += 10
+    return min(score, 100)
+
+
+def backfill_scores(apps, schema_editor):
+    # Scored with the current job and profile, the closest to match time there is
+    Match = apps.get_model('swipes', 'Match')
+    DeveloperProfile = apps.get_model('profiles', 'DeveloperProfile')
+
+    matches = Match.objects.filter(job_post__isnull=False).select_related('job_post', 'user_1', 'user_2')
+    matches = matches.order_by('id')
+    last_id = None
+    while True:
+        chunk = list((matches.filter(id__gt=last_id) if last_id else matches)[:CHUNK_SIZE])
+        if not chunk:
+            break
+        developer_ids = [
+            match.user_1_id if match.user_1.role == 'developer' else match.user_2_id for match in chunk
+        ]
+        profiles = {profile.user_id: profile for profile in DeveloperProfile.objects.filter(user_id__in=developer_ids)}
+        for match, developer_id in zip(chunk, developer_ids):
+            profile = profiles.get(developer_id)
+            match.job_match_score = _job_match_score(match.job_post, profile) if profile else None
+        Match.objects.bulk_update(chunk, ['job_match_score'])
+        last_id = chunk[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_jobdailystats'),
+        ('profiles', '0001_initial'),
+        ('swipes', '0008_backfill_activity_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='job_match_score',
+            field=models.FloatField(blank=True, help_text="The developer's job match score when the match was made", null=True),
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
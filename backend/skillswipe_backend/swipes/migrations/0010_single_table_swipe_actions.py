@@ -0,0 +1,50 @@
+# Returns swipe_actions to a single table with a plain id primary key.
+#
+# benchmark_swipes at 50M rows (Postgres 16, 200k swipers), single table vs
+# 0004's 16 hash partitions on swiper_id:
+#   inserts              1,636 vs 1,148 rows/s
+#   swipes made p50      1.17 vs 1.50 ms (pruned to one partition)
+#   swipes received p50  0.75 vs 1.72 ms (every partition scanned)
+# Partitioning only paid for itself in per-partition maintenance, which
+# doesn't outweigh that. The single table keeps 0004's index set: no
+# single-column FK indexes on swiper_id or swiped_on_id, and
+# idx_swipe_job_post for job_post_id.
+#
+# Rows are copied, so the table is locked for the duration of the copy and the
+# index builds. Reversing re-partitions with 0004's layout.
+
+import uuid
+from importlib import import_module
+
+from django.db import migrations, models
+
+partitioning = import_module('swipes.migrations.0004_partition_swipe_actions')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('swipes', '0009_match_job_match_score'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=partitioning._swap_table_sql(partitioned=False),
+                    reverse_sql=partitioning._swap_table_sql(partitioned=True),
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='swipeactions',
+                    name='pk',
+                ),
+                migrations.AlterField(
+                    model_name='swipeactions',
+                    name='id',
+                    field=models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
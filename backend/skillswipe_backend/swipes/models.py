@@ -1,7 +1,11 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Func, Value
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from datetime import timedelta
+from django.contrib.postgres.fields import ArrayField
 from jobs.models import JobPosting
 
 
@@ -21,18 +25,20 @@ class SwipeActions(models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     
-    # Swiper (the one who swiped)
+    # Swiper (the one who swiped); indexed by idx_swipe_swiper
     swiper = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='swipes_made'
+        related_name='swipes_made',
+        db_index=False
     )
     
-    # Swiped on (can be User ID for profile swipes)
+    # Swiped on (can be User ID for profile swipes); indexed by idx_swipe_swiped_on
     swiped_on = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='swipes_received',
+        db_index=False,
         help_text="User who was swiped on (for profile swipes)"
     )
     
@@ -43,6 +49,7 @@ class SwipeActions(models.Model):
         blank=True,
         null=True,
         related_name='swipes',
+        db_index=False,
         help_text="Job posting context (for job swipes)"
     )
     
@@ -74,6 +81,7 @@ class SwipeActions(models.Model):
             models.Index(fields=['swiped_on', 'timestamp'], name='idx_swipe_swiped_on'),
             models.Index(fields=['swiper', 'job_post'], name='idx_swipe_swiper'),
             models.Index(fields=['timestamp'], name='idx_swipe_timestamp'),
+            models.Index(fields=['job_post'], name='idx_swipe_job_post'),
         ]
         ordering = ['-timestamp']  # Latest swipes first
     
@@ -100,6 +108,183 @@ class SwipeActions(models.Model):
         return f"{self.swiper.username} -> {self.swiped_on.username}"
 
 
+class SwipeBuffer(models.Model):
+    """
+    Staging table for write-behind swipes.
+    Rows are acknowledged immediately and moved into swipe_actions
+    in batches by the flush_swipes command.
+    """
+    
+    # Becomes the SwipeActions id once flushed
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    swiper = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    
+    swiped_on = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    
+    job_post = models.ForeignKey(
+        JobPosting,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    
+    swipe_type = models.CharField(
+        max_length=20,
+        choices=SwipeActions.SWIPE_TYPE_CHOICES,
+        default='profile'
+    )
+    
+    # Original swipe time, preserved when the row is flushed
+    timestamp = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'swipe_buffer'
+        # Same uniqueness rules as swipe_actions so duplicates are caught on ack
+        constraints = [
+            models.UniqueConstraint(
+                fields=['swiper', 'swiped_on'],
+                condition=models.Q(swipe_type='profile'),
+                name='unique_buffered_profile_swipe'
+            ),
+            models.UniqueConstraint(
+                fields=['swiper', 'job_post'],
+                condition=models.Q(swipe_type='job'),
+                name='unique_buffered_job_swipe'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['timestamp'], name='idx_swipe_buffer_ts'),
+        ]
+    
+    def __str__(self):
+        return f"Buffered {self.swipe_type} swipe {self.swiper_id} -> {self.swiped_on_id}"
+
+
+class PassedCards(models.Model):
+    """
+    Left swipes ("pass") stored as one compact row per user.
+    Keeps passed cards out of the deck without a row per pass.
+    """
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='passed_cards'
+    )
+    
+    job_ids = ArrayField(
+        models.UUIDField(),
+        blank=True,
+        default=list,
+        help_text="Jobs the user passed on"
+    )
+    
+    user_ids = ArrayField(
+        models.UUIDField(),
+        blank=True,
+        default=list,
+        help_text="Profiles the user passed on"
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'passed_cards'
+    
+    def __str__(self):
+        return f"{self.user_id}: {len(self.job_ids)} jobs, {len(self.user_ids)} profiles passed"
+    
+    @classmethod
+    def record_pass(cls, user, job_id=None, target_user_id=None):
+        """Append a passed job or profile to the user's seen-set"""
+        field = 'job_ids' if job_id else 'user_ids'
+        passed_id = job_id or target_user_id
+        
+        cls.objects.get_or_create(user=user)
+        
+        # Append in SQL so concurrent passes don't overwrite each other
+        cls.objects.filter(user=user).exclude(
+            **{f'{field}__contains': [passed_id]}
+        ).update(**{
+            field: Func(
+                F(field),
+                Value(passed_id, output_field=models.UUIDField()),
+                function='array_append',
+                output_field=ArrayField(models.UUIDField())
+            ),
+            'updated_at': timezone.now()
+        })
+        
+        from .dashboard_cache import bump_users
+        bump_users(user.id)
+    
+    @classmethod
+    def for_user(cls, user):
+        """Load the user's seen-set once per request as (job_ids, user_ids) sets"""
+        row = cls.objects.filter(user=user).values_list('job_ids', 'user_ids').first()
+        if not row:
+            return set(), set()
+        return set(row[0]), set(row[1])
+
+
+class UserActivityCounters(models.Model):
+    """
+    Denormalized per-user swipe and match counters for the stats tab.
+    Updated with every swipe and match write; reconcile_activity_counters repairs drift.
+    """
+    
+    # Rolling window kept as a ring of daily buckets (slot = day number % BUCKET_COUNT)
+    BUCKET_COUNT = 7
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='activity_counters'
+    )
+    
+    swipes_made = models.PositiveIntegerField(default=0)
+    swipes_received = models.PositiveIntegerField(default=0)
+    total_matches = models.PositiveIntegerField(default=0)
+    active_matches = models.PositiveIntegerField(default=0)
+    
+    # Day each bucket currently holds, and the swipes/matches counted for it
+    bucket_days = ArrayField(models.DateField(null=True), size=BUCKET_COUNT, default=list, blank=True)
+    bucket_swipes = ArrayField(models.PositiveIntegerField(), size=BUCKET_COUNT, default=list, blank=True)
+    bucket_matches = ArrayField(models.PositiveIntegerField(), size=BUCKET_COUNT, default=list, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'user_activity_counters'
+    
+    def __str__(self):
+        return f"Counters for {self.user_id}"
+    
+    def recent_totals(self, today=None):
+        """Return (swipes, matches) over the last BUCKET_COUNT days"""
+        today = today or timezone.now().date()
+        cutoff = today - timedelta(days=self.BUCKET_COUNT - 1)
+        
+        recent_swipes = recent_matches = 0
+        for day, swipes, matches in zip(self.bucket_days, self.bucket_swipes, self.bucket_matches):
+            if day and cutoff <= day <= today:
+                recent_swipes += swipes or 0
+                recent_matches += matches or 0
+        return recent_swipes, recent_matches
+
+
 class Match(models.Model):
     """
     Created when mutual swipe happens between two users.
@@ -137,6 +322,13 @@ class Match(models.Model):
         help_text="Job posting that led to the match"
     )
     
+    # Stored so company statistics can average it in SQL
+    job_match_score = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="The developer's job match score when the match was made"
+    )
+    
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -162,6 +354,7 @@ class Match(models.Model):
             models.Index(fields=['user_1', 'user_2'], name='idx_match_users'),
             models.Index(fields=['user_1', 'matched_on'], name='idx_match_user1'),
             models.Index(fields=['user_2', 'matched_on'], name='idx_match_user2'),
+            models.Index(fields=['matched_on'], name='idx_match_matched_on'),  # Incremental rollups
         ]
         ordering = ['-matched_on']  # Latest matches first
     
@@ -176,7 +369,32 @@ class Match(models.Model):
     
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            stored_status = None
+            if not self._state.adding:
+                # Locked so concurrent status changes each see the other's result
+                stored_status = Match.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'status', flat=True
+                ).first()
+            created = self._state.adding or stored_status is None
+            super().save(*args, **kwargs)
+            MatchParticipant.sync(self)
+            self._update_counters(created, stored_status)
+    
+    def _update_counters(self, created, stored_status):
+        """Activity counter changes for a new match or a status change; deletes are in signals.py"""
+        from .counters import add_delta, adjust_counters, apply_counter_deltas, match_deltas
+        
+        deltas = {}
+        if created:
+            # After MatchParticipant.sync, which a first-time recount reads
+            match_deltas(deltas, self)
+            apply_counter_deltas(deltas)
+        elif (stored_status == 'active') != (self.status == 'active'):
+            change = 1 if self.status == 'active' else -1
+            for user_id in (self.user_1_id, self.user_2_id):
+                add_delta(deltas, user_id, active_matches=change)
+            adjust_counters(deltas)
     
     def __str__(self):
         context = f" (via {self.job_post.title})" if self.job_post else ""
@@ -240,12 +458,21 @@ class Match(models.Model):
             user_1, user_2 = (swiper, swiped_on) if swiper.id < swiped_on.id else (swiped_on, swiper)
             
             try:
-                match, created = cls.objects.get_or_create(
-                    user_1=user_1,
-                    user_2=user_2,
-                    job_post=match_job_context,
-                    defaults={'status': 'active'}
-                )
+                from jobs.analytics import record_job_activity
+                from jobs.utils import match_job_score
+                
+                with transaction.atomic():
+                    match, created = cls.objects.get_or_create(
+                        user_1=user_1,
+                        user_2=user_2,
+                        job_post=match_job_context,
+                        defaults={
+                            'status': 'active',
+                            'job_match_score': match_job_score(match_job_context, user_1, user_2),
+                        }
+                    )
+                    if created and match_job_context:
+                        record_job_activity(matches=[match_job_context.id])
                 print(f"DEBUG MATCH: {'Created new' if created else 'Found existing'} match between {user_1.username} and {user_2.username} for job {match_job_context.title if match_job_context else 'None'}")
                 return match, created
             except Exception as e:
@@ -255,3 +482,68 @@ class Match(models.Model):
         print(f"DEBUG MATCH: No mutual swipe found")
         return None, False
 
+
+
+class MatchParticipant(models.Model):
+    """
+    One row per user per match, kept in step with Match.save().
+    Lets "my matches, newest first" be a single index range scan instead of
+    OR-ing the user_1 and user_2 indexes. QuerySet.update() on Match bypasses
+    save(), and with it these rows and the activity counters, so change match
+    status through save().
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='match_memberships'
+    )
+    
+    match = models.ForeignKey(
+        Match,
+        on_delete=models.CASCADE,
+        related_name='participants'
+    )
+    
+    # Copied from the match so the feed index covers filtering and ordering
+    matched_on = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=Match.STATUS_CHOICES)
+    
+    class Meta:
+        db_table = 'match_participant'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'match'], name='unique_match_participant'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'status', '-matched_on'], name='idx_participant_feed'),
+        ]
+        ordering = ['-matched_on']
+    
+    def __str__(self):
+        return f"{self.user_id} in match {self.match_id}"
+    
+    @classmethod
+    def sync(cls, match):
+        """Create or refresh both participant rows for a match"""
+        cls.objects.bulk_create(
+            [
+                cls(user_id=user_id, match=match, matched_on=match.matched_on, status=match.status)
+                for user_id in (match.user_1_id, match.user_2_id)
+            ],
+            update_conflicts=True,
+            unique_fields=['user', 'match'],
+            update_fields=['matched_on', 'status']
+        )
+    
+    @classmethod
+    def feed(cls, user, status='active', before=None, limit=None):
+        """
+        The user's matches newest first, as participant rows.
+        Pass the last row's matched_on as `before` to fetch the next page.
+        """
+        queryset = cls.objects.filter(user=user, status=status).order_by('-matched_on')
+        if before is not None:
+            queryset = queryset.filter(matched_on__lt=before)
+        return queryset[:limit] if limit else queryset
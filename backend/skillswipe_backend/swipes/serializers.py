@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError as DjangoValidationError
-from .models import SwipeActions, Match
+from django.db import transaction
+from .models import SwipeActions, Match, PassedCards
+from .buffer import write_behind_enabled, buffer_swipe
+from jobs.analytics import record_job_activity
 from jobs.models import JobPosting
 from profiles.models import DeveloperProfile, CompanyProfile
 
@@ -16,7 +19,13 @@ class SwipeCreateSerializer(serializers.Serializer):
         ('job', 'Job Swipe'),
     ]
     
+    DIRECTION_CHOICES = [
+        ('right', 'Interested'),
+        ('left', 'Pass'),
+    ]
+    
     swipe_type = serializers.ChoiceField(choices=SWIPE_TYPE_CHOICES)
+    direction = serializers.ChoiceField(choices=DIRECTION_CHOICES, default='right')
     target_user_id = serializers.UUIDField(required=False, help_text="Required for profile swipes")
     job_id = serializers.UUIDField(required=False, help_text="Required for job swipes")
     
@@ -36,7 +45,8 @@ class SwipeCreateSerializer(serializers.Serializer):
         # Validate target user exists and has correct role
         if target_user_id:
             try:
-                target_user = User.objects.get(id=target_user_id, is_active=True)
+                # A developer's profile scores the match this swipe may create
+                target_user = User.objects.select_related('developer_profile').get(id=target_user_id, is_active=True)
                 data['target_user'] = target_user
                 
                 # Prevent self-swiping
@@ -54,7 +64,7 @@ class SwipeCreateSerializer(serializers.Serializer):
         # Validate job exists
         if job_id:
             try:
-                job = JobPosting.objects.get(id=job_id, status='active')
+                job = JobPosting.objects.select_related('created_by').get(id=job_id, status='active')
                 data['job'] = job
                 
                 # Only developers can swipe on jobs
@@ -73,6 +83,14 @@ class SwipeCreateSerializer(serializers.Serializer):
         swiper = request.user
         swipe_type = validated_data['swipe_type']
         
+        # Left swipes only go into the compact seen-set, no swipe row or match check
+        if validated_data['direction'] == 'left':
+            if swipe_type == 'profile':
+                PassedCards.record_pass(swiper, target_user_id=validated_data['target_user'].id)
+            else:
+                PassedCards.record_pass(swiper, job_id=validated_data['job'].id)
+            return {'passed': True, 'swipe_type': swipe_type}
+        
         if swipe_type == 'profile':
             target_user = validated_data['target_user']
             job = None
@@ -84,14 +102,29 @@ class SwipeCreateSerializer(serializers.Serializer):
             swiped_on = target_user
             print(f"DEBUG SWIPE: Job swipe - {swiper.username} ({swiper.role}) -> Job '{job.title}' by {target_user.username} ({target_user.role})")
         
-        # Create swipe action
+        # Write-behind mode: stage the swipe and let the flusher handle matching
+        if write_behind_enabled():
+            buffered = buffer_swipe(swiper, swiped_on, job, swipe_type)
+            if buffered is None:
+                raise serializers.ValidationError("You have already swiped on this item")
+            return {
+                'swipe': buffered,
+                'match': None,
+                'match_created': False,
+                'buffered': True
+            }
+        
+        # Create swipe action; its post_save receiver bumps the activity counters
         try:
-            swipe = SwipeActions.objects.create(
-                swiper=swiper,
-                swiped_on=swiped_on,
-                job_post=job,
-                swipe_type=swipe_type
-            )
+            with transaction.atomic():
+                swipe = SwipeActions.objects.create(
+                    swiper=swiper,
+                    swiped_on=swiped_on,
+                    job_post=job,
+                    swipe_type=swipe_type
+                )
+                if job:
+                    record_job_activity(right_swipes=[job.id])
             print(f"DEBUG SWIPE: Successfully created swipe {swipe.id}")
         except Exception as e:
             print(f"DEBUG SWIPE: Error creating swipe: {e}")
@@ -117,7 +150,8 @@ class SwipeCreateSerializer(serializers.Serializer):
         return {
             'swipe': swipe,
             'match': match,
-            'match_created': match_created
+            'match_created': match_created,
+            'buffered': False
         }
 
 
@@ -0,0 +1,83 @@
+"""
+Dashboard cache invalidation and activity counter upkeep on model writes.
+Raw-SQL writers (the swipe flusher, PassedCards.record_pass) bump explicitly.
+New matches and match status changes update the counters in Match.save().
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import dashboard_cache
+from .counters import adjust_counters, apply_counter_deltas, match_deltas, swipe_deltas
+from .models import SwipeActions, Match
+from authentication.models import User
+from authentication.signals import ACTIVITY_FIELDS
+from jobs.models import JobPosting, Wishlist
+from profiles.models import DeveloperProfile, CompanyProfile, CompanyUsers
+
+
+@receiver([post_save, post_delete], sender=SwipeActions)
+def swipe_changed(sender, instance, **kwargs):
+    dashboard_cache.bump_users(instance.swiper_id, instance.swiped_on_id)
+
+
+@receiver(post_save, sender=SwipeActions)
+def swipe_counted(sender, instance, created, **kwargs):
+    if created:
+        deltas = {}
+        swipe_deltas(deltas, instance.swiper_id, instance.swiped_on_id)
+        apply_counter_deltas(deltas)
+
+
+@receiver(post_delete, sender=SwipeActions)
+def swipe_uncounted(sender, instance, **kwargs):
+    # Also sent per row when a user delete cascades
+    deltas = {}
+    swipe_deltas(deltas, instance.swiper_id, instance.swiped_on_id, sign=-1)
+    adjust_counters(deltas, instance.timestamp.date())
+
+
+@receiver([post_save, post_delete], sender=Match)
+def match_changed(sender, instance, **kwargs):
+    dashboard_cache.bump_users(instance.user_1_id, instance.user_2_id)
+
+
+@receiver(post_delete, sender=Match)
+def match_uncounted(sender, instance, **kwargs):
+    deltas = {}
+    match_deltas(deltas, instance, sign=-1)
+    adjust_counters(deltas, instance.matched_on.date())
+
+
+@receiver([post_save, post_delete], sender=Wishlist)
+def wishlist_changed(sender, instance, **kwargs):
+    dashboard_cache.bump_users(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Cards filter on is_active; heartbeat and login saves change nothing shown
+    if update_fields and set(update_fields) <= ACTIVITY_FIELDS:
+        return
+    dashboard_cache.bump_content()
+    dashboard_cache.bump_users(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=JobPosting)
+def job_changed(sender, instance, **kwargs):
+    dashboard_cache.bump_content()
+
+
+@receiver([post_save, post_delete], sender=DeveloperProfile)
+def developer_profile_changed(sender, instance, **kwargs):
+    dashboard_cache.bump_content()
+    dashboard_cache.bump_users(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def company_profile_changed(sender, instance, **kwargs):
+    dashboard_cache.bump_content()
+
+
+@receiver([post_save, post_delete], sender=CompanyUsers)
+def company_membership_changed(sender, instance, **kwargs):
+    dashboard_cache.bump_users(instance.user_id)
@@ -1,3 +1,549 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication import sweeper
+from jobs.models import JobPosting
+from profiles.models import CompanyProfile, DeveloperProfile
+from skillswipe_backend import db_router, endpoint_suite
+from . import async_views, buffer
+from .counters import reconcile_users
+from .models import Match, PassedCards, SwipeActions, SwipeBuffer, UserActivityCounters
+from .serializers import SwipeCreateSerializer
+from .views import TAB_ERROR, DashboardAPIView
+
+User = get_user_model()
+
+
+def make_user(username, role):
+    return User.objects.create_user(username, f'{username}@example.com', 'password', role=role)
+
+
+def make_developer(username):
+    developer = make_user(username, 'developer')
+    DeveloperProfile.objects.create(user=developer, name=username, current_location='Pune', experience_years=3,
+                                    top_languages=['Python'], tools=['Django'])
+    return developer
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def make_job(company_user, title='Python Engineer'):
+    company = CompanyProfile.objects.filter(created_by_user=company_user).first()
+    if company is None:
+        company = CompanyProfile.objects.create(created_by_user=company_user, name='Company', location='Pune')
+    return JobPosting.objects.create(
+        company=company, created_by=company_user, title=title, description='Job', job_type='full-time',
+        work_mode='remote', tech_stack=['Python'], location='Pune', experience_required='mid', status='active'
+    )
+
+
+class QueryBudgetTests(TransactionTestCase):
+    """The check_query_budgets check, run by the test suite"""
+
+    # Transactional: dashboard tabs and async views query on pool threads, which must see the seeded rows
+
+    def test_endpoints_within_budget_and_constant_in_result_size(self):
+        counts = []
+        with endpoint_suite.closing_pool_connections():
+            # At these scales the first developer and company have more of every list on the larger dataset
+            for scale in (10, 30):
+                endpoint_suite.seed(scale)
+                counts.append(endpoint_suite.count_queries())
+
+        small, large = counts
+        for label, result in large.items():
+            with self.subTest(label):
+                self.assertLess(result.status, 400)
+                self.assertLessEqual(result.queries, result.budget)
+                self.assertEqual(endpoint_suite.per_row_statements(small[label].statements, result.statements), {})
+
+
+class ActivityCounterTests(TestCase):
+    """Swipe and match writes keep user_activity_counters equal to a full recount"""
+
+    def setUp(self):
+        self.developer = User.objects.create_user('developer', 'developer@example.com', 'password', role='developer')
+        self.companies = [
+            User.objects.create_user(f'company{n}', f'company{n}@example.com', 'password', role='company')
+            for n in range(2)
+        ]
+
+    def _swipe(self, swiper, swiped_on):
+        return SwipeActions.objects.create(swiper=swiper, swiped_on=swiped_on, swipe_type='profile')
+
+    def _match(self, company):
+        job = make_job(company)
+        self._swipe(company, self.developer)
+        SwipeActions.objects.create(swiper=self.developer, swiped_on=company, job_post=job, swipe_type='job')
+        match, created = Match.create_if_mutual_swipe(self.developer, company, job_post=job)
+        self.assertTrue(created)
+        return match
+
+    def _counters(self, user):
+        counters = UserActivityCounters.objects.get(user=user)
+        return (counters.swipes_made, counters.swipes_received, counters.total_matches,
+                counters.active_matches, counters.bucket_days, counters.bucket_swipes, counters.bucket_matches)
+
+    def assertMatchesRecount(self, user):
+        counters = self._counters(user)
+        reconcile_users([user.id])
+        self.assertEqual(counters, self._counters(user))
+
+    def test_first_swipe_counts_history_from_before_the_row(self):
+        # bulk_create sends no signals, like swipes from before the counters existed
+        SwipeActions.objects.bulk_create([
+            SwipeActions(swiper=self.companies[0], swiped_on=self.developer, swipe_type='profile')
+        ])
+        self.assertFalse(UserActivityCounters.objects.filter(user=self.developer).exists())
+
+        self._swipe(self.companies[1], self.developer)
+
+        self.assertEqual(UserActivityCounters.objects.get(user=self.developer).swipes_received, 2)
+        self.assertMatchesRecount(self.developer)
+        self.assertMatchesRecount(self.companies[1])
+
+    def test_existing_row_is_incremented(self):
+        reconcile_users([self.developer.id, self.companies[0].id])
+
+        self._swipe(self.companies[0], self.developer)
+
+        self.assertEqual(UserActivityCounters.objects.get(user=self.developer).swipes_received, 1)
+        self.assertEqual(UserActivityCounters.objects.get(user=self.companies[0]).swipes_made, 1)
+        self.assertMatchesRecount(self.developer)
+
+    def test_match_status_change_moves_active_matches(self):
+        match = self._match(self.companies[0])
+        self.assertEqual(UserActivityCounters.objects.get(user=self.developer).active_matches, 1)
+
+        match.status = 'archived'
+        match.save()
+        self.assertEqual(UserActivityCounters.objects.get(user=self.developer).active_matches, 0)
+        self.assertMatchesRecount(self.developer)
+
+        match.status = 'blocked'
+        match.save()
+        match.status = 'active'
+        match.save()
+        self.assertEqual(UserActivityCounters.objects.get(user=self.developer).active_matches, 1)
+        self.assertMatchesRecount(self.developer)
+        self.assertMatchesRecount(self.companies[0])
+
+    def test_deleting_a_match_or_swipe_is_uncounted(self):
+        match = self._match(self.companies[0])
+        swipe = self._swipe(self.companies[1], self.developer)
+
+        match.delete()
+        swipe.delete()
+
+        counters = UserActivityCounters.objects.get(user=self.developer)
+        self.assertEqual((counters.swipes_received, counters.total_matches, counters.active_matches), (1, 0, 0))
+        self.assertMatchesRecount(self.developer)
+        self.assertMatchesRecount(self.companies[0])
+        self.assertMatchesRecount(self.companies[1])
+
+    def test_backfill_migration_recounts_like_reconcile(self):
+        self._match(self.companies[0])
+        self._swipe(self.companies[1], self.developer)
+        users = [self.developer] + self.companies
+        expected = [self._counters(user) for user in users]
+        UserActivityCounters.objects.all().delete()
+
+        migration = import_module('swipes.migrations.0008_backfill_activity_counters')
+        migration.backfill_counters(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual([self._counters(user) for user in users], expected)
+
+    def test_user_delete_cascade_is_uncounted_for_the_other_side(self):
+        self._match(self.companies[0])
+        self._swipe(self.companies[1], self.developer)
+
+        developer_id = self.developer.id
+        self.developer.delete()
+
+        counters = UserActivityCounters.objects.get(user=self.companies[0])
+        self.assertEqual((counters.swipes_made, counters.swipes_received, counters.total_matches), (0, 0, 0))
+        self.assertEqual(UserActivityCounters.objects.get(user=self.companies[1]).swipes_made, 0)
+        self.assertFalse(UserActivityCounters.objects.filter(user_id=developer_id).exists())
+        self.assertMatchesRecount(self.companies[0])
+        self.assertMatchesRecount(self.companies[1])
+
+
+class SwipeActionsTableTests(TestCase):
+    """swipe_actions after migration 0010, and the model state that describes it"""
+
+    def test_single_table_with_the_model_primary_key(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'swipe_actions'::regclass")
+            self.assertEqual(cursor.fetchone(), ('r',))
+            constraints = connection.introspection.get_constraints(cursor, SwipeActions._meta.db_table)
+
+        primary_key = next(constraint for constraint in constraints.values() if constraint['primary_key'])
+        self.assertEqual(primary_key['columns'], [SwipeActions._meta.pk.column])
+        indexed = {tuple(constraint['columns']) for constraint in constraints.values() if constraint['index']}
+        self.assertIn(('job_post_id',), indexed)
+        self.assertNotIn(('swiper_id',), indexed)
+
+    def test_deleting_a_user_deletes_their_swipes(self):
+        developer = User.objects.create_user('developer', 'developer@example.com', 'password', role='developer')
+        company = User.objects.create_user('company', 'company@example.com', 'password', role='company')
+        swipe = SwipeActions.objects.create(swiper=company, swiped_on=developer, swipe_type='profile')
+        self.assertEqual(SwipeActions.objects.get(pk=swipe.pk).id, swipe.id)
+
+        developer.delete()
+
+        self.assertFalse(SwipeActions.objects.exists())
+
+
+class SwipeBufferFlushTests(TransactionTestCase):
+    """Write-behind swipes reach swipe_actions exactly once, whatever happens to the flusher"""
+
+    # Transactional: the race test flushes from a second connection
+
+    def setUp(self):
+        self.company = make_user('company', 'company')
+        self.job = make_job(self.company)
+        self.developers = [make_user(f'developer{n}', 'developer') for n in range(4)]
+
+    def _buffer_job_swipes(self, developers=None):
+        return [buffer.buffer_swipe(developer, self.company, self.job, 'job')
+                for developer in developers or self.developers]
+
+    def _swipes_made(self, user):
+        return UserActivityCounters.objects.get(user=user).swipes_made
+
+    def test_buffered_swipe_is_flushed_with_its_id_and_time(self):
+        entry, = self._buffer_job_swipes(self.developers[:1])
+        self.assertFalse(SwipeActions.objects.exists())
+
+        self.assertEqual(buffer.flush_swipe_buffer(), (1, 1, 0))
+
+        swipe = SwipeActions.objects.get()
+        self.assertEqual((swipe.id, swipe.timestamp, swipe.swiper_id), (entry.id, entry.timestamp, entry.swiper_id))
+        self.assertFalse(SwipeBuffer.objects.exists())
+        self.assertEqual(self._swipes_made(self.developers[0]), 1)
+
+    def test_match_forms_at_flush_time(self):
+        SwipeActions.objects.create(swiper=self.company, swiped_on=self.developers[0], swipe_type='profile')
+        self._buffer_job_swipes(self.developers[:1])
+        self.assertFalse(Match.objects.exists())
+
+        self.assertEqual(buffer.flush_swipe_buffer(), (1, 1, 1))
+        self.assertTrue(Match.objects.filter(job_post=self.job).exists())
+
+    def test_swipes_matching_each_other_in_one_batch(self):
+        buffer.buffer_swipe(self.company, self.developers[0], None, 'profile')
+        self._buffer_job_swipes(self.developers[:1])
+
+        self.assertEqual(buffer.flush_swipe_buffer(), (2, 2, 1))
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_duplicate_swipes_are_collapsed(self):
+        self.assertIsNotNone(self._buffer_job_swipes(self.developers[:1])[0])
+        # Already waiting in the buffer
+        self.assertIsNone(buffer.buffer_swipe(self.developers[0], self.company, self.job, 'job'))
+        buffer.flush_swipe_buffer()
+        # Already in swipe_actions
+        self.assertIsNone(buffer.buffer_swipe(self.developers[0], self.company, self.job, 'job'))
+
+        self.assertEqual(SwipeActions.objects.count(), 1)
+        self.assertEqual(self._swipes_made(self.developers[0]), 1)
+
+    def test_concurrent_flushers_skip_each_others_rows(self):
+        self._buffer_job_swipes()
+        locked = threading.Event()
+        release = threading.Event()
+        move = buffer._move_to_swipe_actions
+        results = {}
+
+        def blocking_move(entry_ids):
+            # The first flusher holds its row locks until the second one has run
+            if threading.current_thread().name == 'first-flusher':
+                locked.set()
+                release.wait(10)
+            return move(entry_ids)
+
+        def first_flusher():
+            try:
+                results['first'] = buffer.flush_swipe_buffer(batch_size=2)
+            finally:
+                connections.close_all()
+
+        with mock.patch.object(buffer, '_move_to_swipe_actions', blocking_move):
+            thread = threading.Thread(target=first_flusher, name='first-flusher')
+            thread.start()
+            self.assertTrue(locked.wait(10))
+            results['second'] = buffer.flush_swipe_buffer(batch_size=10)
+            release.set()
+            thread.join(10)
+
+        self.assertEqual(results, {'first': (2, 2, 0), 'second': (2, 2, 0)})
+        self.assertEqual(SwipeActions.objects.count(), 4)
+        self.assertFalse(SwipeBuffer.objects.exists())
+
+    def test_flush_failing_partway_is_rolled_back_and_rerun(self):
+        self._buffer_job_swipes()
+        create_match = Match.create_if_mutual_swipe
+        calls = []
+
+        def failing_on_third(*args, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 3:
+                raise RuntimeError('flusher died')
+            return create_match(*args, **kwargs)
+
+        with mock.patch.object(Match, 'create_if_mutual_swipe', side_effect=failing_on_third):
+            with self.assertRaises(RuntimeError):
+                buffer.flush_swipe_buffer()
+
+        self.assertFalse(SwipeActions.objects.exists())
+        self.assertEqual(SwipeBuffer.objects.count(), 4)
+        self.assertFalse(UserActivityCounters.objects.exists())
+
+        call_command('flush_swipes', stdout=StringIO())
+
+        self.assertEqual(SwipeActions.objects.count(), 4)
+        self.assertFalse(SwipeBuffer.objects.exists())
+        self.assertEqual([self._swipes_made(developer) for developer in self.developers], [1, 1, 1, 1])
+
+    def test_rows_inserted_but_not_deleted_are_replayed_once(self):
+        entries = self._buffer_job_swipes(self.developers[:2])
+        # A flusher that got as far as the insert before the buffer rows were cleared
+        with transaction.atomic():
+            buffer._move_to_swipe_actions([entries[0].id])
+        reconcile_users([self.developers[0].id])
+
+        self.assertEqual(buffer.flush_swipe_buffer(), (2, 1, 0))
+
+        self.assertEqual(SwipeActions.objects.count(), 2)
+        self.assertFalse(SwipeBuffer.objects.exists())
+        self.assertEqual([self._swipes_made(developer) for developer in self.developers[:2]], [1, 1])
+
+
+class PassedCardsTests(TestCase):
+    """Left swipes go into the seen-set and keep the card out of later decks"""
+
+    def setUp(self):
+        cache.clear()
+        self.company = make_user('company', 'company')
+        self.jobs = [make_job(self.company, title=f'Job {n}') for n in range(2)]
+        self.developers = [make_developer(f'developer{n}') for n in range(2)]
+
+    def _pass(self, user, **data):
+        # The dashboard cache is bumped once the pass commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(user).post(reverse('swipe-action'), {**data, 'direction': 'left'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['direction'], 'left')
+        self.assertFalse(response.data['match_created'])
+
+    def _deck_ids(self, user, url, key):
+        response = client_for(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return {str(card[key]) for card in response.data['results']}
+
+    def test_serializer_reports_a_pass_without_a_swipe_row(self):
+        serializer = SwipeCreateSerializer(
+            data={'swipe_type': 'job', 'job_id': str(self.jobs[0].id), 'direction': 'left'},
+            context={'request': SimpleNamespace(user=self.developers[0])}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save(), {'passed': True, 'swipe_type': 'job'})
+        self.assertFalse(SwipeActions.objects.exists())
+
+    def test_passed_job_leaves_discover_and_for_me(self):
+        developer = self.developers[0]
+        passed, kept = (str(job.id) for job in self.jobs)
+        for_me = reverse('dashboard') + '?tab=for_me'
+        self.assertEqual(self._deck_ids(developer, reverse('discover-cards'), 'id'), {passed, kept})
+        self.assertEqual(self._deck_ids(developer, for_me, 'id'), {passed, kept})
+
+        # Twice: the seen-set holds each card once
+        self._pass(developer, swipe_type='job', job_id=passed)
+        self._pass(developer, swipe_type='job', job_id=passed)
+
+        self.assertFalse(SwipeActions.objects.exists())
+        self.assertEqual([str(job_id) for job_id in PassedCards.objects.get(user=developer).job_ids], [passed])
+        self.assertEqual(self._deck_ids(developer, reverse('discover-cards'), 'id'), {kept})
+        self.assertEqual(self._deck_ids(developer, for_me, 'id'), {kept})
+
+    def test_passed_developer_leaves_the_company_decks(self):
+        passed, kept = (str(developer.id) for developer in self.developers)
+
+        self._pass(self.company, swipe_type='profile', target_user_id=passed)
+
+        self.assertFalse(SwipeActions.objects.exists())
+        self.assertEqual(self._deck_ids(self.company, reverse('discover-cards'), 'user_id'), {kept})
+        self.assertEqual(self._deck_ids(self.company, reverse('dashboard') + '?tab=for_me', 'user_id'), {kept})
+
+
+class DashboardCacheTests(TestCase):
+    """Cached dashboard tabs are served until a write they depend on commits"""
+
+    def setUp(self):
+        cache.clear()
+        self.company = make_user('company', 'company')
+        make_job(self.company)
+        self.developer = make_developer('developer')
+
+    def _for_me(self):
+        response = client_for(self.company).get(reverse('dashboard') + '?tab=for_me')
+        self.assertEqual(response.status_code, 200)
+        return response['X-Dashboard-Cache'], {str(card['user_id']) for card in response.data['results']}
+
+    def test_repeat_request_is_a_hit(self):
+        self.assertEqual(self._for_me(), ('miss', {str(self.developer.id)}))
+        self.assertEqual(self._for_me(), ('hit', {str(self.developer.id)}))
+
+    def test_deactivated_user_drops_out_of_cached_cards(self):
+        self._for_me()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.developer.is_active = False
+            self.developer.save()
+
+        self.assertEqual(self._for_me(), ('miss', set()))
+
+    def test_sweeper_status_change_invalidates_cards(self):
+        self._for_me()
+        User.objects.filter(pk=self.developer.pk).update(last_ping=timezone.now() - timedelta(days=365))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sweeper.mark_inactive_chunk(100), 1)
+
+        self.assertEqual(self._for_me()[0], 'miss')
+
+    def test_heartbeat_save_keeps_the_cache(self):
+        self._for_me()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.developer.last_ping = timezone.now()
+            self.developer.save(update_fields=['last_ping'])
+
+        self.assertEqual(self._for_me()[0], 'hit')
+
+
+class DashboardTabsTests(TransactionTestCase):
+    """?tabs= runs each tab on the pool and reports the ones that fail"""
+
+    # Transactional: the tabs run on pool threads with their own connections
+
+    def setUp(self):
+        cache.clear()
+        self.enterContext(endpoint_suite.closing_pool_connections())
+        self.developer = make_developer('developer')
+
+    def test_failing_tab_gives_500_and_the_other_tabs(self):
+        seen = {}
+        my_swipes_tab = DashboardAPIView._get_my_swipes_tab
+
+        def recording_tab(view, request):
+            seen['thread'] = threading.current_thread().name
+            seen['routing'] = db_router._state.get()
+            return my_swipes_tab(view, request)
+
+        with mock.patch.object(DashboardAPIView, '_get_matches_tab', side_effect=RuntimeError('boom')), \
+                mock.patch.object(DashboardAPIView, '_get_my_swipes_tab', recording_tab), \
+                self.assertLogs('swipes.views', 'ERROR'):
+            response = client_for(self.developer).get(reverse('dashboard') + '?tabs=my_swipes,matches,stats')
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.data['failed_tabs'], ['matches'])
+        self.assertEqual(response.data['tabs']['matches'], {'tab': 'matches', 'error': TAB_ERROR})
+        self.assertEqual(set(response.data['tabs']), {'my_swipes', 'matches', 'stats'})
+        self.assertEqual(set(response.data['timings_ms']), {'my_swipes', 'matches', 'stats'})
+        self.assertNotIn('error', response.data['tabs']['stats'])
+
+        # The tab ran on the pool, in a copy of the request's context
+        self.assertTrue(seen['thread'].startswith('dashboard-tab'))
+        self.assertIsNotNone(seen['routing'])
+
+    def test_all_tabs_succeed(self):
+        response = client_for(self.developer).get(reverse('dashboard') + '?tabs=all')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('failed_tabs', response.data)
+        self.assertEqual(set(response.data['tabs']), set(DashboardAPIView.TABS))
+
+
+@override_settings(DASHBOARD_CACHE_ENABLED=False)
+class AsyncViewParityTests(TransactionTestCase):
+    """The async discover and dashboard views answer exactly like the sync ones"""
+
+    # Transactional: the async views query on pool threads with their own connections
+
+    def setUp(self):
+        cache.clear()
+        self.enterContext(endpoint_suite.closing_pool_connections())
+        self.company = make_user('company', 'company')
+        self.jobs = [make_job(self.company, title=f'Job {n}') for n in range(8)]
+        # Newest first, the order decks are served in
+        self.jobs.reverse()
+        self.developers = [make_developer(f'developer{n}') for n in range(3)]
+        self.developer = self.developers[0]
+
+    def _get(self, user, name, query=''):
+        response = self.client.get(reverse(name) + query, HTTP_AUTHORIZATION=endpoint_suite.authorization(user))
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.content)
+        for key in ('timings_ms', 'total_ms'):
+            payload.pop(key, None)
+        return payload
+
+    def assertSameAnswer(self, user, name, query=''):
+        sync = self._get(user, name, query)
+        self.assertEqual(self._get(user, f'{name}-async', query), sync)
+        return sync
+
+    def test_discover_matches_the_sync_view(self):
+        SwipeActions.objects.create(swiper=self.developer, swiped_on=self.company, job_post=self.jobs[0],
+                                    swipe_type='job')
+        PassedCards.record_pass(self.company, target_user_id=self.developers[1].id)
+
+        jobs = self.assertSameAnswer(self.developer, 'discover-cards')
+        self.assertEqual(jobs['count'], 7)
+        developers = self.assertSameAnswer(self.company, 'discover-cards')
+        self.assertEqual(developers['count'], 2)
+
+    def test_dashboard_matches_the_sync_view(self):
+        for user in (self.developer, self.company):
+            with self.subTest(user.role):
+                self.assertSameAnswer(user, 'dashboard', '?tab=for_me')
+                self.assertSameAnswer(user, 'dashboard', '?tabs=all')
+
+    def test_deck_is_refilled_when_the_newest_candidates_are_excluded(self):
+        for job in self.jobs[:2]:
+            SwipeActions.objects.create(swiper=self.developer, swiped_on=self.company, job_post=job,
+                                        swipe_type='job')
+        for job in self.jobs[2:4]:
+            PassedCards.record_pass(self.developer, job_id=job.id)
+        sync_ids = [card['id'] for card in self._get(self.developer, 'discover-cards')['results']]
+
+        # Five candidates fetched, four of them excluded: one card short of a deck
+        with mock.patch.object(async_views, 'DECK_SIZE', 3), \
+                mock.patch.object(async_views, 'CANDIDATE_HEADROOM', 2), \
+                mock.patch.object(async_views, '_job_candidates', wraps=async_views._job_candidates) as candidates:
+            payload = self._get(self.developer, 'discover-cards-async')
+
+        self.assertEqual(candidates.call_count, 2)
+        self.assertEqual([card['id'] for card in payload['results']], sync_ids[:3])
+        self.assertEqual(sync_ids, [str(job.id) for job in self.jobs[4:]])
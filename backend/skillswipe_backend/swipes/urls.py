@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import SwipeAPIView, DiscoverAPIView, DashboardAPIView
+from .views import SwipeAPIView, DiscoverAPIView, DashboardAPIView, dashboard_cache_stats
+from .async_views import discover_async, dashboard_async
 
 urlpatterns = [
     # Swipe actions
@@ -7,7 +8,10 @@ urlpatterns = [
     
     # Discovery (cards to swipe on)
     path('discover/', DiscoverAPIView.as_view(), name='discover-cards'),
+    path('discover/async/', discover_async, name='discover-cards-async'),
     
     # Dashboard with tabs
     path('dashboard/', DashboardAPIView.as_view(), name='dashboard'),
+    path('dashboard/async/', dashboard_async, name='dashboard-async'),
+    path('dashboard/cache-stats/', dashboard_cache_stats, name='dashboard-cache-stats'),
 ]
\ No newline at end of file
@@ -2,23 +2,38 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import close_old_connections
 from django.db.models import Q, Count, Exists, OuterRef
 from django.utils import timezone
 from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import logging
+import time
 
-from .models import SwipeActions, Match
+from .models import SwipeActions, Match, MatchParticipant, PassedCards
+from .counters import get_user_counters
+from . import dashboard_cache
 from .serializers import (
     SwipeCreateSerializer, SwipeActionSerializer, 
     MatchSerializer, DashboardStatsSerializer
 )
 from jobs.models import JobPosting
-from jobs.serializers import JobPostingPublicSerializer
+from jobs.analytics import record_job_activity
+from jobs.cards import get_job_cards
 from profiles.models import DeveloperProfile, CompanyProfile
-from profiles.serializers import DeveloperProfilePublicSerializer, CompanyProfilePublicSerializer
+from profiles.cards import get_developer_cards, get_company_cards_for_users
+from skillswipe_backend.db_router import ReplicaReadsMixin, primary_reads
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+# Shown in place of a tab that raised; the details go to the log
+TAB_ERROR = 'This tab could not be loaded'
+
 
 class SwipeAPIView(APIView):
     """Handle swipe actions with automatic match detection"""
@@ -31,6 +46,15 @@ class SwipeAPIView(APIView):
         
         if serializer.is_valid():
             result = serializer.save()
+            
+            if result.get('passed'):
+                return Response({
+                    'success': True,
+                    'swipe_type': result['swipe_type'],
+                    'direction': 'left',
+                    'match_created': False
+                }, status=status.HTTP_201_CREATED)
+            
             swipe = result['swipe']
             match = result['match']
             match_created = result['match_created']
@@ -43,6 +67,11 @@ class SwipeAPIView(APIView):
                 'match_created': match_created
             }
             
+            # Buffered swipes are matched later by the flusher
+            if result.get('buffered'):
+                response_data['buffered'] = True
+                return Response(response_data, status=status.HTTP_202_ACCEPTED)
+            
             if match_created and match:
                 response_data['match'] = {
                     'match_id': str(match.id),
@@ -55,7 +84,56 @@ class SwipeAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class DiscoverAPIView(APIView):
+def filter_jobs(queryset, params):
+    """Apply the discover query-string filters to a JobPosting queryset"""
+    location = params.get('location')
+    job_type = params.get('job_type')
+    work_mode = params.get('work_mode')
+    experience = params.get('experience')
+    tech_stack = params.get('tech_stack')
+    
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+    if job_type:
+        queryset = queryset.filter(job_type=job_type)
+    if work_mode:
+        queryset = queryset.filter(work_mode=work_mode)
+    if experience:
+        queryset = queryset.filter(experience_required=experience)
+    if tech_stack:
+        queryset = queryset.filter(tech_stack__icontains=tech_stack)
+    return queryset
+
+
+def filter_developers(queryset, params):
+    """Apply the discover query-string filters to a developer User queryset"""
+    location = params.get('location')
+    experience = params.get('experience')
+    tech_stack = params.get('tech_stack')
+    
+    if location:
+        queryset = queryset.filter(
+            Q(developer_profile__current_location__icontains=location) |
+            Q(developer_profile__top_two_cities__icontains=location)
+        )
+    
+    if experience:
+        exp_mapping = {'entry': (0, 2), 'mid': (2, 5), 'senior': (5, 10), 'lead': (10, 50)}
+        min_exp, max_exp = exp_mapping.get(experience, (0, 50))
+        queryset = queryset.filter(
+            developer_profile__experience_years__gte=min_exp,
+            developer_profile__experience_years__lte=max_exp
+        )
+    
+    if tech_stack:
+        queryset = queryset.filter(
+            Q(developer_profile__top_languages__icontains=tech_stack) |
+            Q(developer_profile__tools__icontains=tech_stack)
+        )
+    return queryset
+
+
+class DiscoverAPIView(ReplicaReadsMixin, APIView):
     """Get filtered cards for swiping"""
     
     permission_classes = [permissions.IsAuthenticated]
@@ -73,52 +151,45 @@ class DiscoverAPIView(APIView):
             swiper=user, swipe_type='job'
         ).values_list('job_post_id', flat=True)
         
+        # Cards the user swiped left on (loaded once for the whole deck)
+        passed_jobs, passed_users = PassedCards.for_user(user)
+        
         if user.role == 'developer':
-            return self._get_jobs_for_developer(request, swiped_jobs)
+            return self._get_jobs_for_developer(request, swiped_jobs, passed_jobs)
         else:  # company
-            return self._get_developers_for_company(request, swiped_users)
+            return self._get_developers_for_company(request, swiped_users, passed_users)
     
-    def _get_jobs_for_developer(self, request, swiped_jobs):
+    def _get_jobs_for_developer(self, request, swiped_jobs, passed_jobs):
         """Get job cards for developer to swipe on"""
         # Exclude already swiped jobs
         queryset = JobPosting.objects.filter(
             status='active'
         ).exclude(
             id__in=swiped_jobs
-        ).select_related('company').order_by('-created_at')
+        ).order_by('-created_at')
+        
+        # Exclude passed jobs
+        if passed_jobs:
+            queryset = queryset.exclude(id__in=passed_jobs)
         
         # Apply filters
-        location = request.query_params.get('location')
-        job_type = request.query_params.get('job_type')
-        work_mode = request.query_params.get('work_mode')
-        experience = request.query_params.get('experience')
-        tech_stack = request.query_params.get('tech_stack')
-        
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-        if job_type:
-            queryset = queryset.filter(job_type=job_type)
-        if work_mode:
-            queryset = queryset.filter(work_mode=work_mode)
-        if experience:
-            queryset = queryset.filter(experience_required=experience)
-        if tech_stack:
-            queryset = queryset.filter(tech_stack__icontains=tech_stack)
+        queryset = filter_jobs(queryset, request.query_params)
         
         # Limit results for better performance
-        queryset = queryset[:20]
+        job_ids = list(queryset.values_list('id', flat=True)[:20])
         
-        serializer = JobPostingPublicSerializer(
-            queryset, many=True, context={'request': request}
-        )
+        # Count the served cards as impressions for funnel analytics
+        record_job_activity(impressions=job_ids)
+        
+        cards = get_job_cards(job_ids, request.user)
         
         return Response({
             'type': 'jobs',
-            'count': len(serializer.data),
-            'results': serializer.data
+            'count': len(cards),
+            'results': cards
         })
     
-    def _get_developers_for_company(self, request, swiped_users):
+    def _get_developers_for_company(self, request, swiped_users, passed_users):
         """Get developer cards for company to swipe on"""
         # Get developers excluding already swiped ones
         queryset = User.objects.filter(
@@ -128,80 +199,146 @@ class DiscoverAPIView(APIView):
             id__in=swiped_users
         ).exclude(
             id=request.user.id  # Exclude self
-        ).select_related('developer_profile').order_by('-date_joined')
+        ).order_by('-date_joined')
         
-        # Apply filters
-        location = request.query_params.get('location')
-        experience = request.query_params.get('experience')
-        tech_stack = request.query_params.get('tech_stack')
-        
-        if location:
-            queryset = queryset.filter(
-                Q(developer_profile__current_location__icontains=location) |
-                Q(developer_profile__top_two_cities__icontains=location)
-            )
-        
-        if experience:
-            exp_mapping = {'entry': (0, 2), 'mid': (2, 5), 'senior': (5, 10), 'lead': (10, 50)}
-            min_exp, max_exp = exp_mapping.get(experience, (0, 50))
-            queryset = queryset.filter(
-                developer_profile__experience_years__gte=min_exp,
-                developer_profile__experience_years__lte=max_exp
-            )
-        
-        if tech_stack:
-            queryset = queryset.filter(
-                Q(developer_profile__top_languages__icontains=tech_stack) |
-                Q(developer_profile__tools__icontains=tech_stack)
-            )
+        # Exclude passed developers
+        if passed_users:
+            queryset = queryset.exclude(id__in=passed_users)
         
-        # Limit results
-        queryset = queryset[:20]
+        # Apply filters
+        queryset = filter_developers(queryset, request.query_params)
         
-        # Get developer profiles
-        developer_profiles = []
-        for user in queryset:
-            if hasattr(user, 'developer_profile'):
-                developer_profiles.append(user.developer_profile)
-        
-        serializer = DeveloperProfilePublicSerializer(
-            developer_profiles, many=True, context={'request': request}
-        )
+        # Limit results; users without a developer profile get no card
+        cards = get_developer_cards(queryset.values_list('id', flat=True)[:20])
         
         return Response({
             'type': 'developers',
-            'count': len(serializer.data),
-            'results': serializer.data
+            'count': len(cards),
+            'results': cards
         })
 
 
-class DashboardAPIView(APIView):
+# Shared pool for composite dashboard requests; bounds the extra DB connections
+_tab_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'DASHBOARD_TAB_WORKERS', 5),
+    thread_name_prefix='dashboard-tab'
+)
+
+
+def tabs_payload(results, timings, failed, started):
+    """(payload, status) of a composite dashboard response; 500 if any tab raised, the others still included"""
+    payload = {
+        'tabs': results,
+        'timings_ms': timings,
+        'total_ms': round((time.perf_counter() - started) * 1000, 2)
+    }
+    if failed:
+        payload['failed_tabs'] = failed
+        return payload, status.HTTP_500_INTERNAL_SERVER_ERROR
+    return payload, status.HTTP_200_OK
+
+
+class DashboardAPIView(ReplicaReadsMixin, APIView):
     """Dashboard with three tabs: For Me, Showed Interest, Matches"""
     
     permission_classes = [permissions.IsAuthenticated]
     
+    # ?tabs=all runs every tab's queries in one request
+    query_budget = 40
+    
+    # Tab name -> handler method
+    TABS = {
+        'for_me': '_get_for_me_tab',
+        'showed_interest': '_get_showed_interest_tab',
+        'my_swipes': '_get_my_swipes_tab',
+        'matches': '_get_matches_tab',
+        'stats': '_get_dashboard_stats',
+    }
+    
     def get(self, request):
         """Get dashboard data with tabs"""
         user = request.user
+        
+        # Composite mode: several tabs in one round trip
+        tabs = request.query_params.get('tabs')
+        if tabs:
+            return self._get_tabs(request, tabs)
+        
         tab = request.query_params.get('tab', 'for_me')
         
         print(f"🔍 Dashboard API called - User: {user.username}, Role: {user.role}, Tab: {tab}")
         
-        if tab == 'for_me':
-            return self._get_for_me_tab(request)
-        elif tab == 'showed_interest':
-            return self._get_showed_interest_tab(request)
-        elif tab == 'my_swipes':
-            return self._get_my_swipes_tab(request)
-        elif tab == 'matches':
-            return self._get_matches_tab(request)
-        elif tab == 'stats':
-            return self._get_dashboard_stats(request)
-        else:
+        if tab not in self.TABS:
             return Response(
                 {'error': 'Invalid tab. Choose: for_me, showed_interest, my_swipes, matches, stats'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        payload, status_code, cache_state = self._get_tab_payload(request, tab)
+        response = Response(payload, status=status_code)
+        response['X-Dashboard-Cache'] = cache_state
+        return response
+    
+    def _get_tab_payload(self, request, tab):
+        """Serve a tab from the per-user cache or compute it; returns (payload, status, 'hit'|'miss'|'off')"""
+        if not dashboard_cache.cache_enabled():
+            response = getattr(self, self.TABS[tab])(request)
+            return response.data, response.status_code, 'off'
+        
+        key, payload = dashboard_cache.get_cached_tab(request.user.id, tab)
+        if payload is not None:
+            if tab == 'for_me' and payload.get('type') == 'jobs':
+                # Cached cards are still served cards
+                record_job_activity(impressions=[job['id'] for job in payload['results']])
+            return payload, status.HTTP_200_OK, 'hit'
+        
+        # Built from the primary, so a lagging replica can't fill the new version with old data
+        with primary_reads():
+            response = getattr(self, self.TABS[tab])(request)
+        if response.status_code == status.HTTP_200_OK:
+            dashboard_cache.set_cached_tab(key, response.data)
+        return response.data, response.status_code, 'miss'
+    
+    def _get_tabs(self, request, tabs):
+        """Compute several tabs concurrently and return them in one payload"""
+        requested = list(self.TABS) if tabs == 'all' else [tab.strip() for tab in tabs.split(',') if tab.strip()]
+        invalid = [tab for tab in requested if tab not in self.TABS]
+        if invalid or not requested:
+            return Response(
+                {'error': f"Invalid tabs: {', '.join(invalid) or tabs}. Use 'all' or a comma-separated list of: "
+                          f"{', '.join(self.TABS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        started = time.perf_counter()
+        # Each tab runs in a copy of this context so it follows the request's read routing
+        futures = {
+            tab: _tab_executor.submit(contextvars.copy_context().run, self._run_tab, request, tab)
+            for tab in requested
+        }
+        
+        results, timings, failed = {}, {}, []
+        for tab, future in futures.items():
+            results[tab], timings[tab], succeeded = future.result()
+            if not succeeded:
+                failed.append(tab)
+        
+        payload, status_code = tabs_payload(results, timings, failed, started)
+        return Response(payload, status=status_code)
+    
+    def _run_tab(self, request, tab):
+        """Run one tab handler on a pool thread; returns (payload, elapsed_ms, succeeded)"""
+        # Pool threads hold their own DB connection; apply the usual per-request lifecycle
+        close_old_connections()
+        started = time.perf_counter()
+        succeeded = True
+        try:
+            payload, _, _ = self._get_tab_payload(request, tab)
+        except Exception:
+            logger.exception("Dashboard tab %s failed for user %s", tab, request.user.pk)
+            payload, succeeded = {'tab': tab, 'error': TAB_ERROR}, False
+        finally:
+            close_old_connections()
+        return payload, round((time.perf_counter() - started) * 1000, 2), succeeded
     
     def _get_for_me_tab(self, request):
         """Get personalized recommendations (merged with discover logic)"""
@@ -209,6 +346,9 @@ class DashboardAPIView(APIView):
         
         print(f"🔍 FOR_ME TAB - User: {user.username}, Role: {user.role}")
         
+        # Cards the user swiped left on
+        passed_jobs, passed_users = PassedCards.for_user(user)
+        
         if user.role == 'developer':
             # DEVELOPER: Show JOBS in For Me tab
             # Get already swiped jobs to exclude (from My Swipes)
@@ -229,12 +369,19 @@ class DashboardAPIView(APIView):
                 id__in=swiped_jobs  # Exclude jobs already swiped right on
             ).exclude(
                 id__in=wishlisted_jobs  # Exclude wishlisted jobs
-            ).select_related('company').order_by('-created_at')[:20]
+            ).order_by('-created_at')
+            
+            # Exclude passed jobs
+            if passed_jobs:
+                jobs = jobs.exclude(id__in=passed_jobs)
+            job_ids = list(jobs.values_list('id', flat=True)[:20])
             
-            from jobs.serializers import JobPostingPublicSerializer
-            serializer = JobPostingPublicSerializer(jobs, many=True, context={'request': request})
+            # Count the served cards as impressions for funnel analytics
+            record_job_activity(impressions=job_ids)
             
-            print(f"🔍 FOR_ME (Developer) - Found {len(jobs)} jobs")
+            cards = get_job_cards(job_ids, user)
+            
+            print(f"🔍 FOR_ME (Developer) - Found {len(job_ids)} jobs")
             print(f"🔍 FOR_ME (Developer) - Excluded swiped jobs: {len(swiped_jobs)}")
             print(f"🔍 FOR_ME (Developer) - Excluded wishlisted jobs: {len(wishlisted_jobs)}")
             
@@ -242,8 +389,8 @@ class DashboardAPIView(APIView):
                 'tab': 'for_me',
                 'title': 'Discover New Job Opportunities',
                 'type': 'jobs',
-                'count': len(serializer.data),
-                'results': serializer.data
+                'count': len(cards),
+                'results': cards
             })
         else:
             # COMPANY: Show DEVELOPERS in For Me tab
@@ -268,20 +415,17 @@ class DashboardAPIView(APIView):
                 id__in=bookmarked_developers  # Exclude bookmarked developers
             ).exclude(
                 id=user.id
-            ).select_related('developer_profile').order_by('-date_joined')[:20]
+            ).order_by('-date_joined')
             
-            # Get developer profiles
-            developer_profiles = []
-            for dev_user in developers:
-                if hasattr(dev_user, 'developer_profile'):
-                    developer_profiles.append(dev_user.developer_profile)
+            # Exclude passed developers
+            if passed_users:
+                developers = developers.exclude(id__in=passed_users)
+            developer_ids = list(developers.values_list('id', flat=True)[:20])
             
-            from profiles.serializers import DeveloperProfilePublicSerializer
-            serializer = DeveloperProfilePublicSerializer(
-                developer_profiles, many=True, context={'request': request}
-            )
+            # Users without a developer profile get no card
+            cards = get_developer_cards(developer_ids)
             
-            print(f"🔍 FOR_ME (Company) - Found {len(developers)} developers")
+            print(f"🔍 FOR_ME (Company) - Found {len(developer_ids)} developers")
             print(f"🔍 FOR_ME (Company) - Excluded swiped developers: {len(swiped_developers)}")
             print(f"🔍 FOR_ME (Company) - Excluded bookmarked developers: {len(bookmarked_developers)}")
             
@@ -289,8 +433,8 @@ class DashboardAPIView(APIView):
                 'tab': 'for_me',
                 'title': 'Discover New Developer Talent',
                 'type': 'developers',
-                'count': len(serializer.data),
-                'results': serializer.data
+                'count': len(cards),
+                'results': cards
             })
     
     def _get_showed_interest_tab(self, request):
@@ -311,29 +455,31 @@ class DashboardAPIView(APIView):
                 swiper=user, swipe_type='profile'
             ).values_list('swiped_on_id', flat=True)
             
+            # Companies the developer passed on
+            _, passed_users = PassedCards.for_user(user)
+            
             print(f"🔍 SHOWED_INTEREST (Developer) - Company swipes received: {company_swipes.count()}")
             print(f"🔍 SHOWED_INTEREST (Developer) - Already swiped companies: {len(already_swiped_companies)}")
             
-            # Get company profiles (excluding already swiped)
+            # Skip companies the developer already swiped back on or passed
+            pending_swipes = [
+                swipe for swipe in company_swipes
+                if swipe.swiper_id not in already_swiped_companies and swipe.swiper_id not in passed_users
+            ]
+            
+            # Company cards for all swipers at once (swipers without a company are skipped)
+            company_cards = get_company_cards_for_users([swipe.swiper_id for swipe in pending_swipes])
+            
             company_data = []
-            for swipe in company_swipes:
-                company_user = swipe.swiper
-                
-                # Skip if developer has already swiped back on this company
-                if company_user.id in already_swiped_companies:
+            for swipe in pending_swipes:
+                if str(swipe.swiper_id) not in company_cards:
                     continue
-                
-                # Get company profile for this user
-                if company_user.company_memberships.exists():
-                    company_profile = company_user.company_memberships.first().company
-                    
-                    from profiles.serializers import CompanyProfilePublicSerializer
-                    profile_data = CompanyProfilePublicSerializer(company_profile, context={'request': request}).data
-                    # Add the specific user who swiped for frontend use
-                    profile_data['user_id'] = str(company_user.id)
-                    profile_data['username'] = company_user.username
-                    profile_data['swipe_timestamp'] = swipe.timestamp.isoformat()
-                    company_data.append(profile_data)
+                profile_data = dict(company_cards[str(swipe.swiper_id)])
+                # Add the specific user who swiped for frontend use
+                profile_data['user_id'] = str(swipe.swiper_id)
+                profile_data['username'] = swipe.swiper.username
+                profile_data['swipe_timestamp'] = swipe.timestamp.isoformat()
+                company_data.append(profile_data)
             
             print(f"🔍 SHOWED_INTEREST (Developer) - Final company data: {len(company_data)}")
             
@@ -363,37 +509,32 @@ class DashboardAPIView(APIView):
             print(f"🔍 SHOWED_INTEREST (Company) - Unique developers: {len(developer_ids)}")
             print(f"🔍 SHOWED_INTEREST (Company) - Already swiped developers: {len(already_swiped_developers)}")
             
-            # Exclude developers already swiped back on
+            # Developers the company passed on
+            _, passed_users = PassedCards.for_user(user)
+            
+            # Exclude developers already swiped back on or passed
             available_developer_ids = [
                 dev_id for dev_id in developer_ids 
-                if dev_id not in already_swiped_developers
+                if dev_id not in already_swiped_developers and dev_id not in passed_users
             ]
             
-            developers = User.objects.filter(
+            developer_ids = User.objects.filter(
                 id__in=available_developer_ids, 
                 role='developer',
                 is_active=True
-            ).select_related('developer_profile')
-            
-            # Get developer profiles
-            developer_profiles = []
-            for dev_user in developers:
-                if hasattr(dev_user, 'developer_profile'):
-                    developer_profiles.append(dev_user.developer_profile)
+            ).values_list('id', flat=True)
             
-            from profiles.serializers import DeveloperProfilePublicSerializer
-            serializer = DeveloperProfilePublicSerializer(
-                developer_profiles, many=True, context={'request': request}
-            )
+            # Users without a developer profile get no card
+            cards = get_developer_cards(developer_ids)
             
-            print(f"🔍 SHOWED_INTEREST (Company) - Final developer profiles: {len(developer_profiles)}")
+            print(f"🔍 SHOWED_INTEREST (Company) - Final developer profiles: {len(cards)}")
             
             return Response({
                 'tab': 'showed_interest',
                 'title': 'Developers Who Liked Your Jobs',
                 'type': 'developers',
-                'count': len(serializer.data),
-                'results': serializer.data
+                'count': len(cards),
+                'results': cards
             })
     
     def _get_my_swipes_tab(self, request):
@@ -407,78 +548,78 @@ class DashboardAPIView(APIView):
             job_swipes = SwipeActions.objects.filter(
                 swiper=user,
                 swipe_type='job'
-            ).select_related('job_post').order_by('-timestamp')
+            ).order_by('-timestamp')
             
             print(f"🔍 MY_SWIPES (Developer) - Job swipes made: {job_swipes.count()}")
             
-            jobs = []
-            for swipe in job_swipes:
-                if swipe.job_post and swipe.job_post.status == 'active':
-                    jobs.append(swipe.job_post)
-            
-            from jobs.serializers import JobPostingPublicSerializer
-            serializer = JobPostingPublicSerializer(
-                jobs, many=True, context={'request': request}
-            )
+            job_ids = job_swipes.filter(job_post__status='active').values_list('job_post_id', flat=True)
+            cards = get_job_cards(job_ids, user)
             
-            print(f"🔍 MY_SWIPES (Developer) - Active jobs: {len(jobs)}")
+            print(f"🔍 MY_SWIPES (Developer) - Active jobs: {len(cards)}")
             
             return Response({
                 'tab': 'my_swipes',
                 'title': 'Jobs You Liked',
                 'type': 'jobs',
-                'count': len(serializer.data),
-                'results': serializer.data
+                'count': len(cards),
+                'results': cards
             })
         else:
             # COMPANY: Show DEVELOPERS that this company swiped right on
             profile_swipes = SwipeActions.objects.filter(
                 swiper=user,
                 swipe_type='profile'
-            ).select_related('swiped_on').order_by('-timestamp')
+            ).order_by('-timestamp')
             
             print(f"🔍 MY_SWIPES (Company) - Profile swipes made: {profile_swipes.count()}")
             
-            developer_profiles = []
-            for swipe in profile_swipes:
-                if (hasattr(swipe.swiped_on, 'developer_profile') and 
-                    swipe.swiped_on.is_active):
-                    developer_profiles.append(swipe.swiped_on.developer_profile)
+            # Users without a developer profile get no card
+            developer_ids = profile_swipes.filter(swiped_on__is_active=True).values_list('swiped_on_id', flat=True)
+            cards = get_developer_cards(developer_ids)
             
-            from profiles.serializers import DeveloperProfilePublicSerializer
-            serializer = DeveloperProfilePublicSerializer(
-                developer_profiles, many=True, context={'request': request}
-            )
-            
-            print(f"🔍 MY_SWIPES (Company) - Active developers: {len(developer_profiles)}")
+            print(f"🔍 MY_SWIPES (Company) - Active developers: {len(cards)}")
             
             return Response({
                 'tab': 'my_swipes',
                 'title': 'Developers You Liked',
                 'type': 'developers',
-                'count': len(serializer.data),
-                'results': serializer.data
+                'count': len(cards),
+                'results': cards
             })
     
     def _get_matches_tab(self, request):
         """Get matches for current user"""
         user = request.user
         
-        # Get matches for this user
-        matches = Match.objects.filter(
-            Q(user_1=user) | Q(user_2=user),
-            status='active'
-        ).select_related('user_1', 'user_2', 'job_post__company').order_by('-matched_on')
+        # Get matches for this user (one ordered range scan on match_participant)
+        matches = [
+            participant.match for participant in MatchParticipant.feed(user).select_related(
+                'match__user_1', 'match__user_2', 'match__job_post'
+            )
+        ]
+        
+        print(f"DEBUG MATCHES: Found {len(matches)} matches for {user.username}")
         
-        print(f"DEBUG MATCHES: Found {matches.count()} matches for {user.username}")
+        # Determine the other user in each match
+        others = [(match, match.user_2 if match.user_1 == user else match.user_1) for match in matches]
+        
+        # Fetch every card the matches need in one batch per kind
+        job_cards = {
+            card['id']: card for card in get_job_cards(
+                [match.job_post_id for match in matches if match.job_post_id], user
+            )
+        }
+        developer_cards = {
+            card['user_id']: card for card in get_developer_cards(
+                [other.id for _, other in others if other.role == 'developer']
+            )
+        }
+        company_cards = get_company_cards_for_users([other.id for _, other in others if other.role == 'company'])
         
         # Transform matches into displayable objects based on user role
         match_data = []
         
-        for match in matches:
-            # Determine the other user in the match
-            other_user = match.user_2 if match.user_1 == user else match.user_1
-            
+        for match, other_user in others:
             print(f"DEBUG MATCHES: Processing match {match.id} - {user.username} <-> {other_user.username} via job {match.job_post.title if match.job_post else 'None'}")
             
             match_info = {
@@ -489,22 +630,15 @@ class DashboardAPIView(APIView):
             }
             
             # Add job context if available
-            if match.job_post:
-                from jobs.serializers import JobPostingPublicSerializer
-                job_serializer = JobPostingPublicSerializer(match.job_post, context={'request': request})
-                match_info['job_context'] = job_serializer.data
+            if match.job_post_id:
+                match_info['job_context'] = job_cards.get(str(match.job_post_id))
             
             # Add the matched user's profile
-            if other_user.role == 'developer' and hasattr(other_user, 'developer_profile'):
-                from profiles.serializers import DeveloperProfilePublicSerializer
-                profile_serializer = DeveloperProfilePublicSerializer(other_user.developer_profile, context={'request': request})
-                match_info['matched_user'] = profile_serializer.data
+            if other_user.role == 'developer' and str(other_user.id) in developer_cards:
+                match_info['matched_user'] = dict(developer_cards[str(other_user.id)])
                 match_info['matched_user']['role'] = 'developer'
-            elif other_user.role == 'company' and other_user.company_memberships.exists():
-                from profiles.serializers import CompanyProfilePublicSerializer
-                company_profile = other_user.company_memberships.first().company
-                profile_serializer = CompanyProfilePublicSerializer(company_profile, context={'request': request})
-                match_info['matched_user'] = profile_serializer.data
+            elif other_user.role == 'company' and str(other_user.id) in company_cards:
+                match_info['matched_user'] = dict(company_cards[str(other_user.id)])
                 match_info['matched_user']['role'] = 'company'
             
             if match_info['matched_user']:
@@ -528,13 +662,8 @@ class DashboardAPIView(APIView):
         """Get dashboard statistics"""
         user = request.user
         
-        # Calculate stats
-        total_swipes_made = SwipeActions.objects.filter(swiper=user).count()
-        total_swipes_received = SwipeActions.objects.filter(swiped_on=user).count()
-        total_matches = Match.objects.filter(Q(user_1=user) | Q(user_2=user)).count()
-        active_matches = Match.objects.filter(
-            Q(user_1=user) | Q(user_2=user), status='active'
-        ).count()
+        # Denormalized counters: one primary-key read instead of six COUNTs
+        counters = get_user_counters(user)
         
         # Profile completion 
         profile_completion = 0
@@ -571,16 +700,7 @@ class DashboardAPIView(APIView):
         
         # Recent activity (last 7 days)
         try:
-            week_ago = timezone.now() - timedelta(days=7)
-            recent_swipes = SwipeActions.objects.filter(
-                Q(swiper=user) | Q(swiped_on=user),
-                timestamp__gte=week_ago
-            ).count()
-            
-            recent_matches = Match.objects.filter(
-                Q(user_1=user) | Q(user_2=user),
-                matched_on__gte=week_ago
-            ).count()
+            recent_swipes, recent_matches = counters.recent_totals()
             
             recent_activity = [
                 f"{recent_swipes} swipes this week",
@@ -590,10 +710,10 @@ class DashboardAPIView(APIView):
             recent_activity = ["No recent activity data available"]
         
         stats_data = {
-            'total_swipes_made': total_swipes_made,
-            'total_swipes_received': total_swipes_received,
-            'total_matches': total_matches,
-            'active_matches': active_matches,
+            'total_swipes_made': counters.swipes_made,
+            'total_swipes_received': counters.swipes_received,
+            'total_matches': counters.total_matches,
+            'active_matches': counters.active_matches,
             'profile_completion': profile_completion,
             'recent_activity': recent_activity
         }
@@ -604,4 +724,13 @@ class DashboardAPIView(APIView):
             'tab': 'stats',
             'title': 'Your Statistics',
             'data': serializer.data
-        })
\ No newline at end of file
+        })
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def dashboard_cache_stats(request):
+    """Dashboard cache hit/miss counts per tab (admin only)"""
+    return Response({
+        'enabled': dashboard_cache.cache_enabled(),
+        'tabs': dashboard_cache.get_hit_stats(list(DashboardAPIView.TABS))
+    })